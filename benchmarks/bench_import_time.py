@@ -0,0 +1,86 @@
+"""
+Import-time regression check for Statica.
+
+Runs Python with ``-X importtime`` and verifies that
+
+- importing the Statica entry points does not pull in the scientific stack;
+- a script that only loads and describes a dataset never imports
+  statsmodels, scipy or matplotlib.
+
+It prints the cumulative import time of the heaviest top-level packages and
+exits with status 1 when one of the checks fails, so it can run in CI.
+
+Usage:
+    python benchmarks/bench_import_time.py [--max-ms 250]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("pandas", "numpy", "scipy", "statsmodels", "matplotlib")
+
+LOAD_DESCRIBE = 'data = load "{csv}" with header\ndescribe data\n'
+
+
+def import_times(code):
+    """Run `code` under -X importtime and return {module: cumulative_us}."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), MPLBACKEND="Agg")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env,
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def top_level(times):
+    return {name: us for name, us in times.items() if "." not in name}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--max-ms", type=float, default=250.0,
+                    help="budget for importing statica's entry points")
+    args = ap.parse_args()
+    failures = []
+
+    entry = import_times("import statica, statica.cli, statica.runtime, statica.core")
+    leaked = [m for m in HEAVY if m in entry]
+    if leaked:
+        failures.append(f"importing statica pulls in: {', '.join(leaked)}")
+    total_ms = entry.get("statica", 0) / 1e3 + entry.get("statica.cli", 0) / 1e3
+    print(f"statica entry points: {total_ms:.1f} ms")
+    if total_ms > args.max_ms:
+        failures.append(f"entry-point import took {total_ms:.1f} ms (budget {args.max_ms} ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "describe.sta"
+        csv = (ROOT / "examples" / "study.csv").as_posix()
+        script.write_text(LOAD_DESCRIBE.format(csv=csv))
+        run = import_times(
+            "import contextlib, io, sys\n"
+            "sys.argv = ['statica', %r]\n"
+            "from statica import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    cli.main()\n" % str(script))
+    for name, us in sorted(top_level(run).items(), key=lambda kv: -kv[1])[:8]:
+        print(f"  {name:<20} {us / 1e3:>9.1f} ms")
+    for forbidden in ("statsmodels", "scipy", "matplotlib"):
+        if forbidden in run:
+            failures.append(f"load + describe imported {forbidden}")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load throughput of every data format Statica reads.
+
+Generates one dataset (numeric, integer and low-cardinality text columns),
+writes it in each format, and times `statica.services.formats.read` on
+every file. Each row shows rows/s and the on-disk size. CSV is timed with
+pandas' C parser and, when pyarrow is installed, with the multithreaded
+pyarrow engine. A memory-mapped column store is timed on attach plus a
+full pass over its columns. Formats whose optional package (pyarrow,
+zstandard) is missing are reported as skipped.
+
+The dataset cache is not involved; every read parses the file.
+
+Usage:
+    python benchmarks/bench_load_formats.py [--rows 1000000] [--runs 3]
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def make_frame(rows):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "score": rng.normal(70, 10, rows).round(3),
+        "weight": rng.gamma(2.0, 3.0, rows),
+        "age": rng.integers(18, 90, rows),
+        "visits": rng.poisson(3, rows),
+        "group": rng.choice(["control", "treatment"], rows),
+        "site": rng.choice([f"site{i:02d}" for i in range(40)], rows),
+    })
+
+
+def writers(df):
+    """(label, file name, write function, required module or None)."""
+    return [
+        ("csv", "data.csv", lambda p: df.to_csv(p, index=False), None),
+        ("csv.gz", "data.csv.gz", lambda p: df.to_csv(p, index=False), None),
+        ("csv.zst", "data.csv.zst", lambda p: df.to_csv(p, index=False), "zstandard"),
+        ("jsonl", "data.jsonl", lambda p: df.to_json(p, orient="records", lines=True), None),
+        ("parquet", "data.parquet", lambda p: df.to_parquet(p, index=False), "pyarrow"),
+        ("feather", "data.feather", lambda p: df.to_feather(p), "pyarrow"),
+    ]
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    from statica.core.config import settings
+    from statica.services import formats
+    from statica.services.file_handler import ColumnStore, write_column_store
+
+    df = make_frame(args.rows)
+    print(f"{args.rows:,} rows x {len(df.columns)} cols, best of {args.runs}")
+    print(f"{'format':<16} {'MB on disk':>10} {'best s':>8} {'median s':>9} {'Mrows/s':>8}")
+
+    def report(label, path, fn):
+        best, median = best_of(args.runs, fn)
+        size = sum(f.stat().st_size for f in Path(path).rglob("*")) if os.path.isdir(path) \
+            else os.path.getsize(path)
+        print(f"{label:<16} {size / 2**20:>10.1f} {best:>8.3f} {median:>9.3f} "
+              f"{args.rows / best / 1e6:>8.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, name, write, module in writers(df):
+            if module is not None and importlib.util.find_spec(module) is None:
+                print(f"{label:<16} skipped ({module} not installed)")
+                continue
+            path = os.path.join(tmp, name)
+            write(path)
+            if label == "csv":
+                engines = [("c", "csv (C parser)")]
+                if formats.has_pyarrow():
+                    engines.append(("pyarrow", "csv (pyarrow)"))
+                for engine, engine_label in engines:
+                    settings.csv_engine = engine
+                    report(engine_label, path, lambda: formats.read(path))
+                settings.csv_engine = "auto"
+            else:
+                report(label, path, lambda: formats.read(path))
+
+        store = os.path.join(tmp, "data.stcol")
+        write_column_store(df, store)
+
+        def scan_store():
+            ds = ColumnStore(store)
+            for chunk in ds.chunks():
+                pass
+
+        report("column store", store, scan_store)
+
+
+if __name__ == "__main__":
+    main()
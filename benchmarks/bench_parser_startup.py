@@ -0,0 +1,69 @@
+"""
+Startup benchmark for the Statica parser.
+
+Measures how long it takes to construct a `Parser` in three situations:
+
+- cold: a fresh process with an empty grammar cache (tables are built);
+- warm: a fresh process that finds the tables in the on-disk cache;
+- in-process: further `Parser()` calls in an already warm process.
+
+Usage:
+    python benchmarks/bench_parser_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+from statica.parsing import Parser
+t1 = time.perf_counter()
+Parser()
+t2 = time.perf_counter()
+print(t2 - t1)
+"""
+
+
+def construct_in_fresh_process(cache_dir):
+    env = dict(os.environ, STATICA_CACHE_DIR=cache_dir, PYTHONPATH=str(ROOT))
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, check=True,
+                         capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache:
+            cold.append(construct_in_fresh_process(cache))
+            warm.append(construct_in_fresh_process(cache))
+
+    sys.path.insert(0, str(ROOT))
+    from statica.parsing import Parser
+    Parser()
+    in_process = []
+    for _ in range(args.runs * 100):
+        t0 = time.perf_counter()
+        Parser()
+        in_process.append(time.perf_counter() - t0)
+
+    print(f"{'case':<12} {'median ms':>10} {'min ms':>10}")
+    for name, samples in (("cold", cold), ("warm", warm), ("in-process", in_process)):
+        print(f"{name:<12} {statistics.median(samples) * 1e3:>10.3f} {min(samples) * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
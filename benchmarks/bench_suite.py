@@ -0,0 +1,238 @@
+"""
+End-to-end benchmark suite for Statica.
+
+For each dataset size (synthetic data from `datagen`, generated once and
+kept in the Statica cache directory) a fresh runtime executes one script
+statement by statement, and every statement is timed:
+
+    parse        a generated script of `--parse-statements` statements (once)
+    load         the CSV file (dataset and result caches off)
+    describe     describe data
+    ttest1       one-sample t-test against a constant
+    ttest2       two-sample (Welch) t-test of y by arm
+    ttest-rest   each of the g groups against the rest
+    regress      y ~ x0 + x1 + arm
+    plot         histogram of y, saved as a PNG
+    conclude     the two-sample test and the model
+
+Sizes of `--stream-above` rows and more are loaded with `streaming`, so
+1e7 and 1e8 rows run in bounded memory (1e8 rows is about 8 GB of CSV;
+generating it takes a while).
+
+Each stage reports the best of `--runs` runs, after an untimed warm-up
+run that imports the scientific stack. `--output` saves the results
+as JSON. `--baseline` compares with a saved result file and flags every
+stage that got slower by more than `--tolerance` (and more than 5 ms);
+the exit status is then 1, so the suite can gate CI. Timings depend on the
+machine: compare against a baseline recorded on the same one.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1e3,1e4,1e5,1e6] [--runs 3]
+        [--cols 4] [--groups 10] [--nan-rate 0.01]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+"""
+
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import datagen  # noqa: E402
+
+# changes below this many seconds are noise, whatever their ratio
+MIN_DELTA = 0.005
+
+SCRIPT = """\
+data = load "{path}" with header{streaming}
+describe data
+t1 = test ttest mean of data.y against 50
+t2 = test ttest mean of data.y by arm
+t3 = test ttest mean of data.y by g vs rest
+m = regress y ~ x0 + x1 + arm on data
+plot data.y histogram to "{plot}"
+conclude t2
+conclude m
+"""
+
+STAGES = ("load", "describe", "ttest1", "ttest2", "ttest-rest", "regress", "plot", "conclude", "conclude")
+
+
+def parse_sizes(text):
+    return [int(float(s)) for s in text.split(",") if s.strip()]
+
+
+def generated_script(statements):
+    """A long script of tests and models, the kind report generators emit."""
+    lines = ['data = load "data.csv" with header']
+    for i in range(statements - 1):
+        if i % 2:
+            lines.append(f"r{i} = regress y ~ x0 + x{i % 4} on data")
+        else:
+            lines.append(f"t{i} = test ttest mean of data.x{i % 4} against {i % 7}")
+    return "\n".join(lines) + "\n"
+
+
+def timings(runs, fn):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def time_script(text, runs):
+    """Per-stage timings of `text`, each from a fresh runtime."""
+    from statica import parser as st_parser
+    from statica.runtime import Runtime
+
+    samples = {}
+    for _ in range(runs):
+        cmds = st_parser.parse_program(text)
+        # the previous run's DataFrame must not be handed out again
+        gc.collect()
+        rt = Runtime(jobs=1, lazy=False)
+        seen = {}
+        for stage, cmd in zip(STAGES, cmds):
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                rt.execute([cmd])
+                elapsed = time.perf_counter() - t0
+            # the two conclude statements count as one stage
+            seen[stage] = seen.get(stage, 0.0) + elapsed
+        for stage, elapsed in seen.items():
+            samples.setdefault(stage, []).append(elapsed)
+        del rt
+    return samples
+
+
+def run_suite(args):
+    from statica import parser as st_parser
+    from statica.core.config import cache_dir, settings
+
+    settings.dataset_cache = "off"
+    settings.result_cache = "off"
+    settings.plot_workers = 1
+    data_dir = args.data_dir or str(cache_dir("bench-data"))
+    results = []
+
+    def record(stage, rows, samples):
+        results.append({"stage": stage, "rows": rows, "best": min(samples),
+                        "median": statistics.median(samples), "runs": len(samples)})
+        print(f"{stage:<12} {rows if rows is not None else '-':>11} {min(samples):>10.4f} "
+              f"{statistics.median(samples):>10.4f}", flush=True)
+
+    print(f"{'stage':<12} {'rows':>11} {'best s':>10} {'median s':>10}")
+    long_script = generated_script(args.parse_statements)
+    record("parse", None, timings(args.runs, lambda: st_parser.parse_program(long_script)))
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, rows in enumerate(args.sizes):
+            path = datagen.dataset_path(data_dir, rows, args.cols, args.groups, args.nan_rate)
+            text = SCRIPT.format(path=path, plot=os.path.join(tmp, "y.png"),
+                                 streaming=" streaming" if rows >= args.stream_above else "")
+            if i == 0:
+                # untimed warm-up: the first run would also time importing the scientific stack
+                time_script(text, 1)
+            for stage, samples in time_script(text, args.runs).items():
+                record(stage, rows, samples)
+    return results
+
+
+def metadata(args):
+    import numpy
+    import pandas
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "params": params(args),
+    }
+
+
+def params(args):
+    # what the timings depend on besides the machine
+    return {"cols": args.cols, "groups": args.groups, "nan_rate": args.nan_rate,
+            "stream_above": args.stream_above}
+
+
+def compare(results, baseline, tolerance):
+    """Print each stage against the baseline; return the regressed ones."""
+    before = {(r["stage"], r["rows"]): r["best"] for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'stage':<12} {'rows':>11} {'baseline s':>11} {'now s':>10} {'ratio':>7}")
+    for r in results:
+        old = before.get((r["stage"], r["rows"]))
+        if old is None:
+            continue
+        ratio = r["best"] / old if old > 0 else float("inf")
+        flag = ""
+        if r["best"] > old * (1 + tolerance) and r["best"] - old > MIN_DELTA:
+            flag = "  REGRESSION"
+            regressions.append(r)
+        elif old > r["best"] * (1 + tolerance) and old - r["best"] > MIN_DELTA:
+            flag = "  faster"
+        rows = r["rows"] if r["rows"] is not None else "-"
+        print(f"{r['stage']:<12} {rows:>11} {old:>11.4f} {r['best']:>10.4f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", type=parse_sizes, default=parse_sizes("1e3,1e4,1e5,1e6"),
+                    help="comma-separated row counts (default 1e3,1e4,1e5,1e6; up to 1e8)")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--cols", type=int, default=4, help="numeric predictor columns (at least 2)")
+    ap.add_argument("--groups", type=int, default=10, help="distinct values of the group column")
+    ap.add_argument("--nan-rate", type=float, default=0.01, help="fraction of missing numeric values")
+    ap.add_argument("--stream-above", type=float, default=1e7,
+                    help="load datasets of this many rows or more with `streaming` (default 1e7)")
+    ap.add_argument("--parse-statements", type=int, default=2000,
+                    help="statements in the generated script timed by the parse stage")
+    ap.add_argument("--data-dir", default=None,
+                    help="where generated datasets are kept (default: the Statica cache directory)")
+    ap.add_argument("--output", default=None, metavar="FILE", help="save the results as JSON")
+    ap.add_argument("--baseline", default=None, metavar="FILE",
+                    help="compare with a results file and exit 1 on regressions")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="slowdown ratio above which a stage is flagged (default 0.25 = 25%%)")
+    args = ap.parse_args()
+    if args.cols < 2:
+        ap.error("--cols must be at least 2 (the model uses x0 and x1)")
+
+    results = run_suite(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"meta": metadata(args), "results": results}, fh, indent=1)
+        print(f"\nwrote {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("meta", {}).get("params") != params(args):
+            print(f"\nwarning: the baseline was recorded with {baseline.get('meta', {}).get('params')}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Deterministic synthetic datasets for the Statica benchmarks.
+
+A dataset has `cols` numeric predictors ``x0 .. x{cols-1}``, an outcome
+``y`` that depends linearly on them and on a binary ``arm`` column
+(``control`` / ``treatment``), and a group label ``g`` with `groups`
+distinct values (``g000``, ``g001``, ...). A fraction `nan_rate` of the
+predictor and outcome values is missing.
+
+The data is generated in blocks of `BLOCK_ROWS` rows, each from its own
+seeded random stream, so the same parameters always give the same file, and
+a 1e8-row CSV is written without ever holding more than one block in memory.
+
+Usage:
+    python benchmarks/datagen.py out.csv [--rows 1e6] [--cols 4] [--groups 10] [--nan-rate 0.01]
+"""
+
+import argparse
+import os
+from typing import Iterator
+
+BLOCK_ROWS = 1_000_000
+
+
+def make_block(start, rows, cols=4, groups=10, nan_rate=0.0, seed=0):
+    """Rows ``start .. start + rows`` of the dataset, as a DataFrame.
+
+    `start` must be a multiple of `BLOCK_ROWS` and `rows` at most `BLOCK_ROWS`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng([seed, start // BLOCK_ROWS])
+    data = {f"x{i}": rng.normal(10.0 * i, 1.0 + i, rows) for i in range(cols)}
+    arm = rng.integers(0, 2, rows)
+    noise = rng.normal(0.0, 5.0, rows)
+    y = 50.0 + 2.0 * arm + noise
+    for i in range(cols):
+        y += (0.5 - 0.25 * i) * data[f"x{i}"]
+    data["y"] = y
+    if nan_rate > 0:
+        for name in list(data):
+            values = data[name]
+            values[rng.random(rows) < nan_rate] = np.nan
+    labels = np.array([f"g{i:03d}" for i in range(groups)])
+    data["g"] = labels[rng.integers(0, groups, rows)]
+    data["arm"] = np.array(["control", "treatment"])[arm]
+    return pd.DataFrame(data)
+
+
+def blocks(rows, cols=4, groups=10, nan_rate=0.0, seed=0) -> Iterator:
+    """The whole dataset, block by block."""
+    for start in range(0, rows, BLOCK_ROWS):
+        yield make_block(start, min(BLOCK_ROWS, rows - start), cols, groups, nan_rate, seed)
+
+
+def make_frame(rows, cols=4, groups=10, nan_rate=0.0, seed=0):
+    """The whole dataset as one DataFrame (for sizes that fit in memory)."""
+    import pandas as pd
+
+    return pd.concat(list(blocks(rows, cols, groups, nan_rate, seed)), ignore_index=True)
+
+
+def write_csv(path, rows, cols=4, groups=10, nan_rate=0.0, seed=0):
+    """Write the dataset as a CSV file with a header row.
+
+    The file is written next to `path` and moved into place when complete,
+    so an interrupted run never leaves a truncated dataset behind.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        for i, block in enumerate(blocks(rows, cols, groups, nan_rate, seed)):
+            block.to_csv(fh, index=False, header=i == 0, float_format="%.6g")
+    os.replace(tmp, path)
+
+
+def dataset_path(directory, rows, cols=4, groups=10, nan_rate=0.0, seed=0):
+    """Path of the CSV for these parameters in `directory`, generated if missing."""
+    name = f"bench_r{rows}_c{cols}_g{groups}_n{nan_rate:g}_s{seed}.csv"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        write_csv(path, rows, cols, groups, nan_rate, seed)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("path", help="CSV file to write")
+    ap.add_argument("--rows", type=float, default=1e6, help="number of rows (1e6 notation accepted)")
+    ap.add_argument("--cols", type=int, default=4, help="numeric predictor columns")
+    ap.add_argument("--groups", type=int, default=10, help="distinct values of the group column g")
+    ap.add_argument("--nan-rate", type=float, default=0.01, help="fraction of missing numeric values")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    write_csv(args.path, int(args.rows), args.cols, args.groups, args.nan_rate, args.seed)
+    print(f"wrote {args.path} ({os.path.getsize(args.path) / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
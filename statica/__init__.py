@@ -1,3 +1,5 @@
+__version__ = "0.1.0"
+
 from .parsing import *
 
 __all__ = ["parser", "runtime", "nlg", "cli"]
@@ -0,0 +1,133 @@
+"""
+Batch execution of many Statica scripts.
+
+Starting the interpreter and importing the scientific stack costs more than
+running a typical small report script. `run_batch` keeps a pool of worker
+processes that import pandas, SciPy and StatsModels and build the parser
+once, then runs each script in a fresh `Runtime` with its output captured
+separately.
+"""
+
+import contextlib
+import glob
+import io
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .core.config import settings
+
+
+class ScriptResult:
+    """Outcome of one script of a batch."""
+
+    def __init__(self, path: str, ok: bool, duration: float, output: str, error: Optional[str] = None) -> None:
+        self.path = path
+        self.ok = ok
+        self.duration = duration
+        self.output = output
+        self.error = error
+
+    @property
+    def status(self) -> str:
+        return "ok" if self.ok else "error"
+
+    def __repr__(self) -> str:
+        return f"<ScriptResult {self.path} {self.status} {self.duration:.2f}s>"
+
+
+def collect_scripts(paths: Iterable[str]) -> List[str]:
+    """Expand directories and glob patterns into a list of script paths.
+
+    Directories contribute every ``*.sta`` file below them. Duplicates are
+    dropped and the order of the arguments is kept.
+
+    Args:
+        paths: Files, directories or glob patterns.
+
+    Returns:
+        Script paths.
+    """
+    found: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(str(p) for p in Path(path).rglob("*.sta")))
+        elif glob.has_magic(path):
+            found.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            found.append(path)
+    return list(dict.fromkeys(found))
+
+
+def _warm_up(overrides: Dict[str, Any]) -> None:
+    # runs once in every worker process
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    # plots in batch jobs must never open a window
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    from . import parser as st_parser
+    st_parser.get_parser()
+    import pandas  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import statsmodels.api  # noqa: F401
+
+
+def run_script(path: str) -> ScriptResult:
+    """Run one script in a fresh Runtime, capturing everything it prints."""
+    from .cli import run_file
+
+    buf = io.StringIO()
+    start = time.perf_counter()
+    error = None
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        try:
+            run_file(path)
+        except Exception as e:
+            traceback.print_exc()
+            error = f"{type(e).__name__}: {e}"
+    return ScriptResult(path, error is None, time.perf_counter() - start, buf.getvalue(), error)
+
+
+def run_batch(paths: List[str], workers: Optional[int] = None,
+              on_result: Optional[Callable[[ScriptResult], None]] = None) -> List[ScriptResult]:
+    """Run scripts on a pool of warm worker processes.
+
+    Args:
+        paths: Scripts to run.
+        workers: Number of worker processes (defaults to the CPU count).
+        on_result: Called with each result, in the order of `paths`, as soon
+            as it and all scripts before it have finished.
+
+    Returns:
+        One ScriptResult per script, in the order of `paths`.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    # CLI overrides must reach workers that do not fork from this process
+    overrides = dict(vars(settings))
+    # thousands of tiny scripts: hand them out in chunks to save round trips
+    chunksize = max(1, len(paths) // (workers * 8))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up, initargs=(overrides,)) as pool:
+        for result in pool.map(run_script, paths, chunksize=chunksize):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def format_summary(results: List[ScriptResult]) -> str:
+    """Per-script status and duration table followed by totals."""
+    width = max([len("script")] + [len(r.path) for r in results])
+    lines = [f"{'script':<{width}}  {'status':<6}  {'seconds':>8}"]
+    for r in results:
+        lines.append(f"{r.path:<{width}}  {r.status:<6}  {r.duration:>8.2f}")
+        if r.error:
+            lines.append(f"{'':<{width}}    {r.error}")
+    failed = sum(not r.ok for r in results)
+    total = sum(r.duration for r in results)
+    lines.append(f"{len(results)} script(s), {len(results) - failed} ok, {failed} failed, "
+                 f"{total:.2f}s of script time")
+    return "\n".join(lines)
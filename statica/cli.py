@@ -1,19 +1,205 @@
+import argparse
+import os
 import sys
+import time
 from pathlib import Path
-from . import parser as st_parser
+from . import batch
+from .core.config import settings
+from .core.profiler import Profiler
+from .core.scheduler import statement_label
+from .parsing.program_cache import load_program
 from .runtime import Runtime
+from .services.result_cache import get_result_cache
 
-def run_file(path):
-    text = Path(path).read_text(encoding="utf-8")
-    cmds = st_parser.parse_program(text)
-    rt = Runtime()
+def run_file(path, profile=None):
+    # parsed once per version of the script, see parsing.program_cache
+    if profile is None:
+        cmds = load_program(path)
+    else:
+        with profile.statement(f"parse {Path(path).name}", kind="parse"):
+            cmds = load_program(path)
+    rt = Runtime(profile=profile)
     rt.execute(cmds)
+    if rt.skipped:
+        print(f"[lazy] skipped {len(rt.skipped)} statement(s) whose results were never used "
+              f"(not run, so not checked for errors):")
+        for cmd in rt.skipped:
+            print(f"  {statement_label(cmd)}")
 
-def main():
-    if len(sys.argv) < 2:
+def _add_run_options(ap):
+    cache = ap.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", action="store_true",
+                       help="always parse data files, bypassing the dataset cache")
+    cache.add_argument("--refresh-cache", action="store_true",
+                       help="re-parse data files and replace their cached copies")
+    ap.add_argument("--no-result-cache", action="store_true",
+                    help="recompute every test and model instead of reusing stored results")
+    ap.add_argument("--no-program-cache", action="store_true",
+                    help="parse the script instead of reusing its compiled program")
+    ap.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                    help="run independent statements on N worker threads (default 1)")
+    ap.add_argument("--lazy", action="store_true",
+                    help="compute loads, tests and models only if a later statement uses them")
+    ap.add_argument("--all-columns", action="store_true",
+                    help="load every column of a data file, not only the ones the script uses")
+    ap.add_argument("--compact", action="store_true",
+                    help="load every dataset with compact column types (as 'load ... compact')")
+    ap.add_argument("--plot-dir", default=None, metavar="DIR",
+                    help="save plots without a 'to' file as PNGs in DIR instead of showing them")
+
+def _apply_run_options(args):
+    if args.no_cache:
+        settings.dataset_cache = "off"
+    elif args.refresh_cache:
+        settings.dataset_cache = "refresh"
+    if args.no_result_cache:
+        settings.result_cache = "off"
+    if args.no_program_cache:
+        settings.program_cache = "off"
+    if args.lazy:
+        settings.lazy = True
+    if args.jobs is not None:
+        settings.jobs = max(1, args.jobs)
+    if args.all_columns:
+        settings.projection = False
+    if args.compact:
+        settings.compact = True
+    if args.plot_dir:
+        settings.plot_dir = args.plot_dir
+
+def build_arg_parser():
+    ap = argparse.ArgumentParser(prog="statica", description="Run a Statica script.")
+    ap.add_argument("script", help="path/to/script.sta")
+    _add_run_options(ap)
+    ap.add_argument("--cache-stats", action="store_true",
+                    help="print result cache hits and misses after the run")
+    ap.add_argument("--profile", action="store_true",
+                    help="print the statements ranked by time, memory and cache use after the run")
+    ap.add_argument("--trace", default=None, metavar="FILE",
+                    help="write the run as a Chrome trace-event JSON file (chrome://tracing, Perfetto)")
+    ap.add_argument("--no-profile-memory", action="store_true",
+                    help="with --profile/--trace, skip peak memory (tracemalloc slows imports and allocations)")
+    return ap
+
+def build_batch_arg_parser():
+    ap = argparse.ArgumentParser(prog="statica run-batch",
+                                 description="Run many Statica scripts in warm worker processes.")
+    ap.add_argument("paths", nargs="+", help="scripts, directories (all *.sta below) or glob patterns")
+    ap.add_argument("-w", "--workers", type=int, default=None, metavar="N",
+                    help="worker processes (default: number of CPUs)")
+    ap.add_argument("-o", "--output-dir", default=None,
+                    help="write each script's output to <output-dir>/<script>.log instead of the terminal")
+    _add_run_options(ap)
+    return ap
+
+def run_batch_command(argv):
+    args = build_batch_arg_parser().parse_args(argv)
+    _apply_run_options(args)
+    scripts = batch.collect_scripts(args.paths)
+    if not scripts:
+        print("[run-batch] no scripts found")
+        return 1
+    out_dir = Path(args.output_dir) if args.output_dir else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    def report(result):
+        if out_dir is None:
+            print(f"==> {result.path} <==")
+            print(result.output, end="" if result.output.endswith("\n") or not result.output else "\n")
+            return
+        name = Path(result.path).with_suffix(".log")
+        target = out_dir / (name.relative_to(name.anchor) if name.is_absolute() else name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(result.output, encoding="utf-8")
+
+    start = time.perf_counter()
+    results = batch.run_batch(scripts, workers=args.workers, on_result=report)
+    print(batch.format_summary(results))
+    print(f"wall time {time.perf_counter() - start:.2f}s")
+    return 0 if all(r.ok for r in results) else 1
+
+def build_serve_arg_parser():
+    ap = argparse.ArgumentParser(prog="statica serve",
+                                 description="Keep datasets and the interpreter warm and run scripts sent as JSON.")
+    ap.add_argument("--host", default="127.0.0.1", help="interface to listen on (default 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8765, help="TCP port (default 8765)")
+    ap.add_argument("--socket", default=None, metavar="PATH", help="listen on a Unix socket instead of TCP")
+    ap.add_argument("--memory-mb", type=int, default=None, metavar="MB",
+                    help="cap on the memory of datasets held by all sessions (default 2048)")
+    ap.add_argument("--max-sessions", type=int, default=None, metavar="N",
+                    help="cap on the number of sessions; the least recently used idle one "
+                         "makes room for a new one (default 64)")
+    _add_run_options(ap)
+    return ap
+
+def serve_command(argv):
+    from . import server
+
+    args = build_serve_arg_parser().parse_args(argv)
+    _apply_run_options(args)
+    memory = args.memory_mb * 2**20 if args.memory_mb is not None else None
+    server.serve(args.host, args.port, args.socket, memory, args.max_sessions)
+    return 0
+
+def build_convert_arg_parser():
+    ap = argparse.ArgumentParser(prog="statica convert",
+                                 description="Convert a CSV file into a memory-mapped column store.")
+    ap.add_argument("source", help="CSV file to read")
+    ap.add_argument("target", nargs="?", default=None,
+                    help="store directory to write (default: the source name with .stcol)")
+    ap.add_argument("--compact", action="store_true",
+                    help="store compact column types (see 'load ... compact')")
+    ap.add_argument("--force", action="store_true", help="replace the target if it exists")
+    return ap
+
+def convert_command(argv):
+    from .services.file_handler import write_column_store
+    from .services.loaders import load_dataset
+
+    args = build_convert_arg_parser().parse_args(argv)
+    target = args.target or str(Path(args.source).with_suffix(".stcol"))
+    if os.path.lexists(target) and not args.force:
+        print(f"[convert] {target} already exists; pass --force to replace it")
+        return 1
+    df = load_dataset(args.source, compact=args.compact)
+    write_column_store(df, target)
+    print(f"[convert] {args.source} -> {target} ({len(df)} rows x {len(df.columns)} cols)")
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
         print("Usage: python -m statica.cli path/to/script.sta")
+        print("       python -m statica.cli run-batch DIR|SCRIPT|GLOB ...")
+        print("       python -m statica.cli serve [--port N | --socket PATH]")
+        print("       python -m statica.cli convert data.csv [data.stcol]")
         sys.exit(1)
-    run_file(sys.argv[1])
+    if argv[0] == "run-batch":
+        sys.exit(run_batch_command(argv[1:]))
+    if argv[0] == "serve":
+        sys.exit(serve_command(argv[1:]))
+    if argv[0] == "convert":
+        sys.exit(convert_command(argv[1:]))
+    args = build_arg_parser().parse_args(argv)
+    _apply_run_options(args)
+    profile = None
+    if args.profile or args.trace:
+        profile = Profiler(memory=not args.no_profile_memory).start()
+    try:
+        run_file(args.script, profile)
+    finally:
+        if profile is not None:
+            profile.stop()
+            if args.profile:
+                print(profile.report())
+            if args.trace:
+                profile.write_trace(args.trace)
+                print(f"[trace] wrote {args.trace}")
+    cache = get_result_cache()
+    if args.cache_stats and cache is not None:
+        stats = cache.stats()
+        print(f"[result cache] {stats['hits']} hits, {stats['misses']} misses")
 
 if __name__ == "__main__":
     main()
@@ -6,10 +6,16 @@ These commands interact with data services (stubbed for now).
 """
 
 from typing import Any, Dict
-import pandas as pd  # For data loading
 from .base import BaseCommand
+from statica.core.config import settings
 from statica.core.context import Context
 from statica.core.exceptions import RuntimeError
+from statica.core.lazy import lazy_import
+from statica.services.file_handler import ColumnStore, is_column_store
+from statica.services.loaders import dataset_name, load_dataset
+from statica.services.streaming import ChunkedDataset, describe_approx
+
+pd = lazy_import("pandas")  # For data loading
 
 class LoadCommand(BaseCommand):
     """Command for loading datasets."""
@@ -18,8 +24,14 @@ class LoadCommand(BaseCommand):
         fname = self.cmd_dict["file"]
         header = self.cmd_dict["header"]
         try:
-            df = pd.read_csv(fname, header=0 if header else None)
-            varname = fname.split("/")[-1].split(".")[0]
+            if self.cmd_dict.get("streaming"):
+                df = ChunkedDataset(fname, header=0 if header else None)
+            elif is_column_store(fname):
+                df = ColumnStore(fname)
+            else:
+                df = load_dataset(fname, header=0 if header else None,
+                                  compact=self.cmd_dict.get("compact", False) or settings.compact)
+            varname = dataset_name(fname)
             context.set_var(varname, df)
             return df
         except Exception as e:
@@ -31,9 +43,14 @@ class DescribeCommand(BaseCommand):
     def execute(self, context: Context) -> Any:
         dataset_name = self.cmd_dict["dataset"]
         df = context.get_var(dataset_name)
-        if not isinstance(df, pd.DataFrame):
+        if self.cmd_dict.get("approx") and isinstance(df, (ChunkedDataset, pd.DataFrame)):
+            desc, _ = describe_approx(df)
+        elif isinstance(df, ChunkedDataset):
+            desc = df.describe()
+        elif isinstance(df, pd.DataFrame):
+            # For now, print description; later use output formatter
+            desc = df.describe(include='all').T.reset_index()
+        else:
             raise RuntimeError(f"'{dataset_name}' is not a dataset.")
-        # For now, print description; later use output formatter
-        desc = df.describe(include='all').T.reset_index()
         print(desc)  # Replace with proper output in future
         return desc
\ No newline at end of file
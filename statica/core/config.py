@@ -0,0 +1,91 @@
+"""Shared configuration for Statica.
+
+This module holds process-wide settings such as the location of the on-disk
+caches. Values can be overridden through environment variables so that
+scripts and batch jobs can be tuned without touching the code.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def cache_dir(*parts: str, create: bool = True) -> Path:
+    """Return (and create) a directory inside the Statica cache root.
+
+    The root defaults to ``~/.cache/statica`` and can be moved with the
+    ``STATICA_CACHE_DIR`` environment variable.
+
+    Args:
+        parts: Optional sub-directory names below the cache root.
+        create: Create the directory if it does not exist.
+
+    Returns:
+        The path of the directory.
+    """
+    root = os.environ.get("STATICA_CACHE_DIR")
+    if root:
+        base = Path(root)
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "statica"
+    path = base.joinpath(*parts)
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Settings:
+    """Process-wide switches, initialised from the environment.
+
+    The CLI overrides these from its command-line options before running a script.
+    """
+
+    def __init__(self) -> None:
+        # Dataset cache mode: "on" (read and write), "off" (bypass) or
+        # "refresh" (ignore existing entries but store fresh copies).
+        self.dataset_cache: str = os.environ.get("STATICA_DATASET_CACHE", "on")
+        self.dataset_cache_max_bytes: int = _env_int("STATICA_DATASET_CACHE_MB", 4096) * 2**20
+        # Files smaller than this are parsed directly; caching them costs more than it saves.
+        self.dataset_cache_min_bytes: int = _env_int("STATICA_DATASET_CACHE_MIN_KB", 1024) * 2**10
+        # Compiled programs stored next to scripts (see parsing.program_cache): "on" or "off".
+        self.program_cache: str = os.environ.get("STATICA_PROGRAM_CACHE", "on")
+        # Result cache for tests and models: "on" or "off".
+        self.result_cache: str = os.environ.get("STATICA_RESULT_CACHE", "on")
+        self.result_cache_max_bytes: int = _env_int("STATICA_RESULT_CACHE_MB", 512) * 2**20
+        # Rows per chunk when a dataset is loaded in streaming mode.
+        self.stream_chunk_rows: int = _env_int("STATICA_STREAM_CHUNK_ROWS", 250_000)
+        # Worker threads running independent statements; 1 executes scripts in order.
+        self.jobs: int = max(1, _env_int("STATICA_JOBS", 1))
+        # Lazy mode: assignments are computed only when a later statement reads them.
+        self.lazy: bool = os.environ.get("STATICA_LAZY", "off") == "on"
+        # Column projection: loads read only the columns the script uses ("on" or "off").
+        self.projection: bool = os.environ.get("STATICA_PROJECTION", "on") != "off"
+        # CSV parser: "auto" (pyarrow's multithreaded reader when installed), "pyarrow" or "c".
+        self.csv_engine: str = os.environ.get("STATICA_CSV_ENGINE", "auto")
+        # Threads reading the files of a `load "parts/*.csv"` pattern.
+        self.load_workers: int = max(1, _env_int("STATICA_LOAD_WORKERS", min(8, (os.cpu_count() or 1) + 4)))
+        # Compact column types for every load, as if each had the `compact` option.
+        self.compact: bool = os.environ.get("STATICA_COMPACT", "off") == "on"
+        # Directory receiving plots that have no `to "file"` (None: show them in a window).
+        self.plot_dir: Optional[str] = os.environ.get("STATICA_PLOT_DIR") or None
+        # Processes rendering plot files; with 1 they are rendered in the statement itself.
+        self.plot_workers: int = _env_int("STATICA_PLOT_WORKERS", min(4, os.cpu_count() or 1))
+        # Scatter plots with more points are drawn as a 2D density grid of this many cells a side.
+        self.plot_max_points: int = _env_int("STATICA_PLOT_MAX_POINTS", 200_000)
+        self.plot_density_bins: int = _env_int("STATICA_PLOT_DENSITY_BINS", 300)
+        # Line plots with more points are decimated (LTTB) to this many.
+        self.plot_line_points: int = _env_int("STATICA_PLOT_LINE_POINTS", 5_000)
+        # `statica serve`: cap on the memory of the datasets held by all sessions.
+        self.serve_memory_bytes: int = _env_int("STATICA_SERVE_MEMORY_MB", 2048) * 2**20
+        # `statica serve`: cap on the number of sessions held at once.
+        self.serve_max_sessions: int = _env_int("STATICA_SERVE_MAX_SESSIONS", 64)
+
+
+settings = Settings()
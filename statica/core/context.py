@@ -4,9 +4,12 @@ This module manages the runtime state, including variables, datasets, and user-p
 It provides methods for safe access and modification of the state.
 """
 
-from typing import Dict, Any, Optional
-import pandas as pd  # Assuming datasets are Pandas DataFrames
+from typing import Dict, Any, List, Optional
 import logging
+from .lazy import Thunk, force, lazy_import
+from statica.services.streaming import ChunkedDataset
+
+pd = lazy_import("pandas")  # Assuming datasets are Pandas DataFrames
 
 logger = logging.getLogger(__name__)
 
@@ -40,14 +43,14 @@ class Context:
             name: The variable name.
 
         Returns:
-            The variable value.
+            The variable value. A deferred value (see `Thunk`) is computed here.
 
         Raises:
             RuntimeError: If the variable does not exist.
         """
         if name not in self.env:
             raise RuntimeError(f"Variable '{name}' not found")
-        return self.env[name]
+        return force(self.env[name])
 
     def var_exists(self, name: str) -> bool:
         """Check if a variable exists in the environment.
@@ -61,15 +64,23 @@ class Context:
         return name in self.env
 
     def dataset_exists(self, name: str) -> bool:
-        """Check if a dataset exists and is a DataFrame.
+        """Check if a dataset exists and is a DataFrame or a streaming dataset.
 
         Args:
             name: The dataset name.
 
         Returns:
-            True if it exists and is a pandas DataFrame, False otherwise.
+            True if it exists and is a pandas DataFrame or ChunkedDataset, False otherwise.
+        """
+        return name in self.env and isinstance(force(self.env[name]), (pd.DataFrame, ChunkedDataset))
+
+    def deferred(self) -> List[str]:
+        """Names still bound to deferred values that nothing has read.
+
+        Returns:
+            Variable names, in assignment order.
         """
-        return name in self.env and isinstance(self.env[name], pd.DataFrame)
+        return [name for name, value in self.env.items() if isinstance(value, Thunk) and not value.forced]
 
     def set_user_table(self, key: str, value: Any) -> None:
         """Set a user-provided table value.
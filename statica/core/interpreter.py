@@ -11,39 +11,76 @@ Feel free to optimize.
 
 import logging
 import os
+from typing import Optional
 from lark import visitors
-import pandas as pd
-import numpy as np
-import scipy.stats as stats
-import matplotlib.pyplot as plt
-from tabulate import tabulate
 
+from statica.core import profiler, scheduler
+from statica.core.config import settings
 from statica.core.exceptions import RuntimeError
 from statica.core.context import Context
+from statica.core.lazy import Thunk, lazy_import
+from statica.services.file_handler import ColumnStore, is_column_store
+from statica.services.loaders import load_dataset
+from statica.services.streaming import ChunkedDataset, describe_approx
 
+# imported on first use, see core.lazy
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+tabulate = lazy_import("tabulate")
 
 
 logger = logging.getLogger(__name__)
 
 class Interpreter(visitors.Interpreter):
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, jobs: Optional[int] = None, lazy: Optional[bool] = None,
+                 profile: Optional[profiler.Profiler] = None):
         self.context = context
+        # worker threads for independent statements, see core.scheduler
+        self.jobs = jobs if jobs is not None else settings.jobs
+        # lazy mode: loads are bound as thunks and read only when used (see Context.deferred)
+        self.lazy = lazy if lazy is not None else settings.lazy
+        # records every statement when set (see core.profiler)
+        self.profiler = profile
 
     def interpret(self, ast):
+        visit = self.visit if self.profiler is None else self._profiled_visit
+        if self.jobs > 1:
+            trees = {id(tree.children[0]): tree for tree in ast}
+            scheduler.run([tree.children[0] for tree in ast],
+                          lambda cmd: visit(trees[id(cmd)]), self.jobs)
+            return
         for tree in ast:
+            visit(tree)
+
+    def _profiled_visit(self, tree):
+        cmd = tree.children[0]
+        with self.profiler.statement(scheduler.statement_label(cmd), shape=lambda: self._shape(cmd)):
             self.visit(tree)
 
+    def _shape(self, cmd):
+        # rows and columns a statement worked on, without forcing deferred values
+        def bound(name):
+            value = self.context.env.get(name)
+            if isinstance(value, Thunk):
+                return value.force() if value.forced else None
+            return value
+        return profiler.shape_of(cmd, bound)
+
     def statement(self, tree):
         current_child = tree.children[0]
-        stmt_type = current_child['cmd']
+        handler = self.STATEMENTS.get(current_child['cmd'])
+        if handler is not None:
+            handler(self, current_child)
+
+    def _assign_cmd(self, cmd):
+        self.assign(cmd['name'], cmd['expr'])
+
+    def _describe_cmd(self, cmd):
+        # later maybe describe can handle more than just a dataset.
+        self.describe_stmt(cmd['dataset'], approx=cmd.get('approx', False))
 
-        if stmt_type == 'assign':
-            var_name = current_child['name']
-            expr = current_child['expr']
-            self.assign(var_name, expr)
-        if stmt_type == 'describe':
-            # later maybe describe can handle more than just a dataset.
-            self.describe_stmt(current_child['dataset'])
+    # statement kind -> handler; other statements are not run by this interpreter yet
+    STATEMENTS = {'assign': _assign_cmd, 'describe': _describe_cmd}
 
 
     def assign(self, var_name, expr):
@@ -55,28 +92,46 @@ class Interpreter(visitors.Interpreter):
         if isinstance(expr, dict) and 'cmd' in expr:
             ctype = expr['cmd']
             if ctype == "load":
-                loaded_data = self.load_stmt(file=expr['file'], header=expr['header'])
-                self.context.set_var(var_name, loaded_data)
+                load = lambda: self.load_stmt(file=expr['file'], header=expr['header'],
+                                              streaming=expr.get('streaming', False),
+                                              compact=expr.get('compact', False))
+                self.context.set_var(var_name, Thunk(load, label=var_name) if self.lazy else load())
             elif ctype == "ttest":
                 #code below if from the original codebase no change done
                 #except how the variable data is obtianed (we use context manager)
                 self.context.set_var(var_name, expr)
 
-    def load_stmt(self, file: str, header:bool):
+    def load_stmt(self, file: str, header:bool, streaming: bool = False, compact: bool = False):
         # move this into a single utility function
         # used in the interpreter and validator
         data = None
         base_dir = self.context.base_dir
         full_path = os.path.join(base_dir, file)
-        # later add support for additional files and 
-        # methods to try handling unknown formats with "tried-our-best" approach.:)
-        data = pd.read_csv(full_path, header=0 if header else "infer") # code-snippet from the original codebase
+        # the file format (CSV, Parquet, Feather, JSON Lines, compressed CSV) is
+        # picked from the extension, then the content (see services.formats)
+        if streaming:
+            # rows are only read chunk by chunk by the commands using the dataset
+            return ChunkedDataset(full_path, header=0 if header else "infer")
+        if is_column_store(full_path):
+            # memory-mapped, nothing to parse
+            return ColumnStore(full_path)
+        data = load_dataset(full_path, header=0 if header else "infer",
+                            compact=compact or settings.compact) # code-snippet from the original codebase
         return data
     
-    def describe_stmt(self, var_name):
+    def describe_stmt(self, var_name, approx: bool = False):
         #decribe the dataset with freq, mean, min, max like basic pandas describe stuff.
         #future maybe add a feature to show in a gui as well instead of just printing to the console.
         df = self.context.get_var(var_name)
-        # code-snippet from the original codebase
-        desc = df.describe(include='all').T.reset_index()
-        print(tabulate(desc, headers="keys", tablefmt="github", showindex=False))
+        if approx:
+            desc, note = describe_approx(df)
+            print(tabulate.tabulate(desc, headers="keys", tablefmt="github", showindex=False))
+            if note:
+                print(note)
+            return
+        if isinstance(df, ChunkedDataset):
+            desc = df.describe()
+        else:
+            # code-snippet from the original codebase
+            desc = df.describe(include='all').T.reset_index()
+        print(tabulate.tabulate(desc, headers="keys", tablefmt="github", showindex=False))
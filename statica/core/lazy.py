@@ -0,0 +1,109 @@
+"""Deferred imports and values for Statica.
+
+Importing the scientific stack (pandas, scipy, statsmodels, matplotlib) takes
+seconds, while a script that only loads and describes a dataset needs a
+fraction of it. Modules bound through `lazy_import` are imported the first
+time one of their attributes is used, so each command only pays for the
+libraries it actually touches.
+
+Example:
+    pd = lazy_import("pandas")
+    pd.read_csv(...)   # pandas is imported here, not at module load
+
+`Thunk` applies the same idea to values: in lazy mode an assignment binds
+its name to a thunk, and the work runs only if a later statement reads it.
+"""
+
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Callable
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    # __import__ (unlike importlib.import_module) goes through the
+                    # regular import statement machinery, so the load shows up
+                    # in `python -X importtime` reports.
+                    __import__(self.__name__)
+                    module = sys.modules[self.__name__]
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for module `name` that is imported on first use.
+
+    Args:
+        name: Dotted module name, e.g. ``"scipy.stats"``.
+
+    Returns:
+        A LazyModule standing in for the module.
+    """
+    return LazyModule(name)
+
+
+def is_loaded(module: ModuleType) -> bool:
+    """Tell whether a (possibly lazy) module has actually been imported."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+
+class Thunk:
+    """A value computed on first use.
+
+    `force` runs the computation once, even when several threads ask for the
+    value at the same time, and returns the cached result afterwards.
+    """
+
+    def __init__(self, compute: Callable[[], Any], label: str = "") -> None:
+        self.label = label
+        self._compute = compute
+        self._value = None
+        self._forced = False
+        self._lock = threading.Lock()
+
+    @property
+    def forced(self) -> bool:
+        return self._forced
+
+    def force(self) -> Any:
+        if not self._forced:
+            with self._lock:
+                if not self._forced:
+                    self._value = self._compute()
+                    self._compute = None
+                    self._forced = True
+        return self._value
+
+    def __repr__(self) -> str:
+        state = "forced" if self._forced else "deferred"
+        return f"<thunk {self.label!r} ({state})>"
+
+
+def force(value: Any) -> Any:
+    """Return `value`, computing it first if it is a Thunk."""
+    return value.force() if isinstance(value, Thunk) else value
@@ -0,0 +1,69 @@
+"""
+Per-thread redirection of standard output.
+
+Statica commands report by printing. When statements run on worker threads
+(see `scheduler`) or several server requests are handled at once (see
+`statica.server`), each thread's output has to be collected separately.
+`redirect` routes whatever the current thread prints to a buffer, while
+other threads keep writing wherever they wrote before.
+"""
+
+import contextlib
+import io
+import sys
+import threading
+from typing import Optional
+
+
+class ThreadOutput(io.TextIOBase):
+    """sys.stdout replacement sending each thread's output to its own buffer."""
+
+    def __init__(self, target) -> None:
+        self.target = target
+        self.local = threading.local()
+
+    def current(self) -> Optional[io.StringIO]:
+        """Buffer of the calling thread, or None when it writes to the target."""
+        return getattr(self.local, "buffer", None)
+
+    def write(self, text: str) -> int:
+        buf = self.current()
+        return (buf if buf is not None else self.target).write(text)
+
+    def flush(self) -> None:
+        if self.current() is None:
+            self.target.flush()
+
+    @property
+    def encoding(self):
+        return getattr(self.target, "encoding", "utf-8")
+
+    def isatty(self) -> bool:
+        return self.current() is None and self.target.isatty()
+
+
+_install_lock = threading.Lock()
+
+
+def thread_output() -> ThreadOutput:
+    """Install a ThreadOutput as sys.stdout (once) and return it."""
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadOutput):
+            sys.stdout = ThreadOutput(sys.stdout)
+        return sys.stdout
+
+
+@contextlib.contextmanager
+def redirect(buffer: Optional[io.StringIO]):
+    """Send what the current thread prints to `buffer` (None: the real stdout).
+
+    Args:
+        buffer: Destination of the output.
+    """
+    out = thread_output()
+    previous = out.current()
+    out.local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        out.local.buffer = previous
@@ -0,0 +1,287 @@
+"""
+Per-statement profiling for Statica scripts.
+
+``statica script.sta --profile`` prints, after the run, the statements
+ranked by wall time; ``--trace run.json`` writes the run in the Chrome
+trace-event format (open it in ``chrome://tracing`` or ui.perfetto.dev).
+For every statement the profiler records:
+
+- wall time, and CPU time of the thread that ran it;
+- peak memory allocated while it ran, above what was allocated when it
+  started (tracemalloc, which also sees numpy and pandas buffers);
+- rows and columns of the datasets it read or wrote;
+- dataset and result cache hits and misses.
+
+The scientific modules a script needs are imported up front, each in its own
+``import`` row, so their import time is not charged to whichever statement
+happens to touch them first. Statements deferred by lazy mode are recorded
+when a later statement forces them, nested inside it. With ``-j N`` statements running at the same time
+share one tracemalloc peak, so their memory figures overlap.
+
+When no profiler is running the runtime does not wrap its dispatch at all,
+and the cache hooks (`count`) cost one global lookup.
+"""
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from statica.core.lazy import lazy_import
+
+tabulate = lazy_import("tabulate")
+
+# the profiler of the running script, if any (see `count`)
+_active: Optional["Profiler"] = None
+
+
+def count(event: str, n: int = 1) -> None:
+    """Count an event (``"result_cache_hit"``, ...) against the running statement.
+
+    Does nothing unless a profiler is running.
+    """
+    prof = _active
+    if prof is not None:
+        prof.count(event, n)
+
+
+class Record:
+    """Measurements of one statement."""
+
+    __slots__ = ("label", "kind", "thread", "depth", "start", "wall", "cpu",
+                 "peak_bytes", "rows", "cols", "counters")
+
+    def __init__(self, label: str, kind: str, thread: int, depth: int, start: float) -> None:
+        self.label = label
+        self.kind = kind
+        self.thread = thread
+        self.depth = depth
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_bytes: Optional[int] = None
+        self.rows: Optional[int] = None
+        self.cols: Optional[int] = None
+        self.counters: Dict[str, int] = {}
+
+    def cache(self, outcome: str) -> int:
+        """Hits (``"hit"``) or misses (``"miss"``) over both caches."""
+        return sum(n for event, n in self.counters.items() if event.endswith("_" + outcome))
+
+
+class _Frame:
+    __slots__ = ("record", "cpu0", "base", "peak")
+
+    def __init__(self, record: Record, cpu0: float) -> None:
+        self.record = record
+        self.cpu0 = cpu0
+        self.base = 0
+        self.peak = 0
+
+
+class Profiler:
+    """Records statements run between `start` and `stop`.
+
+    Args:
+        memory: Track peak memory with tracemalloc. Tracing allocations slows
+            allocation-heavy statements down, and only a profiler asked for
+            memory figures turns it on.
+    """
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory = memory
+        self.records: List[Record] = []
+        self.totals: Dict[str, int] = {}
+        self.peak_bytes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._t0 = 0.0
+        self._wall = 0.0
+        self._cpu0 = 0.0
+        self._cpu = 0.0
+        self._started_tracemalloc = False
+
+    def start(self) -> "Profiler":
+        global _active
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        _active = self
+        return self
+
+    def stop(self) -> None:
+        global _active
+        if _active is self:
+            _active = None
+        self._wall = time.perf_counter() - self._t0
+        self._cpu = time.process_time() - self._cpu0
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def statement(self, label: str, kind: str = "statement",
+                  shape: Optional[Callable[[], Tuple[Optional[int], Optional[int]]]] = None) -> Iterator[Record]:
+        """Measure the statement run inside the ``with`` block.
+
+        Args:
+            label: Text shown in the table and the trace.
+            kind: Trace category (``"statement"``, ``"forced"``, ``"parse"``, ...).
+            shape: Called afterwards for the (rows, columns) the statement worked on.
+        """
+        stack = self._stack()
+        thread = threading.get_ident()
+        with self._lock:
+            self._threads.setdefault(thread, threading.current_thread().name)
+        record = Record(label, kind, thread, len(stack), time.perf_counter() - self._t0)
+        frame = _Frame(record, time.thread_time())
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # the peak so far belongs to the enclosing statement
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame.base = frame.peak = current
+        stack.append(frame)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record.wall = time.perf_counter() - self._t0 - record.start
+            record.cpu = time.thread_time() - frame.cpu0
+            if self.memory and tracemalloc.is_tracing():
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                record.peak_bytes = frame.peak - frame.base
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, frame.peak)
+            if shape is not None:
+                try:
+                    record.rows, record.cols = shape()
+                except Exception:
+                    # a statement that failed may have left nothing to measure
+                    pass
+            with self._lock:
+                self.records.append(record)
+                self.peak_bytes = max(self.peak_bytes, frame.peak)
+
+    def preload(self, modules: Iterable[str]) -> None:
+        """Import `modules` now, each measured as an ``import`` row.
+
+        Modules that are already imported are skipped.
+        """
+        for module in modules:
+            if module not in sys.modules:
+                with self.statement(f"import {module}", kind="import"):
+                    importlib.import_module(module)
+
+    def count(self, event: str, n: int = 1) -> None:
+        """Count an event against the innermost statement of this thread."""
+        stack = self._stack()
+        if stack:
+            counters = stack[-1].record.counters
+            counters[event] = counters.get(event, 0) + n
+        with self._lock:
+            self.totals[event] = self.totals.get(event, 0) + n
+
+    def report(self, limit: Optional[int] = None) -> str:
+        """The statements ranked by wall time, and a totals line."""
+        rows = []
+        for rank, rec in enumerate(sorted(self.records, key=lambda r: r.wall, reverse=True)[:limit], 1):
+            hits, misses = rec.cache("hit"), rec.cache("miss")
+            rows.append({
+                "#": rank,
+                "statement": rec.label + (" (forced)" if rec.kind == "forced" else ""),
+                "wall s": f"{rec.wall:.3f}",
+                "cpu s": f"{rec.cpu:.3f}",
+                "peak MB": "" if rec.peak_bytes is None else f"{rec.peak_bytes / 2**20:.1f}",
+                "rows": "" if rec.rows is None else f"{rec.rows:,}",
+                "cols": "" if rec.cols is None else rec.cols,
+                "cache hit/miss": f"{hits}/{misses}" if hits or misses else "",
+            })
+        table = tabulate.tabulate(rows, headers="keys", tablefmt="github") if rows else "(no statements)"
+        total = f"[profile] {self._wall:.3f} s wall, {self._cpu:.3f} s CPU"
+        if self.memory:
+            total += f", peak {self.peak_bytes / 2**20:.1f} MB traced"
+        for cache in ("dataset", "result"):
+            hits, misses = self.totals.get(f"{cache}_cache_hit", 0), self.totals.get(f"{cache}_cache_miss", 0)
+            if hits or misses:
+                total += f"; {cache} cache {hits} hit(s), {misses} miss(es)"
+        return f"{table}\n{total}"
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """The run as Chrome trace events (complete events, microseconds)."""
+        pid = os.getpid()
+        tids = {thread: i for i, thread in enumerate(self._threads)}
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[t], "args": {"name": name}}
+            for t, name in self._threads.items()
+        ]
+        for rec in sorted(self.records, key=lambda r: r.start):
+            args: Dict[str, Any] = {"cpu_ms": round(rec.cpu * 1e3, 3)}
+            if rec.peak_bytes is not None:
+                args["peak_bytes"] = rec.peak_bytes
+            if rec.rows is not None:
+                args["rows"] = rec.rows
+            if rec.cols is not None:
+                args["cols"] = rec.cols
+            args.update(rec.counters)
+            events.append({"name": rec.label, "cat": rec.kind, "ph": "X", "pid": pid,
+                           "tid": tids[rec.thread], "ts": round(rec.start * 1e6, 1),
+                           "dur": round(rec.wall * 1e6, 1), "args": args})
+        return events
+
+    def write_trace(self, path: str) -> None:
+        """Write the run as a Chrome trace-event JSON file."""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, fh)
+
+
+def shape_of(cmd: Dict[str, Any], lookup: Callable[[str], Any]) -> Tuple[Optional[int], Optional[int]]:
+    """Rows and columns a statement worked on.
+
+    Rows are those of the largest dataset it read or wrote; columns are the
+    ones it used (every column for a load or `describe`).
+
+    Args:
+        cmd: The statement.
+        lookup: Value bound to a name, without forcing deferred values.
+    """
+    # imported here: projection imports the loaders, which report to this module
+    from statica.core import projection, scheduler
+
+    expr = cmd.get("expr") if cmd.get("cmd") == "assign" else cmd
+    uses = (projection.column_uses(expr) if isinstance(expr, dict) else None) or {}
+    if isinstance(expr, dict) and expr.get("cmd") == "load":
+        for name in scheduler.accesses(cmd)[1]:
+            uses[name] = projection.ALL
+    rows: Optional[int] = None
+    cols: Optional[int] = None
+    for name, columns in uses.items():
+        ds = lookup(name)
+        if not hasattr(ds, "columns"):
+            continue
+        n = len(ds) if hasattr(ds, "__len__") else None
+        if n is not None:
+            rows = max(rows or 0, n)
+        cols = (cols or 0) + (len(ds.columns) if columns is projection.ALL else len(columns))
+    return rows, cols
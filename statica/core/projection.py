@@ -0,0 +1,164 @@
+"""
+Column projection pushdown for Statica scripts.
+
+Statements only ever touch a few columns of a dataset: the target and `by`
+columns of a test, the terms of a regression, the operands of a plot.
+`push_down` walks a parsed script before it runs, follows every dataset
+from the `load` that produces it through aliases to the statements that read
+it, and records on the load the columns they need. The runtime then reads
+only those columns from the file (see `select`).
+
+A load keeps all its columns when anything reads the dataset as a whole
+(`describe`, a statement the analysis does not know) or when nothing reads
+it at all. Streaming loads are left alone; they already read only the
+columns each pass needs.
+"""
+
+import fnmatch
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from statica.core.scheduler import accesses, split_var
+from statica.services.loaders import dataset_name
+
+# marks a load whose dataset is needed with all its columns
+ALL = None
+
+
+def _is_pattern(name: str) -> bool:
+    # the wildcards COLUMN_PATTERN accepts; "[" already opens a column list
+    return any(ch in name for ch in "*?")
+
+
+def _term_name(term: Any) -> str:
+    return str(term.children[0]) if hasattr(term, "children") else str(term)
+
+
+def column_uses(cmd: Dict[str, Any]) -> Optional[Dict[str, Optional[Set[str]]]]:
+    """Columns a statement reads, by dataset name (ALL for the whole dataset).
+
+    Returns None for statements the analysis does not understand.
+    """
+    c = cmd.get("cmd")
+    if c == "ttest":
+        target = cmd["target"]
+        cols = set(target["columns"]) if "columns" in target else {target["column"]}
+        if cmd.get("by"):
+            cols.add(cmd["by"])
+        return {target["dataset"]: cols}
+    if c == "regress":
+        return {cmd["dataset"]: {cmd["dep"], *(_term_name(t) for t in cmd["predictors"])}}
+    if c == "plot":
+        x_ds, x_col = split_var(cmd.get("x"))
+        y_ds, y_col = split_var(cmd.get("y")) if cmd.get("y") is not None else (None, None)
+        # a bare column name refers to the dataset named by the other operand
+        default = cmd.get("dataset") or x_ds or y_ds
+        uses: Dict[str, Optional[Set[str]]] = {}
+        for ds, col in ((x_ds or default, x_col), (y_ds or default, y_col)):
+            if ds and col is not None:
+                uses.setdefault(ds, set()).add(col)
+        return uses
+    if c == "describe":
+        return {cmd["dataset"]: ALL}
+    if c in ("conclude", "ask_table"):
+        # read results and the terminal, not datasets
+        return {}
+    return None
+
+
+def _load_of(cmd: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # the load expression a statement binds, if it is a non-streaming load
+    c = cmd.get("cmd")
+    if c == "load":
+        load = cmd
+    elif c == "assign" and isinstance(cmd["expr"], dict) and cmd["expr"].get("cmd") == "load":
+        load = cmd["expr"]
+    else:
+        return None
+    return None if load.get("streaming") else load
+
+
+def push_down(cmds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Record on every load the columns the rest of the script reads.
+
+    Loads that can be projected get a ``columns`` list of column names and
+    wildcard patterns; the others are returned unchanged. The input dicts are
+    left untouched.
+
+    Args:
+        cmds: Statements in script order.
+
+    Returns:
+        The statements, with the projectable loads replaced by annotated copies.
+    """
+    # name -> index of the load statement whose dataset it is bound to
+    bound: Dict[str, int] = {}
+    needs: Dict[int, Optional[Set[str]]] = {}
+
+    def use(name: str, cols: Optional[Set[str]]) -> None:
+        src = bound.get(name)
+        if src is None:
+            return
+        if cols is ALL or needs[src] is ALL:
+            needs[src] = ALL
+        else:
+            needs[src] |= cols
+
+    for i, cmd in enumerate(cmds):
+        if _load_of(cmd) is not None:
+            name = dataset_name(cmd["file"]) if cmd["cmd"] == "load" else cmd["name"]
+            bound[name] = i
+            needs[i] = set()
+            continue
+        expr = cmd.get("expr")
+        if cmd.get("cmd") == "assign" and isinstance(expr, str) and expr in bound:
+            # an alias: its uses are uses of the aliased dataset
+            bound[cmd["name"]] = bound[expr]
+            continue
+        if cmd.get("cmd") == "assign":
+            uses = column_uses(expr) if isinstance(expr, dict) and "cmd" in expr else {}
+        else:
+            uses = column_uses(cmd)
+        if uses is None:
+            # unknown effects: keep every dataset bound so far whole
+            for src in bound.values():
+                needs[src] = ALL
+        else:
+            for name, cols in uses.items():
+                use(name, cols)
+        # whatever the statement binds no longer refers to a loaded dataset
+        for name in accesses(cmd)[1]:
+            bound.pop(name, None)
+
+    out = list(cmds)
+    for i, cols in needs.items():
+        if not cols:
+            # ALL, or never read: nothing to gain from guessing
+            continue
+        columns = sorted(cols)
+        if out[i]["cmd"] == "load":
+            out[i] = dict(out[i], columns=columns)
+        else:
+            out[i] = dict(out[i], expr=dict(out[i]["expr"], columns=columns))
+    return out
+
+
+def select(header: Iterable[Any], wanted: Iterable[str]) -> Optional[List[Any]]:
+    """Columns of a file to read, in file order.
+
+    Args:
+        header: Column names of the file.
+        wanted: Names and wildcard patterns recorded by `push_down`.
+
+    Returns:
+        The matching columns, or None when the projection would keep every
+        column or match none (read the file whole; statements that name a
+        missing column then report it as usual).
+    """
+    header = list(header)
+    names = {w for w in wanted if not _is_pattern(w)}
+    patterns = [w for w in wanted if _is_pattern(w)]
+    cols = [c for c in header
+            if str(c) in names or any(fnmatch.fnmatchcase(str(c), p) for p in patterns)]
+    if not cols or len(cols) == len(header):
+        return None
+    return cols
@@ -0,0 +1,296 @@
+"""
+Dependency-graph scheduling of Statica statements.
+
+`plan` reads the parsed command dicts, works out which names every statement
+reads and writes, and links each statement to the earlier statements it
+conflicts with (read-after-write, write-after-write and write-after-read).
+`run` executes that graph on a thread pool: a statement starts as soon as the
+statements it depends on have finished, and whatever it prints is captured
+and written out in script order.
+
+Statements that touch process-global state claim a pseudo-resource instead
+of a variable name, so they never overlap with each other: `PLOT` for
+matplotlib's pyplot state machine and `CONSOLE` for interactive input.
+Statements the planner does not understand act as barriers. Barriers run on
+the calling thread, which is also where interactive statements belong:
+`ask_table` and plots shown in a window (GUI backends only work on the
+main thread), so both are barriers.
+"""
+
+import io
+import logging
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from statica.core.config import settings
+from statica.core.output import redirect, thread_output
+from statica.services.loaders import dataset_name
+
+logger = logging.getLogger(__name__)
+
+PLOT = "@plot"
+CONSOLE = "@console"
+
+
+class Node:
+    """One statement of the plan."""
+
+    def __init__(self, index: int, cmd: Dict[str, Any], reads: Set[str],
+                 writes: Set[str], barrier: bool = False) -> None:
+        self.index = index
+        self.cmd = cmd
+        self.reads = reads
+        self.writes = writes
+        self.barrier = barrier
+        self.deps: Set[int] = set()
+
+    def __repr__(self) -> str:
+        return f"<Node {self.index} {self.cmd.get('cmd')} reads={sorted(self.reads)} writes={sorted(self.writes)}>"
+
+
+def split_var(var: Any):
+    """Split a plot operand into (dataset or None, column).
+
+    Operands are ``dataset.column`` (a Tree or list of names) or a bare
+    column name.
+    """
+    parts = getattr(var, "children", var)
+    if isinstance(parts, (list, tuple)):
+        return (str(parts[0]) if len(parts) > 1 else None), str(parts[-1])
+    return None, str(var)
+
+
+def _var_dataset(var: Any) -> Optional[str]:
+    return split_var(var)[0] if var is not None else None
+
+
+def accesses(cmd: Dict[str, Any]):
+    """Return (reads, writes, barrier) of a single command dict.
+
+    Args:
+        cmd: A statement as produced by the parser.
+
+    Returns:
+        The set of names read, the set of names written, and whether the
+        statement must run alone (interactive, or effects unknown).
+    """
+    c = cmd.get("cmd")
+    if c == "load":
+        return set(), {dataset_name(cmd["file"])}, False
+    if c == "describe":
+        return {cmd["dataset"]}, set(), False
+    if c == "ttest":
+        reads = {cmd["target"]["dataset"]}
+        return reads, {cmd["store_as"]} if cmd.get("store_as") else set(), False
+    if c == "regress":
+        reads = {cmd["dataset"]}
+        return reads, {cmd["store_as"]} if cmd.get("store_as") else set(), False
+    if c == "assign":
+        expr = cmd["expr"]
+        if isinstance(expr, dict) and "cmd" in expr:
+            if expr["cmd"] == "load":
+                return set(), {cmd["name"]}, False
+            reads, _, barrier = accesses(expr)
+        elif isinstance(expr, str):
+            reads, barrier = {expr}, False
+        else:
+            reads, barrier = set(), False
+        return reads, {cmd["name"]}, barrier
+    if c == "plot":
+        reads = {d for d in (cmd.get("dataset"), _var_dataset(cmd.get("x")), _var_dataset(cmd.get("y"))) if d}
+        # without a file the plot opens a window, which must happen on the main thread
+        interactive = cmd.get("output") is None and not settings.plot_dir
+        return reads, {PLOT}, interactive
+    if c == "conclude":
+        return {cmd["name"]}, set(), False
+    if c == "ask_table":
+        # prompts the user, so it runs alone with the terminal to itself
+        return set(), {CONSOLE}, True
+    return set(), set(), True
+
+
+def statement_label(cmd: Dict[str, Any]) -> str:
+    """Short Statica-like rendering of a statement, for reports."""
+    c = cmd.get("cmd")
+    if c == "assign":
+        expr = cmd["expr"]
+        rhs = statement_label(expr) if isinstance(expr, dict) and "cmd" in expr else str(expr)
+        return f"{cmd['name']} = {rhs}"
+    if c == "load":
+        return f'load "{cmd["file"]}"'
+    if c == "ttest":
+        target = cmd["target"]
+        cols = target.get("column") or "[" + ", ".join(target.get("columns", [])) + "]"
+        text = f"test ttest mean of {target['dataset']}.{cols}"
+        if cmd.get("by"):
+            text += f" by {cmd['by']}"
+            if cmd.get("compare"):
+                # as written in the script: "pairwise" or "vs rest"
+                text += " " + cmd["compare"].replace("-", " ")
+        if cmd.get("against") is not None:
+            text += f" against {cmd['against']}"
+        return text
+    if c == "regress":
+        terms = [str(t.children[0]) if hasattr(t, "children") else str(t) for t in cmd["predictors"]]
+        return f"regress {cmd['dep']} ~ {' + '.join(terms)} on {cmd['dataset']}"
+    if c == "describe":
+        return f"describe {cmd['dataset']}" + (" approx" if cmd.get("approx") else "")
+    if c == "plot":
+        operands = " vs ".join(".".join(str(p) for p in split_var(v) if p is not None)
+                               for v in (cmd.get("x"), cmd.get("y")) if v is not None)
+        return f"plot {operands} {cmd.get('kind')}"
+    if c == "conclude":
+        return f"conclude {cmd['name']}"
+    return str(c)
+
+
+def assign_store_keys(cmds: List[Dict[str, Any]], existing: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """Give bare `test` and `regress` statements the name they are stored under.
+
+    The runtime names these results after the size of the environment at the
+    time they run (``ttest_3``). Under parallel execution that size depends on
+    timing, so the names are fixed up front by replaying the script in order,
+    starting from the `existing` names of the environment. The input dicts
+    are left untouched.
+    """
+    names: Set[str] = set(existing)
+    out = []
+    for cmd in cmds:
+        c = cmd.get("cmd")
+        if c in ("ttest", "regress") and not cmd.get("store_as"):
+            cmd = dict(cmd, store_as=f"{c}_{len(names)}")
+        _, writes, _ = accesses(cmd)
+        names.update(w for w in writes if not w.startswith("@"))
+        out.append(cmd)
+    return out
+
+
+def plan(cmds: List[Dict[str, Any]]) -> List[Node]:
+    """Build the dependency graph of a script.
+
+    Args:
+        cmds: Statements in script order (store keys already assigned).
+
+    Returns:
+        One `Node` per statement, with `deps` holding the indices of the
+        statements that must finish first.
+    """
+    nodes: List[Node] = []
+    last_writer: Dict[str, int] = {}
+    readers: Dict[str, Set[int]] = {}
+    last_barrier: Optional[int] = None
+    for i, cmd in enumerate(cmds):
+        reads, writes, barrier = accesses(cmd)
+        node = Node(i, cmd, reads, writes, barrier)
+        if barrier:
+            node.deps.update(range(last_barrier + 1 if last_barrier is not None else 0, i))
+            last_barrier = i
+        elif last_barrier is not None:
+            node.deps.add(last_barrier)
+        for name in reads:
+            if name in last_writer:
+                node.deps.add(last_writer[name])
+        for name in writes:
+            if name in last_writer:
+                node.deps.add(last_writer[name])
+            node.deps.update(readers.get(name, ()))
+        for name in reads:
+            readers.setdefault(name, set()).add(i)
+        for name in writes:
+            last_writer[name] = i
+            readers[name] = set()
+        node.deps.discard(i)
+        nodes.append(node)
+    return nodes
+
+
+def run(cmds: List[Dict[str, Any]], dispatch: Callable[[Dict[str, Any]], Any], jobs: int) -> None:
+    """Execute statements on `jobs` worker threads, respecting their dependencies.
+
+    Output is replayed in script order. Barriers (including interactive
+    statements) start only after everything before them has been printed, run
+    on the calling thread and write to the caller's output directly. If a statement raises, statements after
+    it are not started and the exception is re-raised once everything before
+    it has been printed.
+
+    Args:
+        cmds: Statements in script order, with store keys assigned.
+        dispatch: Callable running a single statement.
+        jobs: Number of worker threads.
+    """
+    nodes = plan(cmds)
+    dependents: Dict[int, List[int]] = {n.index: [] for n in nodes}
+    waiting = {n.index: len(n.deps) for n in nodes}
+    for n in nodes:
+        for d in n.deps:
+            dependents[d].append(n.index)
+
+    # barriers write where the caller's output goes (a terminal or a server response)
+    parent = thread_output().current()
+    buffers: Dict[int, io.StringIO] = {n.index: io.StringIO() for n in nodes}
+    errors: Dict[int, BaseException] = {}
+    finished: Set[int] = set()
+    next_out = 0
+
+    def task(node: Node) -> None:
+        with redirect(parent if node.barrier else buffers[node.index]):
+            dispatch(node.cmd)
+
+    def drain() -> Optional[BaseException]:
+        nonlocal next_out
+        while next_out in finished:
+            sys.stdout.write(buffers[next_out].getvalue())
+            sys.stdout.flush()
+            err = errors.get(next_out)
+            next_out += 1
+            if err is not None:
+                return err
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="statica") as pool:
+        running = {}
+        # ready barriers; a barrier depends on every earlier statement, so
+        # nothing else is running when it is started here
+        inline: List[Node] = []
+
+        def start(node: Node) -> None:
+            if node.barrier:
+                inline.append(node)
+            else:
+                running[pool.submit(task, node)] = node
+
+        for n in nodes:
+            if waiting[n.index] == 0:
+                start(n)
+        while running or inline:
+            completed = []
+            if inline and not running:
+                node = inline.pop(0)
+                try:
+                    task(node)
+                except Exception as e:
+                    errors[node.index] = e
+                completed.append(node)
+                finished.add(node.index)
+            else:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    node = running.pop(fut)
+                    completed.append(node)
+                    finished.add(node.index)
+                    if fut.exception() is not None:
+                        errors[node.index] = fut.exception()
+            err = drain()
+            if err is not None:
+                for fut in running:
+                    fut.cancel()
+                wait(running)
+                raise err
+            # after a failure only statements before it still need to run
+            limit = min(errors) if errors else len(nodes)
+            for node in completed:
+                for j in dependents[node.index]:
+                    waiting[j] -= 1
+                    if waiting[j] == 0 and j < limit:
+                        start(nodes[j])
@@ -72,6 +72,53 @@ def generate_conclusion(result, alpha=0.05, ask_table=None):
         print("\n============================\n")
         return None
 
+    # Many groups (pairwise or each-vs-rest)
+    if isinstance(result, dict) and result.get("kind") == "multi-group":
+        table = result["table"]
+        mode = "pairwise" if result["mode"] == "pairwise" else "each-vs-rest"
+        sig = table[table["p_holm"] < alpha].sort_values("p_holm")
+        lines = []
+        lines.append(f"Compared the mean of '{result['column']}' across {result['n_groups']} groups of "
+                     f"'{result['by']}' with {len(table)} {mode} Welch t-tests.")
+        if result.get("skipped_groups"):
+            lines.append(f"{result['skipped_groups']} group(s) with fewer than 2 observations were left out.")
+        lines.append(f"{len(sig)} of {len(table)} comparisons are statistically significant at alpha={alpha} "
+                     f"after Holm correction.")
+        print("\n=== Conclusion (Statica) ===\n")
+        print(textwrap.fill(" ".join(lines), width=100))
+        if len(sig):
+            print("\nStrongest differences:")
+            for row in sig.head(10).itertuples(index=False):
+                print(f"  '{row.group1}' vs '{row.group2}': diff = {row.diff:.2f} "
+                      f"(95% CI [{row.ci_low:.2f}, {row.ci_high:.2f}]), t = {row.t:.2f}, "
+                      f"p(Holm) = {_format_p(row.p_holm)}, d = {row.d:.2f}")
+            if len(sig) > 10:
+                print(f"  ... and {len(sig) - 10} more")
+        print("\n============================\n")
+        return None
+
+    # Many columns against the same value
+    if isinstance(result, dict) and result.get("kind") == "batch-one-sample":
+        table = result["table"]
+        mu = result["mu"]
+        sig = table[table["p_holm"] < alpha].sort_values("p_holm")
+        lines = []
+        lines.append(f"One-sample t-tests compared the mean of {len(table)} columns to {mu}.")
+        lines.append(f"{len(sig)} of {len(table)} column means differ from {mu} at alpha={alpha} "
+                     f"after Holm correction.")
+        print("\n=== Conclusion (Statica) ===\n")
+        print(textwrap.fill(" ".join(lines), width=100))
+        if len(sig):
+            print("\nStrongest differences:")
+            for row in sig.head(10).itertuples(index=False):
+                print(f"  '{row.column}': mean = {row.mean:.2f} (n={row.n}), diff = {row.diff:.2f} "
+                      f"(95% CI [{row.ci_low:.2f}, {row.ci_high:.2f}]), t = {row.t:.2f}, "
+                      f"p(Holm) = {_format_p(row.p_holm)}")
+            if len(sig) > 10:
+                print(f"  ... and {len(sig) - 10} more")
+        print("\n============================\n")
+        return None
+
     # One-sample
     if isinstance(result, dict) and result.get("kind") == "one-sample":
         mean = result["mean"]
@@ -96,11 +143,15 @@ def generate_conclusion(result, alpha=0.05, ask_table=None):
         print("\n============================\n")
         return None
 
-    # Regression (statsmodels)
+    # Regression (Statica OLS engine or statsmodels)
     try:
-        # For statsmodels RegressionResultsWrapper
-        from statsmodels.regression.linear_model import RegressionResultsWrapper
-        if isinstance(result, RegressionResultsWrapper):
+        from statica.stats.ols import OLSResult
+        is_model = isinstance(result, OLSResult)
+        if not is_model:
+            # For statsmodels RegressionResultsWrapper
+            from statsmodels.regression.linear_model import RegressionResultsWrapper
+            is_model = isinstance(result, RegressionResultsWrapper)
+        if is_model:
             rs = result
             coef = rs.params
             pvals = rs.pvalues
@@ -1,17 +1,30 @@
-from lark import Lark, Transformer, v_args
+from lark import Transformer
 from pathlib import Path
-import statica
+from .parsing.grammar_cache import get_lark
 
 GRAMMAR_PATH = Path(__file__).parent / "grammar.lark"
-GRAMMAR = GRAMMAR_PATH.read_text()
 
-parser = Lark(GRAMMAR, start="start", parser="lalr")
+def get_parser():
+    # compiled on first use and shared through the grammar cache
+    return get_lark(GRAMMAR_PATH, start="start", parser="lalr")
+
+def __getattr__(name):
+    # `parser` and `GRAMMAR` were module globals built at import; they are
+    # still available, built on first access
+    if name == "parser":
+        return get_parser()
+    if name == "GRAMMAR":
+        return GRAMMAR_PATH.read_text()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # We'll transform the parse tree into a list of simple command dicts
 class StaticaTransformer(Transformer):
     def NAME(self, token):
         return str(token)
 
+    def COLUMN_PATTERN(self, token):
+        return str(token)
+
     def STRING(self, token):
         s = str(token)
         return s[1:-1]
@@ -19,15 +32,34 @@ class StaticaTransformer(Transformer):
     def NUMBER(self, token):
         return float(token)
 
+    def header_opt(self, items):
+        return "header"
+
+    def streaming_opt(self, items):
+        return "streaming"
+
+    def compact_opt(self, items):
+        return "compact"
+
     def load_stmt(self, items):
         filename = items[0]
-        header = False
-        if len(items) > 1:
-            header = True
-        return {"cmd": "load", "file": filename, "header": header}
+        options = items[1:]
+        # the options may come in any order, but each only once
+        for opt in set(options):
+            if options.count(opt) > 1:
+                name = "with header" if opt == "header" else opt
+                raise ValueError(f"load option '{name}' given more than once")
+        header = "header" in options
+        streaming = "streaming" in options
+        compact = "compact" in options
+        return {"cmd": "load", "file": filename, "header": header, "streaming": streaming,
+                "compact": compact}
+
+    def approx_opt(self, items):
+        return "approx"
 
     def describe_stmt(self, items):
-        return {"cmd": "describe", "dataset": items[0]}
+        return {"cmd": "describe", "dataset": items[0], "approx": "approx" in items[1:]}
 
     def assign(self, items):
         name = items[0]
@@ -43,23 +75,39 @@ class StaticaTransformer(Transformer):
     def expr_regress(self, items):
         return items[0]
 
+    def expr_name(self, items):
+        return items[0]
+
     def target(self, items):
         return {"dataset": items[0], "column": items[1]}
 
+    def target_batch(self, items):
+        # column list and/or wildcard patterns, expanded by the runtime
+        return {"dataset": items[0], "columns": list(items[1:])}
+
+    def pairwise(self, items):
+        return {"compare": "pairwise"}
+
+    def vs_rest(self, items):
+        return {"compare": "vs-rest"}
+
     def test_stmt(self, items):
-        # items: target, optional 'by' group name, optional 'against' number
+        # items: target, optional 'by' group name (+ compare mode), optional 'against' number
         target = items[0]
         group = None
         against = None
+        compare = None
         for it in items[1:]:
             if isinstance(it, (str,)):
                 # group name captured as NAME string
                 if group is None:
                     group = it
-            else:
+            elif isinstance(it, dict):
+                compare = it["compare"]
+            elif it is not None:
                 # numeric => against
                 against = it
-        return {"cmd": "ttest", "target": target, "by": group, "against": against}
+        return {"cmd": "ttest", "target": target, "by": group, "against": against, "compare": compare}
 
     def regress_stmt(self, items):
         # items: dep var name, term, maybe more terms..., dataset name (last)
@@ -80,20 +128,22 @@ class StaticaTransformer(Transformer):
     def scatter(self, items):
         return {"kind": "scatter"}
 
+    def line(self, items):
+        return {"kind": "line"}
+
     def vs_scatter(self, items):
         # items: NAME (column to plot)
         return {"kind": "scatter"}
 
     def plot_stmt(self, items):
+        # items: var, [var], kind dict (hist/box/scatter/line), [output file]
+        k = next(i for i, item in enumerate(items) if isinstance(item, dict))
         x = items[0]
-        if len(items) == 3:
-            y = items[1]
-            kind = items[2]["kind"]  # because hist/box/scatter returns a dict
-        else:
-            y = None
-            kind = items[1]["kind"]
-
-        return {"cmd": "plot", "x": x, "y": y, "kind": kind}
+        y = items[1] if k == 2 else None
+        kind = items[k]
+        output = items[k + 1] if len(items) > k + 1 else None
+        return {"cmd": "plot", "x": x, "y": y, "kind": kind["kind"], "bins": kind.get("bins"),
+                "output": output}
 
 
 
@@ -108,7 +158,7 @@ class StaticaTransformer(Transformer):
         return {"cmd": "ask_table", "key": items[0]}
 
 def parse_program(text):
-    tree = parser.parse(text)
+    tree = get_parser().parse(text)
     transformer = StaticaTransformer()
     result = transformer.transform(tree)
     
@@ -0,0 +1,135 @@
+"""
+Grammar compilation cache for Statica.
+
+Building the LALR tables from the grammar file is by far the most expensive
+part of creating a parser. This module compiles each grammar once and shares
+the result:
+
+- in-process, every caller asking for the same grammar gets the same Lark
+  instance (LALR parsing keeps its state per call, so sharing is safe);
+- on disk, the serialized parse tables are stored in the Statica cache
+  directory under a SHA-256 of the grammar text, the options and the Lark
+  version, so a new process only has to unpickle them.
+
+A stale or corrupt cache file is simply rebuilt. The digest of each grammar
+file is computed once per process and recomputed only when the file's size
+or modification time changes.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import lark
+from lark import Lark
+
+from statica.core.config import cache_dir
+
+logger = logging.getLogger(__name__)
+
+_MEMORY: Dict[str, Lark] = {}
+# (grammar path, options) -> (size and mtime of the file, its grammar text and digest)
+_DIGESTS: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Tuple[Tuple[int, int], str, str]] = {}
+_LOCK = threading.Lock()
+
+
+def grammar_digest(grammar: str, **options: Any) -> str:
+    """Return the cache key for a grammar text compiled with `options`."""
+    h = hashlib.sha256()
+    h.update(grammar.encode("utf-8"))
+    for key in sorted(options):
+        h.update(f"\0{key}={options[key]!r}".encode("utf-8"))
+    h.update(f"\0lark={lark.__version__}\0py={sys.version_info[:2]}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cache_file(digest: str) -> Path:
+    return cache_dir("grammar") / f"{digest[:32]}.lark"
+
+
+def _load_from_disk(path: Path, digest: str) -> Union[Lark, None]:
+    try:
+        with open(path, "rb") as f:
+            if f.readline().rstrip(b"\n") != digest.encode("ascii"):
+                return None
+            return Lark.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable grammar cache '{path}': {e}")
+        return None
+
+
+def _save_to_disk(parser: Lark, path: Path, digest: str) -> None:
+    # Write to a temporary file first so that concurrent processes never
+    # observe a half-written cache entry.
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(digest.encode("ascii") + b"\n")
+            parser.save(f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not write grammar cache '{path}': {e}")
+
+
+def _grammar_and_digest(path: Path, options: Dict[str, Any]) -> Tuple[str, str]:
+    key = (str(path), tuple(sorted((k, repr(v)) for k, v in options.items())))
+    st = path.stat()
+    version = (st.st_size, st.st_mtime_ns)
+    entry = _DIGESTS.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1], entry[2]
+    grammar = path.read_text()
+    digest = grammar_digest(grammar, **options)
+    _DIGESTS[key] = (version, grammar, digest)
+    return grammar, digest
+
+
+def get_lark(grammar_path: Union[str, Path], use_disk: bool = True, **options: Any) -> Lark:
+    """Return a compiled Lark parser for the grammar file at `grammar_path`.
+
+    Args:
+        grammar_path: Path to the ``.lark`` grammar file.
+        use_disk: Whether the on-disk cache may be read and written.
+        options: Options forwarded to ``Lark`` (e.g. ``start``, ``parser``).
+
+    Returns:
+        A Lark instance shared by every caller using the same grammar and options.
+    """
+    grammar, digest = _grammar_and_digest(Path(grammar_path), options)
+    parser = _MEMORY.get(digest)
+    if parser is not None:
+        return parser
+
+    with _LOCK:
+        parser = _MEMORY.get(digest)
+        if parser is not None:
+            return parser
+        path = _cache_file(digest) if use_disk else None
+        if path is not None:
+            parser = _load_from_disk(path, digest)
+        if parser is None:
+            parser = Lark(grammar, **options)
+            if path is not None:
+                _save_to_disk(parser, path, digest)
+        _MEMORY[digest] = parser
+        return parser
+
+
+def clear_cache(disk: bool = False) -> None:
+    """Forget all compiled grammars, optionally deleting the on-disk copies too."""
+    with _LOCK:
+        _MEMORY.clear()
+        _DIGESTS.clear()
+        if disk:
+            for path in cache_dir("grammar").glob("*.lark"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -6,15 +6,24 @@ Ues Lark to parse the input text according to the defined grammar
 and transforms into an ASTfor execution.
 
 The grammar is loaded from 'grammar/statica.lark' relative to this file.
+Its compiled parse tables are shared through `grammar_cache`.
 """
 
 from lark import Lark, Transformer, Token, Tree, v_args, UnexpectedToken, UnexpectedCharacters
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from statica.core import exceptions as ex
+from .grammar_cache import get_lark
 
 GRAMMAR_PATH = Path(__file__).parent / "grammar" / "statica.lark"
-GRAMMAR = GRAMMAR_PATH.read_text()
+
+
+def __getattr__(name: str) -> Any:
+    # GRAMMAR (the grammar text) was read at import; it is now read on first access
+    if name == "GRAMMAR":
+        return GRAMMAR_PATH.read_text()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class StaticaTransformer(Transformer):
     """
@@ -28,6 +37,9 @@ class StaticaTransformer(Transformer):
     def NAME(self, token: Token) -> str:
         return str(token)
 
+    def COLUMN_PATTERN(self, token: Token) -> str:
+        return str(token)
+
     def STRING(self, token: Token) -> str:
         return str(token)[1:-1]  # Strip quotes
 
@@ -38,13 +50,28 @@ class StaticaTransformer(Transformer):
         #When "with header" is matched returns True
         return True
 
-    @v_args(inline=True)
-    def load_stmt(self, filename: str, header_opt: Optional[str] = None) -> Dict[str, Any]:
-        return {"cmd": "load", "file": filename, "header": header_opt == True}
+    def streaming_opt(self, *args):
+        return "streaming"
+
+    def compact_opt(self, *args):
+        return "compact"
+
+    def load_stmt(self, items: List[Any]) -> Dict[str, Any]:
+        filename, *options = items
+        # the options may come in any order, but each only once
+        for opt in set(options):
+            if options.count(opt) > 1:
+                name = "with header" if opt is True else opt
+                raise ValueError(f"load option '{name}' given more than once")
+        return {"cmd": "load", "file": filename, "header": True in options,
+                "streaming": "streaming" in options, "compact": "compact" in options}
+
+    def approx_opt(self, *args):
+        return "approx"
 
     @v_args(inline=True)
-    def describe_stmt(self, dataset: str) -> Dict[str, Any]:
-        return {"cmd": "describe", "dataset": dataset}
+    def describe_stmt(self, dataset: str, approx: Any = None) -> Dict[str, Any]:
+        return {"cmd": "describe", "dataset": dataset, "approx": approx == "approx"}
 
     @v_args(inline=True)
     def assign(self, name: str, expr: Any) -> Dict[str, Any]:
@@ -70,17 +97,31 @@ class StaticaTransformer(Transformer):
     def target(self, dataset: str, column: str) -> Dict[str, Any]:
         return {"dataset": dataset, "column": column}
 
+    def target_batch(self, items: List[str]) -> Dict[str, Any]:
+        # column names and wildcard patterns, expanded against the dataset at run time
+        dataset, *columns = items
+        return {"dataset": dataset, "columns": columns}
+
+    def pairwise(self, items: List[Any]) -> Dict[str, Any]:
+        return {"compare": "pairwise"}
+
+    def vs_rest(self, items: List[Any]) -> Dict[str, Any]:
+        return {"compare": "vs-rest"}
+
     def test_stmt(self, items: List[Any]) -> Dict[str, Any]:
         target = items[0]
         group: Optional[str] = None
         against: Optional[float] = None
+        compare: Optional[str] = None
         for item in items[1:]:
             if isinstance(item, str):
                 if group is None:
                     group = item
+            elif isinstance(item, dict):
+                compare = item["compare"]
             elif isinstance(item, float):
                 against = item
-        return {"cmd": "ttest", "target": target, "by": group, "against": against}
+        return {"cmd": "ttest", "target": target, "by": group, "against": against, "compare": compare}
 
     def regress_stmt(self, items: List[Any]) -> Dict[str, Any]:
         dep = items[0]
@@ -106,14 +147,14 @@ class StaticaTransformer(Transformer):
         return {"kind": "line"}
 
     def plot_stmt(self, items: List[Any]) -> Dict[str, Any]:
+        # var, optional second var, kind dict, optional output file
+        k = next(i for i, item in enumerate(items) if isinstance(item, dict))
         x = items[0]
-        if len(items) == 3:
-            y = items[1]
-            kind_dict = items[2]
-        else:
-            y = None
-            kind_dict = items[1]
-        return {"cmd": "plot", "x": x, "y": y, "kind": kind_dict["kind"], "bins": kind_dict.get("bins")}
+        y = items[1] if k == 2 else None
+        kind_dict = items[k]
+        output = items[k + 1] if len(items) > k + 1 else None
+        return {"cmd": "plot", "x": x, "y": y, "kind": kind_dict["kind"], "bins": kind_dict.get("bins"),
+                "output": output}
 
     def conclude_stmt(self, items: List[Any]) -> Dict[str, Any]:
         name = items[0]
@@ -134,10 +175,13 @@ class Parser:
     Encapsulates the Lark parser and transformer to parse DSL text into an AST.
     Created insted of using Global variable `parser = Lark(GRAMMAR, start="start", parser="lalr")`
     due to thread-safety and increased testability.
+
+    The compiled grammar itself is shared between instances (see `grammar_cache`);
+    LALR parsing keeps no state on the Lark object, so this stays thread-safe.
     """
 
     def __init__(self) -> None:
-        self.lark = Lark(GRAMMAR, start="start", parser="lalr")
+        self.lark = get_lark(GRAMMAR_PATH, start="start", parser="lalr")
 
     def parse(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,155 @@
+"""
+Compiled program cache for Statica scripts.
+
+Running a script means parsing its text with the LALR parser, building a
+parse tree and transforming it into command dicts. `load_program` does that
+once per version of a script: the compiled program (the list of command
+dicts, with parse-tree leftovers such as regression terms and plot operands
+lowered to plain strings and tuples) is stored in ``__statica_cache__`` next
+to the script and read back by later runs.
+
+Entries are written with `marshal`, which only holds plain data and loads
+without running any code. Each entry starts with a SHA-256 of
+
+- the script text,
+- the grammar, the transformer module and this module (which lowers the
+  parse tree into the stored form),
+- the Statica and Python versions,
+
+so editing the script or upgrading Statica recompiles it. When the script's
+directory is not writable, entries go to the Statica cache directory instead.
+``STATICA_PROGRAM_CACHE=off`` parses every run.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import statica
+from statica import parser as st_parser
+from statica.core.config import cache_dir, settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "__statica_cache__"
+SUFFIX = ".stc"
+
+
+def program_digest(text: str) -> str:
+    """Cache key of a script text, for the running Statica version and grammar."""
+    h = hashlib.sha256()
+    h.update(text.encode("utf-8"))
+    for source in (st_parser.GRAMMAR_PATH, Path(st_parser.__file__), Path(__file__)):
+        h.update(b"\0" + source.read_bytes())
+    h.update(f"\0statica={statica.__version__}\0py={sys.version_info[:2]}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _lower(value: Any) -> Any:
+    # parse-tree nodes the runtime accepts as plain values: `dataset.column`
+    # operands become (dataset, column) tuples, regression terms their name
+    data = getattr(value, "data", None)
+    if data == "var":
+        return tuple(str(part) for part in value.children)
+    if data == "term":
+        return str(value.children[0])
+    if isinstance(value, dict):
+        return {key: _lower(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_lower(v) for v in value]
+    return value
+
+
+def compile_program(text: str) -> List[Dict[str, Any]]:
+    """Parse a script into its list of command dicts.
+
+    Raises:
+        lark.exceptions.LarkError: On a syntax error.
+    """
+    program = []
+    for stmt in st_parser.parse_program(text):
+        if hasattr(stmt, "data") and hasattr(stmt, "children"):
+            if not stmt.children:
+                continue
+            stmt = stmt.children[0]
+        program.append(_lower(stmt))
+    return program
+
+
+def _cache_paths(script: Path) -> List[Path]:
+    # next to the script, then (for read-only directories) the user cache,
+    # named after the script's absolute path; `_write` creates the one it uses
+    fallback = hashlib.sha256(str(script.resolve()).encode("utf-8")).hexdigest()[:32]
+    return [script.parent / CACHE_DIR / (script.name + SUFFIX),
+            cache_dir("programs", create=False) / (fallback + SUFFIX)]
+
+
+def _read(path: Path, digest: str) -> Optional[List[Dict[str, Any]]]:
+    try:
+        with open(path, "rb") as f:
+            if f.readline().rstrip(b"\n") != digest.encode("ascii"):
+                return None
+            return marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable program cache '{path}': {e}")
+        return None
+
+
+def _write(path: Path, digest: str, data: bytes) -> bool:
+    # written to a temporary file first, so concurrent runs never read half an entry
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(digest.encode("ascii") + b"\n")
+            f.write(data)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        # never leave a stray temporary file next to the user's script
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def load_program(path: str) -> List[Dict[str, Any]]:
+    """The compiled program of the script at `path`, from the cache when it is current.
+
+    Raises:
+        lark.exceptions.LarkError: On a syntax error (nothing is cached).
+    """
+    script = Path(path)
+    text = script.read_text(encoding="utf-8")
+    if settings.program_cache == "off":
+        return compile_program(text)
+    digest = program_digest(text)
+    candidates = _cache_paths(script)
+    for candidate in candidates:
+        program = _read(candidate, digest)
+        if program is not None:
+            return program
+    program = compile_program(text)
+    try:
+        data = marshal.dumps(program)
+    except ValueError as e:
+        # a statement holding a value marshal cannot store; run it uncached
+        logger.warning(f"Not caching the compiled program of '{path}': {e}")
+        return program
+    for candidate in candidates:
+        if _write(candidate, digest, data):
+            break
+    else:
+        logger.warning(f"Could not write a program cache entry for '{path}'")
+    return program
@@ -1,66 +1,290 @@
-import pandas as pd
-import numpy as np
-import scipy.stats as stats
-import statsmodels.formula.api as smf
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+import fnmatch
+import glob
+import os
+import threading
+from .core import profiler, projection, scheduler
+from .core.config import settings
+from .core.lazy import Thunk, force, lazy_import
 from .nlg import generate_conclusion, ask_user_for_table
-from typing import Dict, Any
+from .services.compact import SOURCE_BYTES, format_bytes, group_codes, memory_bytes
+from .services.file_handler import ColumnStore, is_column_store
+from .services.fingerprint import fingerprint
+from .services import plotting
+from .services.loaders import dataset_name, expand_pattern, load_dataset, read_header
+from .services.result_cache import get_result_cache
+from .services.streaming import ChunkedDataset, describe_approx
+from .stats import ttest as ttest_kernels
+from .stats import ols
+from .stats.moments import column_moments, grouped_moments
+from typing import Dict, Any, List, Optional, Tuple
+
+# The scientific stack is imported on first use by the command that needs it,
+# so a script that only loads and describes data never pays for statsmodels.
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+tabulate = lazy_import("tabulate")
 
 
 class Runtime:
-    def __init__(self):
+    # statement kind -> handler method, bound per runtime in __init__
+    HANDLERS = {"load": "_cmd_load", "describe": "_cmd_describe", "assign": "_cmd_assign",
+                "ttest": "_cmd_ttest", "regress": "_cmd_regress", "plot": "_cmd_plot",
+                "conclude": "_cmd_conclude", "ask_table": "_cmd_ask_table"}
+    # statement kind -> modules its handler imports on first use; a profiled
+    # run imports them up front so no statement is charged for the import
+    MODULES = {"load": ("numpy", "pandas"), "describe": ("numpy", "pandas"),
+               "ttest": ("numpy", "pandas", "scipy.stats"),
+               "regress": ("numpy", "pandas", "scipy.linalg", "scipy.stats"),
+               "plot": ("numpy", "pandas", "matplotlib.figure")}
+
+    def __init__(self, jobs: Optional[int] = None, lazy: Optional[bool] = None,
+                 projection: Optional[bool] = None, profile: Optional[profiler.Profiler] = None):
         self.env: Dict[str, Any] = {}
+        self._handlers = {c: getattr(self, method) for c, method in self.HANDLERS.items()}
         self.user_tables: Dict[str, Any] = {}
+        self._designs = ols.DesignCache()
+        # worker threads for independent statements; 1 runs the script sequentially
+        self.jobs = jobs if jobs is not None else settings.jobs
+        # lazy mode: loads, tests and models run only when a later statement reads them
+        self.lazy = lazy if lazy is not None else settings.lazy
+        # loads read only the columns the rest of the script uses; off for
+        # runtimes whose later scripts may use datasets loaded by earlier ones
+        self.projection = projection if projection is not None else settings.projection
+        # records every statement when set (statica --profile / --trace)
+        self.profiler = profile
+        # statements of the last execute() whose deferred work was never needed
+        self.skipped: List[Dict[str, Any]] = []
+        self._deferred: List[Tuple[Dict[str, Any], Thunk]] = []
+        self._frames = threading.local()
+        # load statement behind each dataset name, so unload() can drop the data
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        # plot files being rendered, and the count of unnamed ones for --plot-dir
+        self._plots: List[Tuple[str, Any]] = []
+        self._plot_count = 0
 
     def execute(self, commands):
         # Ensure commands are dicts, not Tree objects
+        cmds = []
         for cmd in commands:
             if hasattr(cmd, 'data') and hasattr(cmd, 'children'):
                 cmd = cmd.children[0] if cmd.children else {}
             if not isinstance(cmd, dict) or 'cmd' not in cmd:
                 print("Invalid command:", cmd)
                 continue
+            cmds.append(cmd)
+
+        if self.jobs > 1 or self.lazy:
+            # result names must not depend on when a statement actually runs
+            cmds = scheduler.assign_store_keys(cmds, self.env)
+        if self.projection:
+            cmds = projection.push_down(cmds)
+        self._deferred = []
+        if self.profiler is not None:
+            self.profiler.preload(self._modules(cmds))
+        dispatch = self.dispatch if self.profiler is None else self._profiled_dispatch
+        if self.jobs > 1:
+            # independent statements run concurrently, output stays in script order
+            scheduler.run(cmds, dispatch, self.jobs)
+        else:
+            for cmd in cmds:
+                dispatch(cmd)
+        if self.profiler is not None and self._plots:
+            with self.profiler.statement(f"render {len(self._plots)} plot(s)", kind="plots"):
+                self._finish_plots()
+        else:
+            self._finish_plots()
+        order = {id(cmd): i for i, cmd in enumerate(cmds)}
+        self.skipped = sorted((cmd for cmd, thunk in self._deferred if not thunk.forced),
+                              key=lambda cmd: order[id(cmd)])
+
+    def _modules(self, cmds):
+        # modules the statements' handlers will import, in first-use order
+        modules: Dict[str, None] = {}
+        models = set()
+        for cmd in cmds:
+            expr = cmd.get("expr") if cmd["cmd"] == "assign" else cmd
+            kind = expr.get("cmd") if isinstance(expr, dict) else None
+            if kind == "regress" and cmd["cmd"] == "assign":
+                models.add(cmd["name"])
+            modules.update(dict.fromkeys(self.MODULES.get(kind, ())))
+            if kind == "conclude" and cmd["name"] in models:
+                # the printed summary is statsmodels'
+                modules["statsmodels.api"] = None
+        return list(modules)
+
+    def _profiled_dispatch(self, cmd):
+        if self.lazy and self._defer(cmd):
+            # recorded if and when a later statement forces it
+            return
+        with self.profiler.statement(scheduler.statement_label(cmd), shape=lambda: self._shape(cmd)):
+            self._handle(cmd)
+
+    def _shape(self, cmd):
+        # rows and columns a statement worked on, without forcing deferred values
+        def bound(name):
+            frame = getattr(self._frames, "top", None)
+            if frame is not None and frame["name"] == name:
+                return frame["value"]
+            value = self._lookup(name)
+            if isinstance(value, Thunk):
+                return value.force() if value.forced else None
+            return value
+        return profiler.shape_of(cmd, bound)
+
+    def dispatch(self, cmd):
+        if self.lazy and self._defer(cmd):
+            return
+        self._handle(cmd)
 
-            c = cmd.get("cmd")
-            if c == "load":
-                self._cmd_load(cmd)
-            elif c == "describe":
-                self._cmd_describe(cmd)
-            elif c == "assign":
-                self._cmd_assign(cmd)
-            elif c == "ttest":
-                self._cmd_ttest(cmd)
-            elif c == "regress":
-                self._cmd_regress(cmd)
-            elif c == "plot":
-                self._cmd_plot(cmd)
-            elif c == "conclude":
-                self._cmd_conclude(cmd)
-            elif c == "ask_table":
-                self._cmd_ask_table(cmd)
+    def _handle(self, cmd):
+        handler = self._handlers.get(cmd.get("cmd"))
+        if handler is None:
+            print("Unknown command:", cmd)
+        else:
+            handler(cmd)
+
+    def _defer(self, cmd) -> bool:
+        c = cmd["cmd"]
+        if c == "assign":
+            expr = cmd["expr"]
+            deferrable = isinstance(expr, dict) and expr.get("cmd") in ("load", "ttest", "regress")
+        else:
+            deferrable = c in ("load", "ttest", "regress")
+        if not deferrable:
+            return False
+        reads, writes, _ = scheduler.accesses(cmd)
+        (name,) = writes
+        # the statement sees the bindings of this point in the script, even if
+        # the names are reassigned before it is forced
+        scope = {n: self._lookup(n) for n in reads}
+        thunk = Thunk(lambda: self._run_deferred(cmd, name, scope), label=name)
+        is_load = c == "load" or (c == "assign" and cmd["expr"].get("cmd") == "load")
+        self._set(name, thunk, source=cmd if is_load else None)
+        self._deferred.append((cmd, thunk))
+        return True
+
+    def _run_deferred(self, cmd, name, scope):
+        handler = self._handlers[cmd["cmd"]]
+        outer = getattr(self._frames, "top", None)
+        frame = self._frames.top = {"scope": scope, "name": name, "value": None}
+        try:
+            if self.profiler is None:
+                handler(cmd)
             else:
-                print("Unknown command:", cmd)
+                with self.profiler.statement(scheduler.statement_label(cmd), kind="forced",
+                                             shape=lambda: self._shape(cmd)):
+                    handler(cmd)
+        finally:
+            self._frames.top = outer
+        return frame["value"]
+
+    def _lookup(self, name):
+        # the bound value, without forcing it
+        frame = getattr(self._frames, "top", None)
+        if frame is not None and name in frame["scope"]:
+            return frame["scope"][name]
+        return self.env.get(name)
+
+    def _get(self, name):
+        return force(self._lookup(name))
+
+    def _set(self, name, value, source=None):
+        frame = getattr(self._frames, "top", None)
+        if frame is not None and frame["name"] == name:
+            # a deferred statement returns its value to the thunk instead of
+            # rebinding the name, which may have moved on since
+            frame["value"] = value
+            return
+        self.env[name] = value
+        if source is not None:
+            self._sources[name] = source
+        else:
+            self._sources.pop(name, None)
+
+    def datasets(self) -> Dict[str, Any]:
+        """In-memory DataFrames bound in the environment, by name."""
+        out = {}
+        for name, value in list(self.env.items()):
+            if isinstance(value, Thunk):
+                if not value.forced:
+                    continue
+                value = value.force()
+            if isinstance(value, pd.DataFrame):
+                out[name] = value
+        return out
+
+    def unload(self, name) -> bool:
+        """Release a loaded dataset; it is read from its file again when next used.
+
+        Returns:
+            False if `name` is not bound to data that came from a load statement.
+        """
+        cmd = self._sources.get(name)
+        value = self.env.get(name)
+        if cmd is None or value is None or (isinstance(value, Thunk) and not value.forced):
+            return False
+        self.env[name] = Thunk(lambda: self._run_deferred(cmd, name, {}), label=name)
+        return True
 
     def _cmd_load(self, cmd):
         fname = cmd["file"]
         header = cmd.get("header", False)
         try:
-            df = pd.read_csv(fname, header=0 if header else 'infer')
-            varname = fname.split("/")[-1].split(".")[0]
-            self.env[varname] = df
-            print(f"[Loaded '{fname}' into env as '{varname}' — {len(df)} rows x {len(df.columns)} cols]")
+            varname = dataset_name(fname)
+            if cmd.get("streaming"):
+                ds = ChunkedDataset(fname, header=0 if header else 'infer')
+                self._set(varname, ds, source=cmd)
+                files = f"{len(ds.files)} files, " if len(ds.files) > 1 else ""
+                print(f"[Attached '{fname}' as streaming dataset '{varname}' — {files}{len(ds.columns)} cols]")
+                return
+            if is_column_store(fname):
+                ds = ColumnStore(fname)
+                self._set(varname, ds, source=cmd)
+                print(f"[Attached column store '{fname}' as '{varname}' — {len(ds)} rows x {len(ds.columns)} cols]")
+                return
+            df, note = self._load(cmd)
+            self._set(varname, df, source=cmd)
+            print(f"[Loaded '{fname}' into env as '{varname}' — {len(df)} rows x {len(df.columns)} cols{note}]")
         except Exception as e:
             print("Error loading file:", e)
 
+    def _load(self, cmd):
+        # returns the DataFrame and a note for the load message
+        header = 0 if cmd.get("header", False) else 'infer'
+        compact = cmd.get("compact", False) or settings.compact
+        notes = []
+        if glob.has_magic(cmd["file"]):
+            notes.append(f"{len(expand_pattern(cmd['file']))} files")
+        usecols = None
+        if cmd.get("columns"):
+            all_cols = read_header(cmd["file"], header)
+            usecols = projection.select(all_cols, cmd["columns"])
+        if usecols is None:
+            df = load_dataset(cmd["file"], header=header, compact=compact)
+        else:
+            df = load_dataset(cmd["file"], header=header, compact=compact, usecols=usecols)
+            notes.append(f"read {len(usecols)} of {len(all_cols)} columns")
+        if compact and SOURCE_BYTES in df.attrs:
+            notes.append(f"{format_bytes(df.attrs[SOURCE_BYTES])} -> {format_bytes(memory_bytes(df))} compact")
+        return df, f" ({'; '.join(notes)})" if notes else ""
+
     def _cmd_describe(self, cmd):
         name = cmd["dataset"]
-        df = self.env.get(name)
+        df = self._get(name)
         if df is None:
             print(f"[describe] Unknown dataset '{name}'")
             return
-        desc = df.describe(include='all').T.reset_index()
-        print(tabulate(desc, headers="keys", tablefmt="github", showindex=False))
+        note = ""
+        if cmd.get("approx"):
+            # one pass with mergeable sketches instead of sorting and hashing every column
+            desc, note = describe_approx(df)
+        elif isinstance(df, ChunkedDataset):
+            desc = df.describe()
+        else:
+            desc = df.describe(include='all').T.reset_index()
+        print(tabulate.tabulate(desc, headers="keys", tablefmt="github", showindex=False))
+        if note:
+            print(note)
 
     def _cmd_assign(self, cmd):
         name = cmd["name"]
@@ -69,99 +293,126 @@ class Runtime:
             ctype = expr["cmd"]
             if ctype == "ttest":
                 res = self._eval_ttest(expr)
-                self.env[name] = res
+                self._set(name, res)
                 print(f"[Assigned t-test result to '{name}']")
             elif ctype == "regress":
                 res = self._eval_regress(expr)
-                self.env[name] = res
+                self._set(name, res)
                 print(f"[Assigned regression model to '{name}']")
             elif ctype == "load":
                 fname = expr["file"]
                 header = expr.get("header", False)
-                df = pd.read_csv(fname, header=0 if header else 'infer')
-                self.env[name] = df
-                print(f"[Loaded '{fname}' into '{name}']")
+                if expr.get("streaming"):
+                    self._set(name, ChunkedDataset(fname, header=0 if header else 'infer'), source=cmd)
+                    print(f"[Attached '{fname}' as streaming dataset '{name}']")
+                elif is_column_store(fname):
+                    self._set(name, ColumnStore(fname), source=cmd)
+                    print(f"[Attached column store '{fname}' as '{name}']")
+                else:
+                    df, note = self._load(expr)
+                    self._set(name, df, source=cmd)
+                    print(f"[Loaded '{fname}' into '{name}'{note}]")
             else:
-                self.env[name] = expr
+                self._set(name, expr)
                 print(f"[Assigned '{name}']")
         else:
-            self.env[name] = self.env.get(expr) if isinstance(expr, str) else expr
+            # an alias shares the bound value (or thunk) without forcing it
+            self._set(name, self._lookup(expr) if isinstance(expr, str) else expr)
             print(f"[Assigned '{name}']")
 
     def _cmd_ttest(self, cmd):
         res = self._eval_ttest(cmd)
-        key = f"ttest_{len(self.env)}"
-        self.env[key] = res
+        key = cmd.get("store_as") or f"ttest_{len(self.env)}"
+        self._set(key, res)
         print(f"[Stored t-test as '{key}']")
         return res
 
     def _eval_ttest(self, spec):
         target = spec["target"]
         ds_name = target["dataset"]
-        col = target["column"]
-        df = self.env.get(ds_name)
+        df = self._get(ds_name)
         if df is None:
             raise ValueError(f"Dataset '{ds_name}' not found")
+        # the key leaves out the dataset's name and the result's name:
+        # results follow the data and the test, not the variables
+        key_spec = {k: v for k, v in spec.items() if k != "store_as"}
+        key_spec["target"] = {k: v for k, v in target.items() if k != "dataset"}
+        return self._memoized(key_spec, df, lambda: self._compute_ttest(df, spec))
+
+    def _compute_ttest(self, df, spec):
+        target = spec["target"]
         by = spec.get("by")
         against = spec.get("against")
+        if "columns" in target:
+            return self._eval_ttest_batch(df, target["columns"], by, against)
+        col = target["column"]
+        if isinstance(df, ChunkedDataset):
+            return self._eval_ttest_streaming(df, col, by, against, spec.get("compare"))
+        if by:
+            # one factorize + one bincount pass gives every group's count, mean and M2
+            # categorical (compact) columns are grouped by their codes, without factorizing
+            codes, labels, order = group_codes(df[by])
+            per_group = grouped_moments(df[col].to_numpy(dtype=float), codes, len(labels))
+            groups = [(labels[i], per_group[i]) for i in order]
+            return self._grouped_ttest(groups, col, by, spec.get("compare"))
+        else:
+            mu = against if against is not None else 0.0
+            m = grouped_moments(df[col].to_numpy(dtype=float))[0]
+            return ttest_kernels.one_sample(m, mu)
+
+    def _eval_ttest_batch(self, df, patterns, by, against):
+        # all selected columns are tested at once as one matrix operation
         if by:
-            series = df[[col, by]].dropna()
-            groups = series[by].unique()
-            if len(groups) != 2:
-                raise ValueError("ttest by: found not exactly 2 groups")
-            g1, g2 = groups
-            s1 = series[series[by] == g1][col].dropna()
-            s2 = series[series[by] == g2][col].dropna()
-            res = stats.ttest_ind(s1, s2, equal_var=False)
-            mean1, mean2 = s1.mean(), s2.mean()
-            sd1, sd2 = s1.std(ddof=1), s2.std(ddof=1)
-            n1, n2 = len(s1), len(s2)
-            se = (sd1**2 / n1 + sd2**2 / n2) ** 0.5
-            num = (sd1**2 / n1 + sd2**2 / n2) ** 2
-            den = ((sd1**4)/(n1**2*(n1-1))) + ((sd2**4)/(n2**2*(n2-1)))
-            dfw = num/den if den!=0 else n1+n2-2
-            tcrit = stats.t.ppf(1-0.025, dfw)
-            diff = mean1 - mean2
-            ci_low, ci_high = diff - tcrit*se, diff + tcrit*se
-            pooled_var = (((n1-1)*sd1**2)+((n2-1)*sd2**2))/(n1+n2-2)
-            pooled_sd = pooled_var**0.5 if pooled_var>0 else np.nan
-            cohens_d = (mean1-mean2)/pooled_sd if pooled_sd and pooled_sd>0 else np.nan
-            return {"kind":"two-sample","group_names":(str(g1),str(g2)),
-                    "mean1":float(mean1),"mean2":float(mean2),
-                    "sd1":float(sd1),"sd2":float(sd2),
-                    "n1":n1,"n2":n2,
-                    "t":float(res.statistic),"p":float(res.pvalue),
-                    "diff":float(diff),"ci":(ci_low,ci_high),"d":float(cohens_d)}
+            raise ValueError("ttest on a column list supports one-sample tests only (drop 'by')")
+        streaming = isinstance(df, ChunkedDataset)
+        cols = self._select_columns(df, patterns)
+        if streaming:
+            n, mean, m2 = df.column_moments(cols)
         else:
-            mu = spec.get("against",0.0)
-            series = df[col].dropna()
-            if len(series)<2:
-                raise ValueError("Not enough observations for t-test")
-            res = stats.ttest_1samp(series,popmean=mu)
-            mean = series.mean()
-            sd = series.std(ddof=1)
-            n = len(series)
-            se = sd/(n**0.5)
-            dfv = n-1
-            tcrit = stats.t.ppf(1-0.025,dfv)
-            diff = mean - mu
-            ci_low, ci_high = diff - tcrit*se, diff + tcrit*se
-            d = diff/sd if sd and sd>0 else np.nan
-            return {"kind":"one-sample",
-                    "mean":float(mean),
-                    "sd":float(sd),
-                    "n":n,
-                    "t":float(res.statistic),
-                    "p":float(res.pvalue),
-                    "mu":float(mu),
-                    "diff":float(diff),
-                    "ci":(ci_low,ci_high),
-                    "d":float(d)}
+            n, mean, m2 = column_moments(df[cols].to_numpy(dtype=float))
+        mu = against if against is not None else 0.0
+        return ttest_kernels.one_sample_batch(cols, n, mean, m2, mu)
+
+    def _select_columns(self, df, patterns):
+        # names must exist; wildcards pick matching numeric columns
+        streaming = isinstance(df, ChunkedDataset)
+        available = list(df.columns)
+        numeric = df.numeric_columns() if streaming else list(df.select_dtypes("number").columns)
+        selected = []
+        for pat in patterns:
+            if any(ch in pat for ch in "*?"):
+                matches = [c for c in numeric if fnmatch.fnmatchcase(str(c), pat)]
+            elif pat in available:
+                matches = [pat]
+            else:
+                raise ValueError(f"Column '{pat}' not found")
+            selected.extend(c for c in matches if c not in selected)
+        if not selected:
+            raise ValueError(f"No numeric columns match {', '.join(patterns)}")
+        return selected
+
+    def _grouped_ttest(self, groups, col, by, compare):
+        groups = [(label, m) for label, m in groups if m.n]
+        if compare:
+            labels, moments = zip(*groups) if groups else ((), ())
+            return ttest_kernels.multi_group(labels, list(moments), compare, column=col, by=by)
+        if len(groups) != 2:
+            raise ValueError(f"ttest by: found {len(groups)} groups, not exactly 2 "
+                             f"(use 'by {by} pairwise' or 'by {by} vs rest' to compare more)")
+        (g1, m1), (g2, m2) = groups
+        return ttest_kernels.welch(m1, m2, (g1, g2))
+
+    def _eval_ttest_streaming(self, ds, col, by, against, compare=None):
+        # one pass over the file; only the running moments are kept in memory
+        if by:
+            return self._grouped_ttest(ds.grouped_moments(col, by).items(), col, by, compare)
+        mu = against if against is not None else 0.0
+        return ttest_kernels.one_sample(ds.moments(col), mu)
 
     def _cmd_regress(self, cmd):
         model = self._eval_regress(cmd)
-        key = f"regress_{len(self.env)}"
-        self.env[key] = model
+        key = cmd.get("store_as") or f"regress_{len(self.env)}"
+        self._set(key, model)
         print(f"[Stored regression model as '{key}']")
         return model
 
@@ -169,7 +420,7 @@ class Runtime:
         dep = spec["dep"]
         predictors = spec["predictors"]
         dfname = spec["dataset"]
-        df = self.env.get(dfname)
+        df = self._get(dfname)
         if df is None:
             raise ValueError(f"Dataset '{dfname}' not found")
         # Convert Tree objects to strings if necessary
@@ -181,51 +432,117 @@ class Runtime:
                 predictors_str.append(str(t.children[0]))
             else:
                 raise ValueError(f"Unknown predictor type: {t}")
-        formula = dep + " ~ " + " + ".join(predictors_str)
-        model = smf.ols(formula=formula, data=df).fit()
+        key_spec = {"cmd": "regress", "dep": dep, "predictors": predictors_str}
+        model = self._memoized(key_spec, df, lambda: self._compute_regress(df, dep, predictors_str))
+        if not isinstance(df, ChunkedDataset) and not model.has_data:
+            # restored from the result cache: rebuild the design only if summary() needs it
+            model.attach_design(lambda: self._designs.design(df, dep, predictors_str)[:2])
         return model
 
+    def _compute_regress(self, df, dep, predictors):
+        if isinstance(df, ChunkedDataset):
+            # X'X, X'y and y'y are accumulated chunk by chunk
+            return ols.fit_chunks(dep, predictors, df.chunks(list(dict.fromkeys([dep, *predictors]))))
+        # encoded design matrices are cached per dataset and shared between models;
+        # the statsmodels results object is only built if conclude asks for it
+        y, X, names = self._designs.design(df, dep, predictors)
+        return ols.fit(dep, y, X, names)
+
+    def _memoized(self, spec, dataset, compute):
+        # results are looked up by (dataset fingerprint, normalized statement)
+        cache = get_result_cache()
+        if cache is None:
+            return compute()
+        try:
+            key = cache.key(fingerprint(dataset), spec)
+        except TypeError:
+            return compute()
+        hit, result = cache.get(key)
+        if hit:
+            return result
+        result = compute()
+        cache.put(key, result)
+        return result
+
 
     def _cmd_plot(self, cmd):
-        ds = self.env.get(cmd.get("dataset"))
-        if ds is None:
-            print("[plot] dataset not found:", cmd.get("dataset"))
+        try:
+            job = self._plot_job(cmd)
+        except ValueError as e:
+            print(f"[plot] {e}")
+            return
+        path = cmd.get("output")
+        if path is None and settings.plot_dir:
+            self._plot_count += 1
+            path = os.path.join(settings.plot_dir, plotting.default_file_name(job, self._plot_count))
+        # binned / aggregated / decimated here, so only the reduced data moves on
+        job = plotting.prepare(job)
+        if path is None:
+            plotting.show(job)
             return
-        x, y, kind_spec = cmd.get("x"), cmd.get("y"), cmd.get("kind")
-        kind = kind_spec.get("kind") if kind_spec else None
+        # rendered off the statement (a worker process), waited for at the end of execute()
+        self._plots.append((path, plotting.get_renderer().submit(job, path)))
+        print(f"[plot] {job['kind']} of {job['xlabel']} -> {path}")
+
+    def _plot_job(self, cmd):
+        kind = cmd.get("kind")
+        if kind not in plotting.KINDS:
+            raise ValueError(f"unknown plot kind '{kind}'")
+        x_ds, x_col = scheduler.split_var(cmd.get("x"))
+        y_ds, y_col = scheduler.split_var(cmd.get("y")) if cmd.get("y") is not None else (None, None)
+        # a bare column name refers to the dataset named by the other operand
+        default = cmd.get("dataset") or x_ds or y_ds
+        job = {"kind": kind, "bins": cmd.get("bins"), "xlabel": x_col}
+        ds = self._get(x_ds or default) if (x_ds or default) else None
+        if kind == "histogram" and isinstance(ds, ChunkedDataset):
+            # binned chunk by chunk: the column is never held in memory whole
+            if x_col not in ds.columns:
+                raise ValueError(f"unknown column '{x_col}' in '{x_ds or default}'")
+            def chunks():
+                return (self._numeric_values(chunk[x_col], x_col) for chunk in ds.chunks([x_col]))
 
-        # Convert x/y if they are list (var.column)
-        if isinstance(x,list):
-            x_col = x[-1]
-            ds_x = self.env.get(x[0]) if len(x)>1 else ds
+            job["counts"], job["edges"] = plotting.histogram_chunks(chunks, cmd.get("bins"))
+            job["prepared"] = True
+            return job
+        job["x"] = self._plot_values(x_ds or default, x_col)
+        if y_col is not None:
+            job["ylabel"] = y_col
+            job["y"] = self._plot_values(y_ds or default, y_col)
+        return job
+
+    def _plot_values(self, ds_name, col):
+        ds = self._get(ds_name) if ds_name else None
+        if ds is None:
+            raise ValueError(f"dataset not found: {ds_name}")
+        if isinstance(ds, ChunkedDataset):
+            if col not in ds.columns:
+                raise ValueError(f"unknown column '{col}' in '{ds_name}'")
+            values = pd.concat([chunk[col] for chunk in ds.chunks([col])], ignore_index=True)
+        elif col not in ds.columns:
+            raise ValueError(f"unknown column '{col}' in '{ds_name}'")
         else:
-            x_col, ds_x = x, ds
+            values = ds[col]
+        return self._numeric_values(values, col)
 
-        y_col, ds_y = None, ds_x
-        if y:
-            if isinstance(y,list):
-                y_col = y[-1]
-                ds_y = self.env.get(y[0]) if len(y)>1 else ds
-            else:
-                y_col = y
-
-        if kind=="histogram":
-            bins = kind_spec.get("bins",20)
-            ds_x[x_col].dropna().plot(kind="hist",bins=bins,title=f"Histogram of {x_col}")
-        elif kind=="box":
-            ds_x.boxplot(column=[x_col])
-        elif kind == "scatter":
-            if y_col:
-                ds_x.plot(x=y_col, y=x_col, kind="scatter", title=f"{y_col} vs {x_col}")
-            else:
-                ds_x.plot(y=x_col, kind="scatter", title=f"{x_col}")
-        plt.tight_layout()
-        plt.show()
+    @staticmethod
+    def _numeric_values(values, col):
+        try:
+            return pd.to_numeric(values).to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError(f"column '{col}' is not numeric")
+
+    def _finish_plots(self):
+        plots, self._plots = self._plots, []
+        for path, fut in plots:
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"[plot] could not render '{path}': {e}")
 
     def _cmd_conclude(self, cmd):
         name = cmd["name"]
         alpha = cmd.get("alpha", 0.05)
-        obj = self.env.get(name)
+        obj = self._get(name)
         if obj is None:
             print("[conclude] unknown object:", name)
             return
@@ -233,7 +550,7 @@ class Runtime:
         if isinstance(obj, dict):
             # t-test dict
             kind = obj.get("kind", "")
-            if kind.startswith("one") or kind.startswith("two"):
+            if kind.startswith(("one", "two", "multi", "batch")):
                 table_needed = generate_conclusion(obj, alpha=alpha, ask_table=self._ask_for_table)
                 return
         else:
@@ -0,0 +1,446 @@
+"""
+Long-lived Statica server.
+
+`statica serve` keeps one warm process: the scientific stack is imported and
+the parser built once, and every session keeps its `Runtime` (and so its
+loaded DataFrames, encoded designs and results) between requests. Scripts
+or single statements are posted as JSON and answered with the captured
+output and the values the script bound, converted to JSON.
+
+Endpoints (HTTP on localhost, or the same protocol over a Unix socket):
+
+    POST   /run                {"script": "...", "session": "name"}
+    POST   /sessions           create a session with a fresh id
+    GET    /sessions           list sessions and the memory of their datasets
+    DELETE /sessions/<id>      drop a session
+    GET    /health
+
+Sessions are isolated: each has its own environment, and requests on one
+session run one at a time. Loaded DataFrames are shared between sessions
+when they come from the same unchanged file. Once the data held by all
+sessions exceeds the memory cap, the datasets of the least recently used
+sessions are released; they are read again from their files when next used.
+The number of sessions is capped too: a new session past the cap replaces
+the least recently used idle one, and is refused (503) when all are busy.
+`ask_table`, which reads from the terminal, is rejected in server scripts.
+"""
+
+import io
+import json
+import logging
+import math
+import os
+import socketserver
+import stat
+import threading
+import time
+import traceback
+import uuid
+import weakref
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core import scheduler
+from .core.config import settings
+from .core.lazy import Thunk, lazy_import
+from .core.output import redirect
+from .services.file_handler import ColumnStore
+from .services.streaming import ChunkedDataset
+from .stats.ols import OLSResult
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = 16 * 2**20
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a session is needed but every session slot is busy."""
+
+
+def to_jsonable(value: Any, nested: bool = False) -> Any:
+    """Convert a Statica value (test dict, model, dataset, ...) to plain JSON data.
+
+    NaN and infinite floats become None. A DataFrame bound to a name is a
+    dataset and is described by its shape; inside a result (the table of a
+    multi-group test) it is converted to a list of records.
+    """
+    if isinstance(value, Thunk):
+        return to_jsonable(value.force(), nested) if value.forced else {"kind": "deferred"}
+    if value is None or isinstance(value, (bool, str, int)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v, True) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v, True) for v in value]
+    if isinstance(value, OLSResult):
+        return {
+            "kind": "ols",
+            "dep": value.dep,
+            "nobs": int(value.nobs),
+            "rsquared": to_jsonable(value.rsquared),
+            "rsquared_adj": to_jsonable(value.rsquared_adj),
+            "fvalue": to_jsonable(value.fvalue),
+            "f_pvalue": to_jsonable(value.f_pvalue),
+            "params": to_jsonable(value.params.to_dict()),
+            "bse": to_jsonable(value.bse.to_dict()),
+            "tvalues": to_jsonable(value.tvalues.to_dict()),
+            "pvalues": to_jsonable(value.pvalues.to_dict()),
+            "summary": value.text_summary(),
+        }
+    if isinstance(value, ColumnStore):
+        return {"kind": "column-store", "path": value.path, "rows": len(value), "columns": list(value.columns)}
+    if isinstance(value, ChunkedDataset):
+        return {"kind": "streaming-dataset", "path": value.path, "columns": list(value.columns)}
+    if isinstance(value, np.generic):
+        return to_jsonable(value.item())
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist(), True)
+    if isinstance(value, pd.DataFrame):
+        if nested:
+            return to_jsonable(value.to_dict(orient="records"), True)
+        return {"kind": "dataset", "rows": len(value), "columns": [str(c) for c in value.columns]}
+    if isinstance(value, pd.Series):
+        return to_jsonable(value.to_dict(), True)
+    return repr(value)
+
+
+class Session:
+    """One client's Runtime and its bookkeeping."""
+
+    def __init__(self, sid: str) -> None:
+        from .runtime import Runtime
+
+        self.id = sid
+        # a later request may use columns this one's loads would have skipped
+        self.runtime = Runtime(projection=False)
+        self.lock = threading.Lock()
+        self.created = time.time()
+        self.last_used = time.monotonic()
+        self.requests = 0
+        # requests holding this session (guarded by the service lock); a
+        # pinned session is never evicted
+        self.pins = 0
+
+
+class StaticaService:
+    """Sessions, script execution and the dataset memory cap, independent of transport."""
+
+    def __init__(self, memory_bytes: Optional[int] = None, max_sessions: Optional[int] = None) -> None:
+        self.memory_bytes = memory_bytes if memory_bytes is not None else settings.serve_memory_bytes
+        self.max_sessions = max_sessions if max_sessions is not None else settings.serve_max_sessions
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        # deep memory_usage is slow for object columns; measure each frame once
+        self._sizes: Dict[int, Tuple[Any, int]] = {}
+
+    def warm_up(self) -> None:
+        from . import parser as st_parser
+
+        os.environ.setdefault("MPLBACKEND", "Agg")
+        st_parser.get_parser()
+        import scipy.stats  # noqa: F401
+        import statsmodels.api  # noqa: F401
+
+    def session(self, sid: Optional[str] = None, create: bool = True, pin: bool = False) -> Optional[Session]:
+        """The session `sid`, created if missing and `create` is set.
+
+        Args:
+            pin: Pin the session against eviction until `unpin` is called.
+
+        Raises:
+            SessionLimitError: When creating it would exceed the session cap
+                and no idle session can make room.
+        """
+        sid = sid or "default"
+        with self._lock:
+            s = self._sessions.get(sid)
+            if s is None and create:
+                if len(self._sessions) >= self.max_sessions:
+                    self._evict_idle_session()
+                s = self._sessions[sid] = Session(sid)
+            if s is not None and pin:
+                s.pins += 1
+            return s
+
+    def unpin(self, session: Session) -> None:
+        with self._lock:
+            session.pins -= 1
+
+    def _evict_idle_session(self) -> None:
+        # called with self._lock held; drops the least recently used session
+        # that is not running a request
+        for victim in sorted(self._sessions.values(), key=lambda s: s.last_used):
+            if victim.pins:
+                continue
+            if victim.lock.acquire(blocking=False):
+                try:
+                    del self._sessions[victim.id]
+                finally:
+                    victim.lock.release()
+                logger.info(f"Dropped idle session '{victim.id}' (session cap {self.max_sessions})")
+                return
+        raise SessionLimitError(f"all {self.max_sessions} sessions are busy")
+
+    def new_session(self) -> Session:
+        return self.session(uuid.uuid4().hex)
+
+    def drop_session(self, sid: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(sid, None) is not None
+
+    def run(self, script: str, sid: Optional[str] = None) -> Dict[str, Any]:
+        """Run `script` in a session and return the JSON response body."""
+        # pinned from lookup to the end of the request, so eviction cannot
+        # drop it before its lock is taken
+        session = self.session(sid, pin=True)
+        try:
+            return self._run(session, script)
+        finally:
+            self.unpin(session)
+
+    def _run(self, session: Session, script: str) -> Dict[str, Any]:
+        from . import parser as st_parser
+
+        buf = io.StringIO()
+        start = time.perf_counter()
+        response: Dict[str, Any] = {"session": session.id}
+        with session.lock:
+            session.requests += 1
+            session.last_used = time.monotonic()
+            rt = session.runtime
+            written: List[str] = []
+            with redirect(buf):
+                try:
+                    cmds = [t.children[0] if hasattr(t, "children") else t
+                            for t in st_parser.parse_program(script)]
+                    if any(cmd.get("cmd") == "ask_table" for cmd in cmds):
+                        # it would wait for input() on the request thread
+                        raise ValueError("ask_table reads from the terminal and cannot run on the server")
+                    # fix the names of bare test/regress results before running
+                    cmds = scheduler.assign_store_keys(cmds, rt.env)
+                    for cmd in cmds:
+                        _, writes, _ = scheduler.accesses(cmd)
+                        written.extend(w for w in writes if not w.startswith("@"))
+                    rt.execute(cmds)
+                    response["ok"] = True
+                except Exception as e:
+                    traceback.print_exc(file=buf)
+                    response["ok"] = False
+                    response["error"] = f"{type(e).__name__}: {e}"
+            response["results"] = {name: to_jsonable(rt.env[name])
+                                   for name in dict.fromkeys(written) if name in rt.env}
+            response["skipped"] = [scheduler.statement_label(c) for c in rt.skipped]
+        response["output"] = buf.getvalue()
+        response["elapsed"] = time.perf_counter() - start
+        self.enforce_memory_cap(keep=session)
+        return response
+
+    def _frame_bytes(self, df) -> int:
+        entry = self._sizes.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        size = int(df.memory_usage(deep=True).sum())
+        self._sizes[id(df)] = (weakref.ref(df), size)
+        return size
+
+    def dataset_bytes(self) -> int:
+        """Memory of the distinct DataFrames held by all sessions."""
+        frames = {}
+        for s in list(self._sessions.values()):
+            for df in s.runtime.datasets().values():
+                frames[id(df)] = df
+        self._sizes = {k: v for k, v in self._sizes.items() if k in frames}
+        return sum(self._frame_bytes(df) for df in frames.values())
+
+    def enforce_memory_cap(self, keep: Optional[Session] = None) -> None:
+        """Release datasets of least recently used sessions until under the cap."""
+        with self._evict_lock:
+            while self.dataset_bytes() > self.memory_bytes:
+                victims = sorted((s for s in list(self._sessions.values())
+                                  if s is not keep and s.runtime.datasets()),
+                                 key=lambda s: s.last_used)
+                released = False
+                for victim in victims:
+                    # a session busy with a request is skipped, not waited for
+                    if not victim.lock.acquire(blocking=False):
+                        continue
+                    try:
+                        for name in list(victim.runtime.datasets()):
+                            released |= victim.runtime.unload(name)
+                    finally:
+                        victim.lock.release()
+                    if released:
+                        logger.info(f"Released the datasets of session '{victim.id}'")
+                        break
+                if not released:
+                    logger.warning("Dataset memory is over the cap but no idle session can release data")
+                    return
+
+    def describe_sessions(self) -> List[Dict[str, Any]]:
+        out = []
+        for s in list(self._sessions.values()):
+            out.append({
+                "session": s.id,
+                "requests": s.requests,
+                "idle_seconds": round(time.monotonic() - s.last_used, 3),
+                "datasets": {name: self._frame_bytes(df) for name, df in s.runtime.datasets().items()},
+            })
+        return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "StaticaServer"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> StaticaService:
+        return self.server.service
+
+    def _send(self, status: int, body: Any) -> None:
+        data = json.dumps(body, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Optional[Dict[str, Any]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request too large"})
+            return None
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"invalid JSON: {e}"})
+            return None
+        if not isinstance(body, dict):
+            self._send(HTTPStatus.BAD_REQUEST, {"error": "expected a JSON object"})
+            return None
+        return body
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(HTTPStatus.OK, {"ok": True, "sessions": len(self.service.describe_sessions()),
+                                       "dataset_bytes": self.service.dataset_bytes(),
+                                       "memory_cap_bytes": self.service.memory_bytes})
+        elif self.path == "/sessions":
+            self._send(HTTPStatus.OK, {"sessions": self.service.describe_sessions()})
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"no such endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        body = self._body()
+        if body is None:
+            return
+        if self.path == "/run":
+            script = body.get("script") or body.get("statement")
+            if not isinstance(script, str):
+                self._send(HTTPStatus.BAD_REQUEST, {"error": "'script' must be a string"})
+                return
+            try:
+                self._send(HTTPStatus.OK, self.service.run(script, body.get("session")))
+            except SessionLimitError as e:
+                self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        elif self.path == "/sessions":
+            try:
+                self._send(HTTPStatus.CREATED, {"session": self.service.new_session().id})
+            except SessionLimitError as e:
+                self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"no such endpoint: {self.path}"})
+
+    def do_DELETE(self) -> None:
+        prefix = "/sessions/"
+        if self.path.startswith(prefix) and self.service.drop_session(self.path[len(prefix):]):
+            self._send(HTTPStatus.OK, {"ok": True})
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"no such session: {self.path[len(prefix):]}"})
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a Unix socket left at `path` by an earlier server.
+
+    Raises:
+        FileExistsError: If something other than a socket is at `path`.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"'{path}' exists and is not a socket; refusing to replace it")
+    os.unlink(path)
+
+
+def make_server(service: StaticaService, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None):
+    """Create (but do not start) the HTTP server for `service`.
+
+    Args:
+        service: The sessions to serve.
+        host: Interface to listen on for TCP.
+        port: TCP port (0 picks a free one).
+        socket_path: Listen on this Unix socket instead of TCP.
+
+    Returns:
+        A socketserver instance; call ``serve_forever()`` on it.
+
+    Raises:
+        FileExistsError: If `socket_path` exists and is not a socket.
+    """
+    if socket_path:
+        _remove_stale_socket(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = _HTTPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+          memory_bytes: Optional[int] = None, max_sessions: Optional[int] = None) -> None:
+    """Run the server until interrupted."""
+    service = StaticaService(memory_bytes, max_sessions)
+    service.warm_up()
+    server = make_server(service, host, port, socket_path)
+    where = socket_path or "http://%s:%d" % server.server_address[:2]
+    print(f"[serve] Statica listening on {where} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path:
+            try:
+                _remove_stale_socket(socket_path)
+            except FileExistsError:
+                pass
@@ -0,0 +1,110 @@
+"""
+Compact column types for loaded datasets.
+
+``read_csv`` stores every integer column as int64, every float column as
+float64 and every text column as Python string objects. `compact_frame`
+shrinks a freshly loaded DataFrame without changing any value:
+
+- integers are downcast to the smallest integer type holding their range;
+- floats become float32 only where every value survives the round trip;
+- text columns with few distinct values (group labels, categorical
+  regression terms) become ``category`` columns: one small integer code per
+  row and each label stored once. Categories are sorted, like the levels
+  patsy derives from text columns, so models keep their reference level.
+  Labels of mixed types (numbers and text) that cannot be sorted keep the
+  order in which they first appear.
+
+Tests and models read categorical columns through their codes directly (see
+`group_codes` and `statica.stats.ols.encode_term`).
+"""
+
+from typing import Any, List, Tuple
+
+from statica.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# text columns become categorical when they have at most this many distinct
+# values per row (e.g. 0.5: every label appears twice on average)
+MAX_UNIQUE_RATIO = 0.5
+
+# DataFrame.attrs key holding the size of the frame before compaction
+SOURCE_BYTES = "statica.source_bytes"
+
+
+def memory_bytes(df) -> int:
+    """Memory used by a DataFrame, including the strings of object columns."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def category_levels(series) -> List[Any]:
+    """Distinct non-missing values of a text column: sorted, or in order of
+    first appearance when they cannot be compared (e.g. ints and strings)."""
+    levels = series.dropna().unique().tolist()
+    try:
+        return sorted(levels)
+    except TypeError:
+        return levels
+
+
+def _compact_column(series):
+    kind = series.dtype.kind
+    if kind in "iu":
+        return pd.to_numeric(series, downcast="integer" if kind == "i" else "unsigned")
+    if kind == "f" and series.dtype.itemsize > 4:
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+        return series
+    if kind == "O" or pd.api.types.is_string_dtype(series.dtype):
+        n = len(series)
+        if n and series.nunique(dropna=True) <= n * MAX_UNIQUE_RATIO:
+            return series.astype(pd.CategoricalDtype(category_levels(series)))
+    return series
+
+
+def compact_frame(df):
+    """Return `df` with compact column types (see the module docstring).
+
+    The size before compaction is recorded in ``df.attrs`` under
+    `SOURCE_BYTES`, so the load message can report it even when the compact
+    frame later comes from the dataset cache.
+
+    Args:
+        df: A DataFrame as returned by ``pandas.read_csv``.
+
+    Returns:
+        A new DataFrame; `df` is left untouched.
+    """
+    before = memory_bytes(df)
+    out = pd.DataFrame({col: _compact_column(df[col]) for col in df.columns}, index=df.index)
+    out.columns = df.columns
+    out.attrs[SOURCE_BYTES] = before
+    return out
+
+
+def group_codes(series) -> Tuple[Any, List[Any], List[int]]:
+    """Integer group codes of a `by` column.
+
+    Categorical columns hand out their codes as they are; other columns are
+    factorized. Missing values get code -1 either way.
+
+    Returns:
+        (codes, labels indexed by code, used codes in order of first appearance)
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        codes, labels = pd.factorize(series, sort=False)
+        return codes, list(labels), list(range(len(labels)))
+    codes = series.cat.codes.to_numpy()
+    order = pd.unique(codes[codes >= 0]).tolist()
+    return codes, list(series.cat.categories), order
+
+
+def format_bytes(n: int) -> str:
+    """Human-readable size (``12.3 MB``)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
@@ -0,0 +1,151 @@
+"""
+Persistent cache of parsed datasets.
+
+Parsing a large CSV file dominates the runtime of most scripts, and the same
+files are loaded again and again. The cache keeps a binary columnar copy of
+every parsed dataset (Feather when pyarrow is installed, a pandas pickle
+otherwise) keyed by the file's absolute path, size, modification time and the
+options it was read with, so an unchanged file is never parsed twice.
+
+The total size of the cache is capped; when it grows past the cap the least
+recently used entries are deleted. Entries are written to a temporary file
+and renamed into place, so several processes can share one cache directory.
+"""
+
+import importlib.util
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from statica.core import profiler
+from statica.core.config import cache_dir, settings
+from statica.core.lazy import lazy_import
+from .fingerprint import file_fingerprint
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+_FORMATS = (".feather", ".pkl")
+
+
+def _has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class DatasetCache:
+    """On-disk LRU cache of parsed DataFrames."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the entries (defaults to ``<cache dir>/datasets``).
+            max_bytes: Size cap for all entries (defaults to the configured setting).
+        """
+        self.root = Path(root) if root is not None else cache_dir("datasets")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.dataset_cache_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, path: str, options: Dict[str, Any]) -> Optional[str]:
+        """Return the cache key of `path` read with `options`, or None if it does not exist."""
+        return file_fingerprint(path, options)
+
+    def get(self, path: str, options: Dict[str, Any]):
+        """Return the cached DataFrame for `path`, or None on a miss."""
+        key = self.key(path, options)
+        if key is not None:
+            for ext in _FORMATS:
+                entry = self.root / (key + ext)
+                if not entry.exists():
+                    continue
+                try:
+                    df = pd.read_feather(entry) if ext == ".feather" else pd.read_pickle(entry)
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable dataset cache entry '{entry}': {e}")
+                    self._remove(entry)
+                    continue
+                # Touch the entry so eviction sees it as recently used.
+                try:
+                    os.utime(entry)
+                except OSError:
+                    pass
+                self.hits += 1
+                profiler.count("dataset_cache_hit")
+                return df
+        self.misses += 1
+        profiler.count("dataset_cache_miss")
+        return None
+
+    def put(self, path: str, options: Dict[str, Any], df) -> None:
+        """Store a parsed DataFrame for `path`, then evict old entries if over the cap."""
+        key = self.key(path, options)
+        if key is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            ext = ".pkl"
+            if _has_pyarrow():
+                try:
+                    df.to_feather(tmp)
+                    ext = ".feather"
+                except Exception:
+                    # e.g. non-string column labels; fall back to a pickle
+                    pass
+            if ext == ".pkl":
+                df.to_pickle(tmp)
+            os.replace(tmp, self.root / (key + ext))
+        except Exception as e:
+            logger.warning(f"Could not cache dataset '{path}': {e}")
+            self._remove(Path(tmp))
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its size cap."""
+        with self._lock:
+            entries = []
+            for entry in self.root.iterdir():
+                if entry.suffix not in _FORMATS:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                self._remove(entry)
+                total -= size
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        for entry in self.root.iterdir():
+            self._remove(entry)
+
+    @staticmethod
+    def _remove(entry: Path) -> None:
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+
+
+_default_cache: Optional[DatasetCache] = None
+
+
+def get_dataset_cache() -> DatasetCache:
+    """Return the process-wide dataset cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DatasetCache()
+    return _default_cache
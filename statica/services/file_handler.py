@@ -1 +1,263 @@
-# add the file finding and opening logic here from the validator file (validate_load)
\ No newline at end of file
+"""
+Binary column store for Statica datasets.
+
+A column store is a directory holding one raw array file per column and a
+small ``schema.json``::
+
+    study.stcol/
+        schema.json     {"format": "statica-columns", "version": 1, "rows": 1000,
+                         "columns": [{"name": "age", "dtype": "<i8", "file": "0.bin"},
+                                     {"name": "group", "dtype": "|i1", "file": "1.bin",
+                                      "categories": "1.categories.json"}, ...]}
+        0.bin
+        1.bin
+        1.categories.json   ["A", "B"]
+
+Numeric, boolean and datetime columns are stored as they are in memory;
+nullable numeric columns (``Int64``, ``Float64``) as float64 with NaN for
+missing values; any other column is dictionary-encoded as integer codes plus its sorted
+categories (kept in their own file, so opening a store with a column of
+many distinct labels stays instant). `write_column_store` writes one from a DataFrame
+(``statica convert`` does it from a CSV file).
+
+`load "study.stcol"` attaches a `ColumnStore` without parsing anything: the
+column files are opened with ``numpy.memmap`` and read through the page
+cache, so several processes using the same store share one copy of the
+data. The store behaves like a streaming dataset (it is a `ChunkedDataset`),
+and tests, models, `describe` and histograms walk it in slices of the mapped
+arrays. Box, scatter and line plots are the exception: they read the
+plotted columns into memory (as floats) before reducing them.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Optional
+
+from statica.core.config import settings
+from statica.core.lazy import lazy_import
+from statica.stats.moments import Moments, column_moments, grouped_moments, merge_column_moments
+from .compact import category_levels
+from .fingerprint import file_fingerprint
+from .streaming import ChunkedDataset
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FORMAT = "statica-columns"
+VERSION = 1
+SCHEMA = "schema.json"
+
+
+def is_column_store(path: str) -> bool:
+    """Whether `path` is a column store directory."""
+    return os.path.isfile(os.path.join(path, SCHEMA))
+
+
+def _json_name(value: Any) -> Any:
+    # column names and categories must survive a JSON round trip
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _is_nullable_number(dtype) -> bool:
+    return (isinstance(dtype, pd.api.extensions.ExtensionDtype)
+            and not isinstance(dtype, pd.CategoricalDtype)
+            and pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype))
+
+
+def write_column_store(df, path: str) -> None:
+    """Write a DataFrame as a column store directory.
+
+    The store is written next to `path` and moved into place at the end, so
+    readers never see a half-written store. An existing store is moved aside
+    before the new one takes its place and only removed afterwards, so a
+    crash part-way leaves either store on disk.
+
+    Args:
+        df: Data to store.
+        path: Directory to create (replaced if it exists).
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry: Dict[str, Any] = {"name": _json_name(name), "file": f"{i}.bin"}
+        kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+        if kind is not None and kind in "biufM":
+            values = series.to_numpy()
+        elif _is_nullable_number(series.dtype):
+            # Int64 / Float64: missing values become NaN, like a plain float column
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                cat = series.array
+            else:
+                cat = pd.Categorical(series, categories=category_levels(series))
+            values = np.asarray(cat.codes)
+            entry["categories"] = f"{i}.categories.json"
+            with open(os.path.join(tmp, entry["categories"]), "w", encoding="utf-8") as fh:
+                json.dump([_json_name(c) for c in cat.categories.tolist()], fh)
+        values = np.ascontiguousarray(values)
+        entry["dtype"] = values.dtype.str
+        values.tofile(os.path.join(tmp, entry["file"]))
+        columns.append(entry)
+    schema = {"format": FORMAT, "version": VERSION, "rows": len(df), "columns": columns}
+    with open(os.path.join(tmp, SCHEMA), "w", encoding="utf-8") as fh:
+        json.dump(schema, fh, indent=1)
+    old = None
+    if os.path.lexists(path):
+        old = f"{path}.old-{os.getpid()}"
+        shutil.rmtree(old, ignore_errors=True)
+        os.rename(path, old)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        if old is not None:
+            os.rename(old, path)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class ColumnStore(ChunkedDataset):
+    """Memory-mapped column store (see the module docstring)."""
+
+    def __init__(self, path: str, chunksize: Optional[int] = None) -> None:
+        """Open a column store; only its schema is read.
+
+        Args:
+            path: Store directory.
+            chunksize: Rows per slice (defaults to the streaming chunk setting).
+        """
+        with open(os.path.join(path, SCHEMA), encoding="utf-8") as fh:
+            schema = json.load(fh)
+        if schema.get("format") != FORMAT or schema.get("version") != VERSION:
+            raise ValueError(f"'{path}' is not a Statica column store (version {VERSION})")
+        self.path = path
+        self.read_options = {}
+        self.chunksize = chunksize or settings.stream_chunk_rows
+        self.rows: int = schema["rows"]
+        self._schema = {c["name"]: c for c in schema["columns"]}
+        self.columns: List[Any] = [c["name"] for c in schema["columns"]]
+        self._arrays: Dict[Any, Any] = {}
+        self._categories: Dict[Any, List[Any]] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Identity of the store: every write replaces its schema file."""
+        return file_fingerprint(os.path.join(self.path, SCHEMA), {"column_store": True}) or ""
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def array(self, column: Any):
+        """The stored array of a column (codes for dictionary-encoded columns), memory-mapped."""
+        self._require(column)
+        arr = self._arrays.get(column)
+        if arr is None:
+            entry = self._schema[column]
+            dtype = np.dtype(entry["dtype"])
+            if self.rows == 0:
+                arr = np.empty(0, dtype=dtype)
+            else:
+                arr = np.memmap(os.path.join(self.path, entry["file"]), dtype=dtype,
+                                mode="r", shape=(self.rows,))
+            self._arrays[column] = arr
+        return arr
+
+    def categories(self, column: Any) -> Optional[List[Any]]:
+        """Labels of a dictionary-encoded column, or None for a plain one."""
+        self._require(column)
+        name = self._schema[column].get("categories")
+        if name is None:
+            return None
+        cats = self._categories.get(column)
+        if cats is None:
+            with open(os.path.join(self.path, name), encoding="utf-8") as fh:
+                cats = self._categories[column] = json.load(fh)
+        return cats
+
+    def numeric_columns(self) -> List[Any]:
+        """Columns stored as numbers (not dictionary-encoded, not booleans or dates)."""
+        return [c for c in self.columns
+                if "categories" not in self._schema[c] and np.dtype(self._schema[c]["dtype"]).kind in "iuf"]
+
+    def _slices(self) -> Iterator[slice]:
+        for start in range(0, self.rows, self.chunksize):
+            yield slice(start, min(start + self.chunksize, self.rows))
+
+    def _series(self, column: Any, rows: slice):
+        values = self.array(column)[rows]
+        cats = self.categories(column)
+        if cats is not None:
+            values = pd.Categorical.from_codes(values, categories=cats)
+        return pd.Series(values, index=pd.RangeIndex(rows.start, rows.stop), name=column, copy=False)
+
+    def _numeric_slice(self, column: Any, rows: slice):
+        if self.categories(column) is not None:
+            # text labels have no numeric value
+            return np.full(rows.stop - rows.start, np.nan)
+        return np.asarray(self.array(column)[rows], dtype=float)
+
+    def chunks(self, columns: Optional[List[Any]] = None) -> Iterator[Any]:
+        """Yield consecutive DataFrames over slices of the mapped columns.
+
+        Args:
+            columns: Only these columns (all of them when None).
+        """
+        columns = list(self.columns if columns is None else columns)
+        self._require(*columns)
+        for rows in self._slices():
+            yield pd.DataFrame({c: self._series(c, rows) for c in columns}, columns=columns)
+
+    def moments(self, column: Any) -> Moments:
+        """Count, mean and M2 of one numeric column."""
+        self._require(column)
+        total = Moments()
+        for rows in self._slices():
+            total.merge(grouped_moments(self._numeric_slice(column, rows))[0])
+        return total
+
+    def column_moments(self, columns: List[Any]):
+        """Per-column (n, mean, m2) arrays of several numeric columns."""
+        self._require(*columns)
+        total = None
+        for rows in self._slices():
+            part = column_moments(np.column_stack([self._numeric_slice(c, rows) for c in columns]))
+            total = part if total is None else merge_column_moments(total, part)
+        if total is None:
+            total = column_moments(np.empty((0, len(columns))))
+        return total
+
+    def grouped_moments(self, column: Any, by: Any) -> Dict[Any, Moments]:
+        """Count, mean and M2 of `column` per value of `by`, groups in order of first appearance.
+
+        A dictionary-encoded `by` column is grouped by its stored codes.
+        """
+        cats = self.categories(by)
+        if cats is None:
+            return super().grouped_moments(column, by)
+        self._require(column)
+        totals = [Moments() for _ in cats]
+        order: List[int] = []
+        seen = np.zeros(len(cats), dtype=bool)
+        codes = self.array(by)
+        for rows in self._slices():
+            chunk_codes = np.asarray(codes[rows])
+            for c in pd.unique(chunk_codes[chunk_codes >= 0]).tolist():
+                if not seen[c]:
+                    seen[c] = True
+                    order.append(c)
+            per_group = grouped_moments(self._numeric_slice(column, rows), chunk_codes, len(cats))
+            for total, m in zip(totals, per_group):
+                total.merge(m)
+        return {cats[c]: totals[c] for c in order if totals[c].n}
+
+    def __repr__(self) -> str:
+        return f"<ColumnStore '{self.path}' ({self.rows} rows x {len(self.columns)} cols)>"
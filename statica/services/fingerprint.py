@@ -0,0 +1,79 @@
+"""
+Dataset fingerprints.
+
+A fingerprint is a short hex digest that changes whenever the content of a
+dataset may have changed. Datasets loaded from a file are identified by
+where they came from (path, size, modification time and load options),
+which costs a `stat` call; any other DataFrame is identified by hashing its
+content.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from statica.core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+_SOURCES: Dict[int, Tuple[Any, str]] = {}
+_LOCK = threading.Lock()
+
+
+def file_fingerprint(path: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Fingerprint of the file at `path` read with `options`, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    ident = json.dumps({
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime": st.st_mtime_ns,
+        "options": options or {},
+    }, sort_keys=True, default=repr)
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+def files_fingerprint(paths: List[str], options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Fingerprint of a dataset read from several files, or None if one does not exist."""
+    parts = [file_fingerprint(p, options) for p in paths]
+    if any(p is None for p in parts):
+        return None
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def remember(df: Any, fingerprint: Optional[str]) -> None:
+    """Record the source fingerprint of a DataFrame loaded from a file."""
+    if fingerprint is None:
+        return
+    key = id(df)
+
+    def forget(_ref, key=key):
+        with _LOCK:
+            entry = _SOURCES.get(key)
+            if entry is not None and entry[0] is _ref:
+                del _SOURCES[key]
+
+    with _LOCK:
+        _SOURCES[key] = (weakref.ref(df, forget), fingerprint)
+
+
+def fingerprint(obj: Any) -> str:
+    """Fingerprint of a dataset (DataFrame, streaming handle or column store)."""
+    source = getattr(obj, "fingerprint", None)
+    if isinstance(source, str):
+        return source
+    with _LOCK:
+        entry = _SOURCES.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    if isinstance(obj, pd.DataFrame):
+        h = hashlib.sha256()
+        h.update(repr([(str(c), str(t)) for c, t in obj.dtypes.items()]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+    raise TypeError(f"Cannot fingerprint object of type {type(obj).__name__}")
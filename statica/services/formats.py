@@ -0,0 +1,207 @@
+"""
+File formats Statica can load.
+
+Every format is a `Format` in a registry. `detect` picks the format of a
+file from its extension (``.parquet``, ``.feather``, ``.jsonl.gz``, ...)
+and, for unknown extensions, from its first bytes. Anything else is read as
+CSV. The loaders call `read` and `read_columns` and never need to know which
+format they are dealing with.
+
+Supported formats:
+
+- CSV, plain or compressed with gzip, bz2, xz or zstd (zstd needs the
+  ``zstandard`` package). With pyarrow installed, CSV files are parsed by
+  its multithreaded reader (``settings.csv_engine``);
+- Parquet and Feather / Arrow IPC files (need ``pyarrow``);
+- JSON Lines (one JSON object per line), plain or compressed.
+
+A new format is added with `register`.
+"""
+
+import importlib.util
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from statica.core.config import settings
+from statica.core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+_COMPRESSION = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd", ".zstd": "zstd"}
+_COMPRESSION_MAGIC = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"),
+                      (b"\x28\xb5\x2f\xfd", "zstd"))
+
+
+class Format:
+    """One file format.
+
+    Args:
+        name: Short name (``"parquet"``).
+        extensions: File name suffixes, without compression suffixes.
+        read: ``read(path, header, usecols, compression)`` returning a DataFrame.
+        columns: ``columns(path, header, compression)`` returning the column
+            names without reading the rows; None reads the file.
+        magic: Byte prefixes identifying the format when the extension is unknown.
+        cache: Whether parsed files go to the dataset cache. Formats that
+            load about as fast as the cache itself are not cached.
+    """
+
+    def __init__(self, name: str, extensions: Sequence[str], read: Callable[..., Any],
+                 columns: Optional[Callable[..., List[Any]]] = None,
+                 magic: Sequence[bytes] = (), cache: bool = True) -> None:
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.read = read
+        self.columns = columns
+        self.magic = tuple(magic)
+        self.cache = cache
+
+    def __repr__(self) -> str:
+        return f"<Format {self.name}>"
+
+
+_REGISTRY: List[Format] = []
+
+
+def register(fmt: Format) -> Format:
+    """Add a format; formats registered later win ties on extension."""
+    _REGISTRY.insert(0, fmt)
+    return fmt
+
+
+def has_pyarrow() -> bool:
+    """Whether pyarrow is installed (checked without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _head(path: str, size: int = 8) -> bytes:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(size)
+    except OSError:
+        return b""
+
+
+def detect(path: str) -> Tuple[Format, Optional[str]]:
+    """Format and compression ("gzip", "zstd", ... or None) of a data file."""
+    name = os.path.basename(path).lower()
+    root, ext = os.path.splitext(name)
+    compression = _COMPRESSION.get(ext)
+    if compression is not None:
+        name = root
+    for fmt in _REGISTRY:
+        if name.endswith(fmt.extensions):
+            return fmt, compression
+    head = _head(path)
+    for prefix, kind in _COMPRESSION_MAGIC:
+        if head.startswith(prefix):
+            return _CSV, kind
+    for fmt in _REGISTRY:
+        if any(head.startswith(m) for m in fmt.magic):
+            return fmt, None
+    if head.lstrip()[:1] == b"{":
+        return _JSONL, None
+    return _CSV, compression
+
+
+def read(path: str, header: Any = "infer", usecols: Optional[List[Any]] = None):
+    """Read a data file of any registered format into a DataFrame.
+
+    Args:
+        path: File to read.
+        header: Header row for text formats (``pandas.read_csv`` semantics).
+        usecols: Only read these columns.
+    """
+    fmt, compression = detect(path)
+    return fmt.read(path, header, usecols, compression)
+
+
+def read_columns(path: str, header: Any = "infer") -> List[Any]:
+    """Column names of a data file, reading as little of it as the format allows."""
+    fmt, compression = detect(path)
+    if fmt.columns is not None:
+        return fmt.columns(path, header, compression)
+    return list(fmt.read(path, header, None, compression).columns)
+
+
+# -- CSV ----------------------------------------------------------------------
+
+def _csv_engine() -> Optional[str]:
+    engine = settings.csv_engine
+    if engine == "auto":
+        return "pyarrow" if has_pyarrow() else None
+    return None if engine == "c" else engine
+
+
+def _read_csv(path, header, usecols, compression):
+    options: Dict[str, Any] = {"header": header, "compression": compression or "infer"}
+    if usecols is not None:
+        options["usecols"] = usecols
+    engine = _csv_engine()
+    if engine is not None:
+        # the pyarrow engine takes a row number, not "infer"
+        arrow_options = dict(options, header=0 if header == "infer" else header)
+        try:
+            return pd.read_csv(path, engine=engine, **arrow_options)
+        except ValueError:
+            # options or content the multithreaded reader does not handle
+            pass
+    return pd.read_csv(path, **options)
+
+
+def _csv_columns(path, header, compression):
+    return list(pd.read_csv(path, header=header, nrows=0, compression=compression or "infer").columns)
+
+
+# -- Parquet and Feather / Arrow IPC --------------------------------------------
+
+def _need_pyarrow(what: str) -> None:
+    if not has_pyarrow():
+        raise ImportError(f"reading {what} files needs pyarrow (pip install pyarrow)")
+
+
+def _read_parquet(path, header, usecols, compression):
+    _need_pyarrow("Parquet")
+    return pd.read_parquet(path, columns=usecols)
+
+
+def _parquet_columns(path, header, compression):
+    _need_pyarrow("Parquet")
+    import pyarrow.parquet as pq
+
+    return list(pq.read_schema(path).names)
+
+
+def _read_feather(path, header, usecols, compression):
+    _need_pyarrow("Feather")
+    return pd.read_feather(path, columns=usecols)
+
+
+def _feather_columns(path, header, compression):
+    _need_pyarrow("Feather")
+    import pyarrow.ipc as ipc
+
+    with ipc.open_file(path) as reader:
+        return list(reader.schema.names)
+
+
+# -- JSON Lines -----------------------------------------------------------------
+
+def _read_jsonl(path, header, usecols, compression):
+    options: Dict[str, Any] = {"lines": True, "compression": compression or "infer"}
+    if has_pyarrow() and compression is None:
+        options["engine"] = "pyarrow"
+    df = pd.read_json(path, **options)
+    return df[usecols] if usecols is not None else df
+
+
+def _jsonl_columns(path, header, compression):
+    return list(pd.read_json(path, lines=True, nrows=1, compression=compression or "infer").columns)
+
+
+_CSV = register(Format("csv", (".csv",), _read_csv, _csv_columns))
+_JSONL = register(Format("jsonl", (".jsonl", ".ndjson"), _read_jsonl, _jsonl_columns))
+register(Format("feather", (".feather", ".arrow", ".ipc"), _read_feather, _feather_columns,
+                magic=(b"ARROW1",), cache=False))
+register(Format("parquet", (".parquet", ".pq"), _read_parquet, _parquet_columns,
+                magic=(b"PAR1",), cache=False))
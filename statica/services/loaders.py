@@ -0,0 +1,176 @@
+"""
+Dataset loading for Statica.
+
+Single entry point used by the runtime, the interpreter and the load command
+to turn a file name into a DataFrame, whatever its format (see `formats`).
+A glob pattern loads a dataset split across many files: the files are read
+concurrently, checked for a common schema and concatenated.
+Parsed files are served from the dataset cache (see `dataset_cache`)
+whenever the file is unchanged, and a file whose DataFrame is still alive in
+the process is not read at all.
+"""
+
+import glob
+import os
+import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from statica.core import profiler
+from statica.core.config import settings
+from statica.core.lazy import lazy_import
+from . import formats
+from .compact import compact_frame
+from .dataset_cache import get_dataset_cache
+from .fingerprint import file_fingerprint, files_fingerprint, remember
+
+pd = lazy_import("pandas")
+
+# DataFrames loaded by this process that are still referenced, by source
+# fingerprint. Statements never modify a dataset, so loading an unchanged
+# file again (in the same script, or in a later request of `statica serve`)
+# can hand out the same object.
+_live: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+_live_lock = threading.Lock()
+
+
+def load_dataset(path: str, header: Any = "infer", compact: bool = False,
+                 usecols: Optional[List[Any]] = None):
+    """Read the data file (or files) at `path` into a DataFrame.
+
+    The DataFrame is registered with its source fingerprint, so caches keyed
+    on the dataset never need to hash its content.
+
+    Args:
+        path: File to read, or a glob pattern (``exports/2026-*.csv``) whose
+            matches are read on ``settings.load_workers`` threads and
+            concatenated in file name order.
+        header: Header row of text formats (``pandas.read_csv`` semantics).
+        compact: Shrink the column types (see `compact.compact_frame`); the
+            dataset cache then stores the compact frame.
+        usecols: Only read these columns.
+
+    Returns:
+        The loaded DataFrame.
+    """
+    options: Dict[str, Any] = {"header": header}
+    if usecols is not None:
+        options["usecols"] = list(usecols)
+    if compact:
+        options["compact"] = True
+    files = expand_pattern(path) if glob.has_magic(path) else None
+    fp = file_fingerprint(path, options) if files is None else files_fingerprint(files, options)
+    # "off" and "refresh" both mean: parse the file, even if this process has it
+    if fp is not None and settings.dataset_cache not in ("off", "refresh"):
+        with _live_lock:
+            df = _live.get(fp)
+        if df is not None:
+            # already loaded by this process
+            profiler.count("dataset_cache_hit")
+            return df
+    df = _read(path, options) if files is None else _read_many(files, options)
+    if fp is not None:
+        remember(df, fp)
+        with _live_lock:
+            _live[fp] = df
+    return df
+
+
+def expand_pattern(path: str) -> List[str]:
+    """Files matching a glob pattern, sorted; a plain path is returned as is.
+
+    Raises:
+        FileNotFoundError: When a pattern matches no file.
+    """
+    if not glob.has_magic(path):
+        return [path]
+    files = sorted(f for f in glob.glob(path, recursive=True) if os.path.isfile(f))
+    if not files:
+        raise FileNotFoundError(f"no files match '{path}'")
+    return files
+
+
+def read_header(path: str, header: Any = "infer") -> list:
+    """Column names of the data file at `path` (the first match of a pattern), without reading its rows."""
+    return formats.read_columns(expand_pattern(path)[0], header)
+
+
+def dataset_name(path: str) -> str:
+    """Name a bare `load` statement binds the file to (``data/study.csv`` -> ``study``).
+
+    Glob characters and what follows them are dropped (``sales_*.csv`` -> ``sales``).
+    """
+    stem = path.split("/")[-1].split(".")[0]
+    return re.split(r"[*?\[]", stem)[0].rstrip("_-") or stem
+
+
+def check_schema(files: List[str], columns: List[List[Any]]) -> None:
+    """Raise ValueError unless every file has the columns of the first one.
+
+    Args:
+        files: File names, for the message.
+        columns: Column names of each file.
+    """
+    first = columns[0]
+    for f, cols in zip(files[1:], columns[1:]):
+        if set(cols) != set(first):
+            missing = [c for c in first if c not in cols]
+            extra = [c for c in cols if c not in first]
+            raise ValueError(f"'{f}' does not have the columns of '{files[0]}' "
+                             f"(missing: {missing or 'none'}, extra: {extra or 'none'})")
+
+
+def _part_kinds(df) -> Dict[Any, bool]:
+    # numeric or not, per column; all-missing columns fit either
+    return {c: pd.api.types.is_numeric_dtype(df[c]) for c in df.columns if df[c].notna().any()}
+
+
+def _read_many(files: List[str], options: dict):
+    # each file goes through load_dataset, so unchanged partitions come from the cache
+    part_options = {k: v for k, v in options.items() if k in ("header", "usecols")}
+    workers = max(1, min(settings.load_workers, len(files)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="statica-load") as pool:
+        frames = list(pool.map(lambda f: load_dataset(f, **part_options), files))
+    check_schema(files, [list(df.columns) for df in frames])
+    order = list(frames[0].columns)
+    kinds = _part_kinds(frames[0])
+    for i, (f, df) in enumerate(zip(files, frames)):
+        for col, numeric in _part_kinds(df).items():
+            if kinds.setdefault(col, numeric) != numeric:
+                raise ValueError(f"column '{col}' is {'numeric' if numeric else 'text'} in '{f}' "
+                                 f"but not in the files before it")
+        if list(df.columns) != order:
+            frames[i] = df[order]
+    df = pd.concat(frames, ignore_index=True)
+    # categories are only known once every partition is in
+    return compact_frame(df) if options.get("compact") else df
+
+
+def _parse(path: str, options: dict):
+    df = formats.read(path, options["header"], options.get("usecols"))
+    return compact_frame(df) if options.get("compact") else df
+
+
+def _read(path: str, options: dict):
+    mode = settings.dataset_cache
+    if (mode == "off" or _file_size(path) < settings.dataset_cache_min_bytes
+            or not formats.detect(path)[0].cache):
+        return _parse(path, options)
+
+    cache = get_dataset_cache()
+    if mode != "refresh":
+        df = cache.get(path, options)
+        if df is not None:
+            return df
+    df = _parse(path, options)
+    cache.put(path, options, df)
+    return df
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
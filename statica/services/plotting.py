@@ -0,0 +1,316 @@
+"""
+Plot rendering for Statica.
+
+Plots written to files never touch pyplot: each one is drawn on its own
+`Figure` with the non-interactive Agg canvas, saved and released at once, so
+rendering works on machines without a display, does not depend on global
+pyplot state, and memory stays flat across hundreds of plots. File plots are
+rendered on a pool of worker processes (see `PlotRenderer`); the statement
+only extracts the columns and reduces them with `prepare` (binning,
+density aggregation, decimation), so large datasets never reach matplotlib
+point by point.
+
+Only plots without an output file (and without a plot directory) go through
+pyplot and ``plt.show()``, as before.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from statica.core.config import settings
+from statica.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+KINDS = ("histogram", "box", "scatter", "line")
+
+
+def _finite(*arrays):
+    mask = np.ones(len(arrays[0]), dtype=bool)
+    for a in arrays:
+        mask &= np.isfinite(a)
+    return [a[mask] for a in arrays]
+
+
+def lttb(x, y, n_out: int):
+    """Largest-Triangle-Three-Buckets downsampling of a line sorted by `x`.
+
+    Keeps the first and last point and, from each of ``n_out - 2`` equal
+    buckets in between, the point forming the largest triangle with the point
+    kept before it and the average of the next bucket. Peaks and troughs
+    survive, unlike with plain striding.
+
+    Args:
+        x: Horizontal values, ascending.
+        y: Vertical values.
+        n_out: Number of points to keep.
+
+    Returns:
+        The kept (x, y) points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    # bucket i covers [edges[i], edges[i + 1]); the first and last points are fixed
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # the "next bucket" of the last bucket is the last point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def density_grid(h, v, bins: int):
+    """2D histogram on a uniform grid in one pass (faster than ``numpy.histogram2d``).
+
+    Returns:
+        (counts, h_edges, v_edges) with counts indexed [h_bin, v_bin].
+    """
+    h_edges = np.linspace(h.min(), h.max(), bins + 1)
+    v_edges = np.linspace(v.min(), v.max(), bins + 1)
+
+    def bin_index(values, edges):
+        span = edges[-1] - edges[0]
+        scale = bins / span if span > 0 else 0.0
+        return np.minimum(((values - edges[0]) * scale).astype(np.int64), bins - 1)
+
+    flat = bin_index(h, h_edges) * bins + bin_index(v, v_edges)
+    counts = np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+    return counts, h_edges, v_edges
+
+
+def histogram_chunks(chunks: Callable[[], Iterable[Any]], bins: Optional[int] = None):
+    """Histogram of values given chunk by chunk, in two passes and bounded memory.
+
+    The first pass finds the range, the second counts each chunk into the
+    same edges as ``numpy.histogram`` would use for all the values at once.
+
+    Args:
+        chunks: Called once per pass; returns an iterable of float arrays.
+        bins: Number of bins (default 20).
+
+    Returns:
+        (counts, edges)
+    """
+    bins = bins or 20
+    lo, hi = np.inf, -np.inf
+    for values in chunks():
+        (values,) = _finite(values)
+        if len(values):
+            lo, hi = min(lo, values.min()), max(hi, values.max())
+    if lo > hi:
+        return np.histogram(np.empty(0), bins=bins)
+    edges = np.histogram_bin_edges(np.array([lo, hi]), bins=bins)
+    counts = np.zeros(bins, dtype=np.int64)
+    for values in chunks():
+        (values,) = _finite(values)
+        counts += np.histogram(values, bins=edges)[0]
+    return counts, edges
+
+
+def _box_stats(values) -> Dict[str, Any]:
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    fliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(fliers) > 1000:
+        # the shape of the outlier cloud, not every point
+        fliers = np.quantile(fliers, np.linspace(0, 1, 1000))
+    return {"med": med, "q1": q1, "q3": q3,
+            "whislo": inside.min() if len(inside) else q1,
+            "whishi": inside.max() if len(inside) else q3,
+            "fliers": fliers}
+
+
+def prepare(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a plot job to what actually gets drawn.
+
+    Runs before the job is handed to matplotlib (and to a render worker), so
+    neither ever sees millions of points:
+
+    - histograms are binned with one ``numpy.histogram`` pass;
+    - box plots are reduced to their quartiles, whiskers and (at most 1000) outliers;
+    - scatter plots above ``settings.plot_max_points`` points become a 2D
+      density grid of ``settings.plot_density_bins`` cells a side;
+    - line plots are sorted and, above ``settings.plot_line_points`` points,
+      decimated with `lttb`.
+
+    Args:
+        job: ``kind``, ``x`` (values), ``xlabel``, optional ``y`` and
+            ``ylabel`` (the values plotted against, on the horizontal
+            axis) and ``bins`` for histograms.
+
+    Returns:
+        A new job dict; jobs that are already prepared are returned as is.
+    """
+    if job.get("prepared"):
+        return job
+    kind, x, y = job["kind"], job["x"], job.get("y")
+    out = {k: v for k, v in job.items() if k not in ("x", "y")}
+    out["prepared"] = True
+    if kind == "histogram":
+        (x,) = _finite(x)
+        out["counts"], out["edges"] = np.histogram(x, bins=job.get("bins") or 20)
+    elif kind == "box":
+        (x,) = _finite(x)
+        out["stats"] = _box_stats(x) if len(x) else None
+    elif kind in ("scatter", "line"):
+        # `plot a vs b` puts b on the horizontal axis
+        h = y if y is not None else np.arange(len(x), dtype=float)
+        h, x = _finite(h, x)
+        if kind == "scatter" and len(x) > settings.plot_max_points:
+            bins = settings.plot_density_bins
+            out["density"] = density_grid(h, x, bins)
+            out["n"] = len(x)
+        elif kind == "line":
+            if len(h) > 1 and not np.all(h[1:] >= h[:-1]):
+                order = np.argsort(h)
+                h, x = h[order], x[order]
+            out["h"], out["v"] = lttb(h, x, settings.plot_line_points)
+        else:
+            out["h"], out["v"] = h, x
+    else:
+        raise ValueError(f"Unknown plot kind '{kind}'")
+    return out
+
+
+def draw(fig, job: Dict[str, Any]) -> None:
+    """Draw a plot job (see `prepare`) onto a matplotlib Figure."""
+    job = prepare(job)
+    kind, xlabel, ylabel = job["kind"], job["xlabel"], job.get("ylabel")
+    ax = fig.add_subplot(111)
+    if kind == "histogram":
+        ax.stairs(job["counts"], job["edges"], fill=True)
+        ax.set_title(f"Histogram of {xlabel}")
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel("Frequency")
+    elif kind == "box":
+        if job["stats"] is not None:
+            ax.bxp([job["stats"]])
+        ax.set_xticks([1], [xlabel])
+    elif kind in ("scatter", "line"):
+        if "density" in job:
+            from matplotlib.colors import LogNorm
+
+            counts, xedges, yedges = job["density"]
+            counts = np.ma.masked_equal(counts, 0)
+            mesh = ax.pcolormesh(xedges, yedges, counts.T, norm=LogNorm(), cmap="viridis")
+            fig.colorbar(mesh, ax=ax, label=f"points per cell (n={job['n']:,})")
+        elif kind == "scatter":
+            ax.scatter(job["h"], job["v"], s=8)
+        else:
+            ax.plot(job["h"], job["v"])
+        ax.set_title(f"{xlabel} vs {ylabel}" if ylabel else xlabel)
+        ax.set_xlabel(ylabel if ylabel else "index")
+        ax.set_ylabel(xlabel)
+    else:
+        raise ValueError(f"Unknown plot kind '{kind}'")
+    fig.tight_layout()
+
+
+def render_to_file(job: Dict[str, Any], path: str) -> str:
+    """Render a plot job to an image file with the Agg canvas; returns the path."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=job.get("figsize", (6.4, 4.8)))
+    FigureCanvasAgg(fig)
+    try:
+        draw(fig, job)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fig.savefig(path, dpi=job.get("dpi", 100))
+    finally:
+        fig.clear()
+    return path
+
+
+def show(job: Dict[str, Any]) -> None:
+    """Draw a plot job in a pyplot window (interactive mode)."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    try:
+        draw(fig, job)
+        plt.show()
+    finally:
+        plt.close(fig)
+
+
+def _warm_worker() -> None:
+    # import matplotlib once per worker, not in the first render
+    import matplotlib.backends.backend_agg  # noqa: F401
+
+
+class PlotRenderer:
+    """Renders plot jobs to files, in worker processes when there is more than one.
+
+    With one worker, jobs are rendered synchronously in the calling thread;
+    starting a process would cost more than drawing.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.workers = workers if workers is not None else settings.plot_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: Dict[str, Any], path: str) -> Future:
+        """Queue a job; the future resolves to the written path."""
+        if self.workers <= 1:
+            fut: Future = Future()
+            try:
+                fut.set_result(render_to_file(job, path))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs statement threads is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_warm_worker)
+            return self._pool.submit(render_to_file, job, path)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_renderer: Optional[PlotRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> PlotRenderer:
+    """Return the process-wide renderer."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PlotRenderer()
+        return _renderer
+
+
+def default_file_name(job: Dict[str, Any], index: int) -> str:
+    """File name of an unnamed plot written to the plot directory."""
+    parts = [f"plot{index:03d}", job["kind"], job["xlabel"]]
+    if job.get("ylabel"):
+        parts += ["vs", job["ylabel"]]
+    name = "_".join(parts)
+    return "".join(c if c.isalnum() or c in "_-." else "_" for c in name) + ".png"
+
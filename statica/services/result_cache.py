@@ -0,0 +1,203 @@
+"""
+Persistent, content-addressed cache of test and model results.
+
+Re-running a script recomputes every `test` and `regress` even when neither
+the data nor the statement changed. Results are stored on disk under a hash
+of the input dataset's fingerprint (see `fingerprint`) and the normalized
+command dict, so an unchanged statement is answered from the cache.
+
+The key also holds the Statica version and a hash of the statistics kernels
+(``statica/stats``), so results computed by older code are not served after
+an upgrade or a fix to a kernel.
+
+Entries are pickled to a temporary file and renamed into place, which makes
+writes atomic for concurrent readers in other processes. Eviction (least
+recently used first, once the size cap is exceeded) runs under an exclusive
+lock file so two processes never evict at the same time.
+"""
+
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import statica
+from statica.core import profiler
+from statica.core.config import cache_dir, settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is then only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of stored results changes.
+FORMAT_VERSION = 1
+
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """Statica version and a digest of the kernels that compute cached results."""
+    h = hashlib.sha256()
+    for source in sorted((Path(__file__).resolve().parent.parent / "stats").glob("*.py")):
+        h.update(source.name.encode("utf-8") + b"\0" + source.read_bytes())
+    return f"{statica.__version__}:{h.hexdigest()[:16]}"
+
+
+def normalize_command(cmd: Dict[str, Any]) -> str:
+    """Canonical JSON text of a command dict (key order and float formatting fixed)."""
+    return json.dumps(cmd, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class ResultCache:
+    """On-disk memo store for results keyed by (dataset fingerprint, command)."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the entries (defaults to ``<cache dir>/results``).
+            max_bytes: Size cap for all entries (defaults to the configured setting).
+        """
+        self.root = Path(root) if root is not None else cache_dir("results")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.result_cache_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # estimated size of the directory; a full scan only happens when it passes the cap
+        self._size: Optional[int] = None
+
+    def key(self, dataset_fingerprint: str, cmd: Dict[str, Any]) -> str:
+        """Return the cache key of `cmd` evaluated on a dataset."""
+        text = f"{FORMAT_VERSION}\0{code_version()}\0{dataset_fingerprint}\0{normalize_command(cmd)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, result) on a hit and (False, None) on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            value = _MISSING
+        except Exception as e:
+            logger.warning(f"Dropping unreadable result cache entry '{path}': {e}")
+            self._remove(path)
+            value = _MISSING
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                profiler.count("result_cache_miss")
+                return False, None
+            self.hits += 1
+        profiler.count("result_cache_hit")
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result, then evict old entries if the cache is over its cap."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError as e:
+            logger.warning(f"Could not store result in cache: {e}")
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            written = path.stat().st_size
+        except Exception as e:
+            logger.warning(f"Could not store result in cache: {e}")
+            self._remove(Path(tmp))
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += written
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self):
+        for path in self.root.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            yield st.st_mtime, st.st_size, path
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / ".lock", "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its size cap."""
+        with self._exclusive():
+            entries = list(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+            self._size = total
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._exclusive():
+            for path in self.root.glob("*/*.pkl"):
+                self._remove(path)
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters of this process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+_default_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the process-wide result cache, or None when it is switched off."""
+    global _default_cache
+    if settings.result_cache == "off":
+        return None
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -0,0 +1,191 @@
+"""
+Out-of-core datasets.
+
+`load "big.csv" streaming` binds a `ChunkedDataset` instead of a DataFrame.
+The handle only remembers where the data lives; every command that uses it
+reads the file (or, for a glob pattern, each matching file in turn) again in
+fixed-size chunks and folds each chunk into mergeable
+summaries (see `statica.stats.moments`), so memory use does not depend on the
+number of rows.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+from statica.core.config import settings
+from statica.core.lazy import lazy_import
+from statica.stats.moments import Moments, column_moments, grouped_moments, merge_column_moments
+from statica.stats.sketches import approx_describe, frame_chunks
+from . import formats
+from .fingerprint import files_fingerprint
+from .loaders import check_schema, expand_pattern
+
+pd = lazy_import("pandas")
+
+
+def _is_numeric(series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class ChunkedDataset:
+    """Handle on a CSV file (or a set of CSV files) that is processed chunk by chunk."""
+
+    def __init__(self, path: str, header: Any = "infer", chunksize: Optional[int] = None,
+                 **read_options: Any) -> None:
+        """Attach a data file without reading its rows.
+
+        Args:
+            path: File to read, or a glob pattern matching files with the same columns.
+            header: Passed to ``pandas.read_csv``.
+            chunksize: Rows per chunk (defaults to the configured setting).
+            read_options: Further ``pandas.read_csv`` options.
+        """
+        self.path = path
+        self.files = expand_pattern(path)
+        self.chunksize = chunksize or settings.stream_chunk_rows
+        self.read_options = dict(read_options, header=header)
+        self._compression: Dict[str, Any] = {}
+        headers = []
+        for f in self.files:
+            fmt, compression = formats.detect(f)
+            if fmt.name != "csv":
+                raise ValueError(f"streaming loads read CSV files, not {fmt.name} "
+                                 f"(convert '{f}' to a column store with 'statica convert')")
+            self._compression[f] = compression or "infer"
+            # Reading zero rows validates the file and gives us the column labels.
+            headers.append(list(pd.read_csv(f, nrows=0, compression=self._compression[f],
+                                            **self.read_options).columns))
+        check_schema(self.files, headers)
+        self.columns: List[Any] = headers[0]
+        self._numeric_columns: Optional[List[Any]] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Identity of the underlying files, for result caching."""
+        return files_fingerprint(self.files, dict(self.read_options, streaming=True)) or ""
+
+    def chunks(self, columns: Optional[List[Any]] = None) -> Iterator[Any]:
+        """Yield the dataset as consecutive DataFrames of at most `chunksize` rows.
+
+        Args:
+            columns: Only read these columns (all of them when None).
+        """
+        options = dict(self.read_options)
+        if columns is not None:
+            options["usecols"] = list(columns)
+        for f in self.files:
+            with pd.read_csv(f, chunksize=self.chunksize, compression=self._compression[f],
+                             **options) as reader:
+                for chunk in reader:
+                    yield chunk
+
+    def numeric_columns(self) -> List[Any]:
+        """Columns holding numbers, judged from the dtypes of the first chunk."""
+        if self._numeric_columns is None:
+            reader = self.chunks()
+            try:
+                first = next(reader, None)
+            finally:
+                reader.close()
+            if first is None:
+                first = pd.DataFrame(columns=self.columns)
+            self._numeric_columns = [c for c in self.columns if _is_numeric(first[c])]
+        return self._numeric_columns
+
+    def _require(self, *columns: Any) -> None:
+        for col in columns:
+            if col not in self.columns:
+                raise KeyError(f"Column '{col}' not found in '{self.path}'")
+
+    def _numeric(self, chunk, column: Any):
+        return pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=float)
+
+    def moments(self, column: Any) -> Moments:
+        """Count, mean and M2 of one numeric column, in a single pass."""
+        self._require(column)
+        total = Moments()
+        for chunk in self.chunks([column]):
+            total.merge(grouped_moments(self._numeric(chunk, column))[0])
+        return total
+
+    def column_moments(self, columns: List[Any]):
+        """Per-column (n, mean, m2) arrays of several numeric columns, in a single pass."""
+        self._require(*columns)
+        total = None
+        for chunk in self.chunks(columns):
+            values = chunk[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+            part = column_moments(values)
+            total = part if total is None else merge_column_moments(total, part)
+        if total is None:
+            total = column_moments(pd.DataFrame(columns=columns).to_numpy(dtype=float))
+        return total
+
+    def grouped_moments(self, column: Any, by: Any) -> Dict[Any, Moments]:
+        """Count, mean and M2 of `column` for each value of `by`, in a single pass.
+
+        Groups are returned in order of first appearance; rows where either
+        column is missing are skipped.
+        """
+        self._require(column, by)
+        groups: Dict[Any, Moments] = {}
+        for chunk in self.chunks([column, by]):
+            codes, labels = pd.factorize(chunk[by], sort=False)
+            per_group = grouped_moments(self._numeric(chunk, column), codes, len(labels))
+            for label, m in zip(labels, per_group):
+                if m.n:
+                    groups.setdefault(label, Moments()).merge(m)
+        return groups
+
+    def describe(self):
+        """Count, mean, std, min and max of every numeric column, in a single pass.
+
+        Like ``DataFrame.describe()``, columns holding text are left out.
+        """
+        numeric: Dict[Any, Moments] = {}
+        non_numeric = set()
+        counts: Dict[Any, int] = {col: 0 for col in self.columns}
+        for chunk in self.chunks():
+            for col in self.columns:
+                values = chunk[col]
+                counts[col] += int(values.count())
+                if col in non_numeric:
+                    continue
+                if _is_numeric(values):
+                    numeric.setdefault(col, Moments()).update(values.to_numpy(dtype=float))
+                else:
+                    # dtypes are inferred per chunk; one text chunk makes the column non-numeric
+                    non_numeric.add(col)
+                    numeric.pop(col, None)
+        rows = []
+        for col in self.columns:
+            if col in non_numeric:
+                continue
+            m = numeric.get(col)
+            rows.append({"index": col, "count": counts[col],
+                         "mean": m.mean if m and m.n else None,
+                         "std": m.std if m else None,
+                         "min": m.min if m and m.n else None,
+                         "max": m.max if m and m.n else None})
+        return pd.DataFrame(rows, columns=["index", "count", "mean", "std", "min", "max"])
+
+    def __repr__(self) -> str:
+        return f"<ChunkedDataset '{self.path}' ({len(self.columns)} cols, {self.chunksize} rows/chunk)>"
+
+
+def describe_approx(ds):
+    """`describe ... approx` of a DataFrame or ChunkedDataset: one pass, chunk by chunk.
+
+    Returns:
+        The summary table and a note on its accuracy (empty when it is exact).
+    """
+    if isinstance(ds, ChunkedDataset):
+        table, accuracy = approx_describe(ds.chunks(), ds.columns)
+    else:
+        table, accuracy = approx_describe(frame_chunks(ds, settings.stream_chunk_rows), list(ds.columns))
+    notes = []
+    if not accuracy["exact_quartiles"]:
+        notes.append("quartiles within about 1% of rank")
+    if accuracy["freq_error"]:
+        notes.append(f"freq up to {accuracy['freq_error']:,} below the true count")
+    if accuracy["mixed"]:
+        notes.append(f"numbers and text summarised separately in {', '.join(map(str, accuracy['mixed']))}")
+    return table, f"[describe approx] {'; '.join(notes)}" if notes else ""
@@ -0,0 +1,7 @@
+"""
+Statistical kernels for Statica.
+
+These modules compute test statistics from sufficient statistics (counts,
+sums, moments) rather than from raw columns, so the same code serves
+in-memory DataFrames and datasets streamed chunk by chunk.
+"""
@@ -0,0 +1,152 @@
+"""
+Mergeable running moments.
+
+`Moments` keeps the count, mean, sum of squared deviations (M2), minimum and
+maximum of a stream of numbers. Two instances can be merged exactly (Chan et
+al.'s parallel update), so statistics over a file of any size are computed
+one chunk at a time in constant memory.
+"""
+
+import math
+from typing import Any, List, Tuple
+
+from statica.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+class Moments:
+    """Count, mean, M2, min and max of the non-missing values seen so far."""
+
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 minimum: float = math.inf, maximum: float = -math.inf) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    @classmethod
+    def from_values(cls, values) -> "Moments":
+        """Compute the moments of an array-like, ignoring NaN."""
+        arr = np.asarray(values, dtype=float)
+        arr = arr[~np.isnan(arr)]
+        n = arr.size
+        if n == 0:
+            return cls()
+        mean = float(arr.mean())
+        m2 = float(((arr - mean) ** 2).sum())
+        return cls(n, mean, m2, float(arr.min()), float(arr.max()))
+
+    def update(self, values) -> "Moments":
+        """Fold a chunk of values into these moments."""
+        return self.merge(Moments.from_values(values))
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Combine `other` into these moments in place and return self."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def var(self) -> float:
+        """Sample variance (ddof=1), NaN with fewer than two values."""
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1)."""
+        return math.sqrt(self.var) if self.n > 1 else math.nan
+
+    def __repr__(self) -> str:
+        return f"Moments(n={self.n}, mean={self.mean:.6g}, std={self.std:.6g})"
+
+
+def grouped_moments(values, codes=None, ngroups: int = 1) -> List[Moments]:
+    """Count, mean and M2 of `values` per group, in one vectorized pass.
+
+    Groups are given as integer codes (e.g. from ``pandas.factorize``); values
+    with a negative code or NaN are ignored. Per-group count, sum and sum of
+    squares are accumulated with ``np.bincount``. The values are shifted by
+    the first valid value before squaring so that M2 does not lose precision
+    when the mean is large compared to the spread. Extremes are not tracked.
+
+    Args:
+        values: Numeric array-like.
+        codes: Group code of each value, or None to treat all values as one group.
+        ngroups: Number of groups (length of the result).
+
+    Returns:
+        One Moments per group code.
+    """
+    x = np.asarray(values, dtype=float)
+    valid = ~np.isnan(x)
+    if codes is not None:
+        codes = np.asarray(codes)
+        valid &= codes >= 0
+        codes = codes[valid]
+    x = x[valid]
+    shift = x[0] if x.size else 0.0
+    d = x - shift
+    if codes is None:
+        n = np.array([d.size])
+        s1 = np.array([d.sum()])
+        s2 = np.array([np.dot(d, d)])
+    else:
+        n = np.bincount(codes, minlength=ngroups)
+        s1 = np.bincount(codes, weights=d, minlength=ngroups)
+        s2 = np.bincount(codes, weights=d * d, minlength=ngroups)
+    out = []
+    for count, total, squares in zip(n.tolist(), s1.tolist(), s2.tolist()):
+        if count == 0:
+            out.append(Moments())
+            continue
+        mean_d = total / count
+        out.append(Moments(count, shift + mean_d, max(squares - total * mean_d, 0.0)))
+    return out
+
+
+def column_moments(matrix) -> Tuple[Any, Any, Any]:
+    """Count, mean and M2 of every column of a 2-D array, ignoring NaN.
+
+    Args:
+        matrix: 2-D numeric array (rows x columns).
+
+    Returns:
+        Three 1-D arrays (n, mean, m2), one entry per column.
+    """
+    x = np.asarray(matrix, dtype=float)
+    missing = np.isnan(x)
+    n = x.shape[0] - missing.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(missing, 0.0, x).sum(axis=0) / n
+        dev = np.where(missing, 0.0, x - mean)
+    m2 = np.einsum("ij,ij->j", dev, dev)
+    return n, mean, m2
+
+
+def merge_column_moments(a: Tuple[Any, Any, Any], b: Tuple[Any, Any, Any]) -> Tuple[Any, Any, Any]:
+    """Vectorized `Moments.merge` for the (n, mean, m2) arrays of `column_moments`."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = np.nan_to_num(mean_b) - np.nan_to_num(mean_a)
+        share = np.where(n > 0, n_b / np.maximum(n, 1), 0.0)
+        mean = np.where(n_a > 0, mean_a, 0.0) + delta * share
+        m2 = m2_a + m2_b + delta**2 * n_a * share
+    mean = np.where(n > 0, mean, np.nan)
+    return n, mean, m2
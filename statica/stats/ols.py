@@ -0,0 +1,457 @@
+"""
+Ordinary least squares without the formula machinery.
+
+`regress y ~ a + b on data` used to build a formula string and call
+``smf.ols(...).fit()`` every time, re-parsing the formula and re-encoding the
+design matrix even when several models share predictors. This module
+encodes each term once per dataset (`DesignCache`) and solves the normal
+equations directly with a Cholesky factorisation of X'X. Forming X'X squares
+the condition number of the design, so a badly conditioned in-memory design
+is solved by a QR factorisation of X instead, and a rank-deficient one with
+the pseudo-inverse like statsmodels. Streaming fits only have X'X and fall
+back to its pseudo-inverse.
+
+Encoding follows patsy's defaults so coefficients carry the same names as
+before: an ``Intercept`` column, numeric terms as-is, non-numeric terms
+treatment-coded against their first level as ``term[T.level]``, categorical
+terms ordered before numeric ones, and rows with a missing value in any
+used column dropped.
+
+The full statsmodels results object is only built when something needs
+more than the coefficients, e.g. ``summary()`` for ``conclude``.
+"""
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, List, Sequence, Tuple
+
+from statica.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+linalg = lazy_import("scipy.linalg")
+sm = lazy_import("statsmodels.api")
+
+
+def is_categorical(series) -> bool:
+    """Whether patsy would treat `series` as a categorical factor."""
+    return not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+
+
+def term_levels(series) -> List[Any]:
+    """Levels of a categorical term, in patsy's order."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return list(series.cat.categories)
+    return sorted(series.dropna().unique().tolist())
+
+
+def encode_term(df, term: str) -> Tuple[List[str], Any, Any, bool]:
+    """Encode one predictor column.
+
+    Returns:
+        (column names, 2-D float block, boolean mask of missing rows, is_categorical)
+    """
+    if term not in df.columns:
+        raise ValueError(f"Column '{term}' not found")
+    series = df[term]
+    missing = series.isna().to_numpy()
+    if not is_categorical(series):
+        return [term], series.to_numpy(dtype=float).reshape(-1, 1), missing, False
+    levels = term_levels(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+    else:
+        codes = pd.Categorical(series, categories=levels).codes
+    block = np.zeros((len(series), max(len(levels) - 1, 0)))
+    rows = np.nonzero(codes > 0)[0]
+    block[rows, codes[rows] - 1] = 1.0
+    names = [f"{term}[T.{level}]" for level in levels[1:]]
+    return names, block, missing, True
+
+
+class DesignCache:
+    """Encoded design matrices per (dataset, terms), kept while the dataset is alive.
+
+    Term encodings are cached separately, so models that share predictors on
+    the same dataset only encode each shared column once.
+    """
+
+    def __init__(self, max_designs: int = 32) -> None:
+        self.max_designs = max_designs
+        self._terms: "OrderedDict[Tuple[int, str], Tuple[Any, ...]]" = OrderedDict()
+        self._designs: "OrderedDict[Tuple[Any, ...], Tuple[Any, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _lookup(store, key, df):
+        entry = store.get(key)
+        if entry is not None and entry[0]() is df:
+            store.move_to_end(key)
+            return entry[1:]
+        return None
+
+    @staticmethod
+    def _store(store, key, df, value, limit: int) -> None:
+        # the weak reference guards against a new dataset reusing an old id()
+        store[key] = (weakref.ref(df),) + tuple(value)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+    def term(self, df, term: str) -> Tuple[List[str], Any, Any, bool]:
+        """Encoded block of one term (see `encode_term`), cached per dataset."""
+        key = (id(df), term)
+        with self._lock:
+            cached = self._lookup(self._terms, key, df)
+        if cached is not None:
+            return cached
+        encoded = encode_term(df, term)
+        with self._lock:
+            self._store(self._terms, key, df, encoded, self.max_designs * 4)
+        return encoded
+
+    def design(self, df, dep: str, terms: Sequence[str]) -> Tuple[Any, Any, List[str]]:
+        """Return (y, X, column names) for `dep ~ terms` on `df`, complete rows only."""
+        key = (id(df), dep, tuple(terms))
+        with self._lock:
+            cached = self._lookup(self._designs, key, df)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        if dep not in df.columns:
+            raise ValueError(f"Column '{dep}' not found")
+        y = df[dep].to_numpy(dtype=float)
+        encoded = [self.term(df, t) for t in dict.fromkeys(terms)]
+        # patsy puts terms without numeric factors first
+        ordered = [e for e in encoded if e[3]] + [e for e in encoded if not e[3]]
+        names = ["Intercept"] + [n for e in ordered for n in e[0]]
+        X = np.hstack([np.ones((len(y), 1))] + [e[1] for e in ordered])
+        complete = ~np.isnan(y)
+        for e in ordered:
+            complete &= ~e[2]
+        if not complete.all():
+            y, X = y[complete], X[complete]
+        with self._lock:
+            self._store(self._designs, key, df, (y, X, names), self.max_designs)
+        return y, X, names
+
+    def clear(self) -> None:
+        with self._lock:
+            self._terms.clear()
+            self._designs.clear()
+
+
+class OLSResult:
+    """Coefficients and inference of an OLS fit.
+
+    Exposes the attributes Statica reads from statsmodels results (params,
+    bse, tvalues, pvalues, rsquared, ...). `statsmodels` builds the full
+    RegressionResults on first access, when the design data is available.
+    """
+
+    def __init__(self, dep: str, names: List[str], params, cov_unscaled, ssr: float,
+                 centered_tss: float, nobs: int, rank: int,
+                 y=None, X=None) -> None:
+        self.dep = dep
+        self.exog_names = list(names)
+        self.nobs = float(nobs)
+        self.df_model = float(rank - 1)
+        self.df_resid = float(nobs - rank)
+        self.ssr = float(ssr)
+        self.centered_tss = float(centered_tss)
+        index = pd.Index(self.exog_names)
+        self.params = pd.Series(params, index=index)
+        scale = self.ssr / self.df_resid if self.df_resid > 0 else math.nan
+        self.scale = scale
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bse = np.sqrt(np.diag(cov_unscaled) * scale)
+            self.bse = pd.Series(bse, index=index)
+            self.tvalues = self.params / self.bse
+        self.pvalues = pd.Series(2 * stats.t.sf(np.abs(self.tvalues.to_numpy()), self.df_resid),
+                                 index=index)
+        self.rsquared = 1 - self.ssr / self.centered_tss if self.centered_tss > 0 else math.nan
+        self.rsquared_adj = (1 - (self.nobs - 1) / self.df_resid * (1 - self.rsquared)
+                             if self.df_resid > 0 else math.nan)
+        if self.df_model > 0 and scale > 0:
+            self.fvalue = (self.centered_tss - self.ssr) / self.df_model / scale
+            self.f_pvalue = float(stats.f.sf(self.fvalue, self.df_model, self.df_resid))
+        else:
+            self.fvalue = self.f_pvalue = math.nan
+        self._y = y
+        self._X = X
+        self._sm = None
+        self._design_loader = None
+
+    def attach_design(self, loader: Callable[[], Tuple[Any, Any]]) -> None:
+        """Rebuild the design data with `loader` (returning ``(y, X)``) when it is needed.
+
+        Used for fits restored from the result cache, which are stored without
+        their design data.
+        """
+        self._design_loader = loader
+
+    def conf_int(self, alpha: float = 0.05):
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        return pd.DataFrame({0: self.params - q * self.bse, 1: self.params + q * self.bse})
+
+    @property
+    def has_data(self) -> bool:
+        return (self._y is not None and self._X is not None) or self._design_loader is not None
+
+    @property
+    def statsmodels(self):
+        """The equivalent statsmodels RegressionResults, built on first use."""
+        if self._sm is None:
+            if not self.has_data:
+                raise ValueError("the design data of this model is not available")
+            if self._y is None or self._X is None:
+                self._y, self._X = self._design_loader()
+            endog = pd.Series(self._y, name=self.dep)
+            exog = pd.DataFrame(self._X, columns=self.exog_names)
+            self._sm = sm.OLS(endog, exog).fit()
+        return self._sm
+
+    def summary(self):
+        if self.has_data:
+            return self.statsmodels.summary()
+        return self.text_summary()
+
+    def text_summary(self) -> str:
+        """Plain coefficient table, for fits whose raw data was not kept."""
+        ci = self.conf_int()
+        lines = [
+            f"OLS Regression Results (Dep. Variable: {self.dep})",
+            f"No. Observations: {int(self.nobs)}   R-squared: {self.rsquared:.3f}   "
+            f"Adj. R-squared: {self.rsquared_adj:.3f}",
+            f"F-statistic: {self.fvalue:.4g}   Prob (F-statistic): {self.f_pvalue:.4g}",
+            "",
+            f"{'':<20} {'coef':>12} {'std err':>11} {'t':>11} {'P>|t|':>8} {'[0.025':>12} {'0.975]':>12}",
+        ]
+        for name in self.exog_names:
+            lines.append(f"{name:<20} {self.params[name]:>12.4f} {self.bse[name]:>11.3f} "
+                         f"{self.tvalues[name]:>11.3f} {self.pvalues[name]:>8.3f} "
+                         f"{ci.loc[name, 0]:>12.3f} {ci.loc[name, 1]:>12.3f}")
+        return "\n".join(lines)
+
+    def __getstate__(self):
+        # never pickle the (possibly huge) design data or statsmodels object
+        state = dict(self.__dict__)
+        state["_y"] = state["_X"] = state["_sm"] = state["_design_loader"] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("_design_loader", None)
+        self.__dict__.update(state)
+
+    def __repr__(self) -> str:
+        return f"<OLSResult {self.dep} ~ {' + '.join(self.exog_names[1:])} (n={int(self.nobs)})>"
+
+
+# smallest ratio of Cholesky (or R) diagonal entries trusted, roughly 1 / cond(X):
+# below CHOLESKY_RTOL X'X has lost too many digits, below RANK_RTOL X is rank deficient
+CHOLESKY_RTOL = 1e-5
+RANK_RTOL = 1e-10
+# streamed fits only have X'X, whose fallback (its pseudo-inverse) is no more accurate
+# than Cholesky, so Cholesky is kept down to where X'X is near singular in float64
+GRAM_CHOLESKY_RTOL = 1e-7
+
+
+def _cholesky_solve(xtx, xty, rtol: float):
+    # (coefficients, (X'X)^-1), or None when X'X is too badly conditioned
+    try:
+        chol = linalg.cho_factor(xtx, lower=True, check_finite=False)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+    diag = np.abs(np.diag(chol[0]))
+    if not diag.min() > diag.max() * rtol:
+        return None
+    params = linalg.cho_solve(chol, xty, check_finite=False)
+    inv = linalg.cho_solve(chol, np.eye(xtx.shape[0]), check_finite=False)
+    return params, inv
+
+
+def solve_normal_equations(xtx, xty) -> Tuple[Any, Any, int]:
+    """Solve X'X b = X'y.
+
+    Uses a Cholesky factorisation when X'X is well conditioned and falls back
+    to the pseudo-inverse (as statsmodels does) otherwise.
+
+    Returns:
+        (coefficients, (X'X)^-1, rank)
+    """
+    solved = _cholesky_solve(xtx, xty, GRAM_CHOLESKY_RTOL)
+    if solved is not None:
+        return solved[0], solved[1], xtx.shape[0]
+    inv = np.linalg.pinv(xtx)
+    return inv @ xty, inv, int(np.linalg.matrix_rank(xtx))
+
+
+def solve_least_squares(y, X) -> Tuple[Any, Any, int]:
+    """Minimise ||y - X b|| for an in-memory design.
+
+    Cholesky of X'X when it is well conditioned; otherwise a QR factorisation
+    of X itself, which keeps the condition number of X instead of squaring it;
+    the pseudo-inverse of X (as statsmodels) when X is rank deficient.
+
+    Returns:
+        (coefficients, (X'X)^-1, rank)
+    """
+    p = X.shape[1]
+    solved = _cholesky_solve(X.T @ X, X.T @ y, CHOLESKY_RTOL)
+    if solved is not None:
+        return solved[0], solved[1], p
+    q, r = np.linalg.qr(X)
+    diag = np.abs(np.diag(r))
+    if p and diag.min() > diag.max() * RANK_RTOL:
+        params = linalg.solve_triangular(r, q.T @ y, check_finite=False)
+        r_inv = linalg.solve_triangular(r, np.eye(p), check_finite=False)
+        return params, r_inv @ r_inv.T, p
+    pinv = np.linalg.pinv(X)
+    return pinv @ y, pinv @ pinv.T, int(np.linalg.matrix_rank(X))
+
+
+def fit(dep: str, y, X, names: List[str]) -> OLSResult:
+    """Fit OLS of `y` on the design `X` (which includes the intercept column)."""
+    n = len(y)
+    if n == 0:
+        raise ValueError("No complete observations for regression")
+    params, inv, rank = solve_least_squares(y, X)
+    resid = y - X @ params
+    ssr = float(resid @ resid)
+    centered = y - y.mean()
+    return OLSResult(dep, names, params, inv, ssr, float(centered @ centered), n, rank, y=y, X=X)
+
+
+class GramAccumulator:
+    """Streaming OLS: accumulates X'X, X'y, y'y and n one chunk at a time.
+
+    Memory is quadratic in the number of design columns and independent of
+    the number of rows. Categorical terms are one-hot encoded on every level
+    seen so far; the matrices grow when a chunk brings a new level (earlier
+    rows simply had a zero there). `result` then sorts the levels and drops
+    the reference level of each term, which yields exactly the treatment-coded
+    design that `DesignCache` builds in memory.
+    """
+
+    def __init__(self, dep: str, terms: Sequence[str]) -> None:
+        self.dep = dep
+        self.terms = list(dict.fromkeys(terms))
+        self.categorical: dict = {}
+        self.levels: dict = {}
+        # design column keys: ("Intercept",), (term,) or (term, level)
+        self.keys: List[Tuple[Any, ...]] = [("Intercept",)]
+        self.xtx = None
+        self.xty = None
+        self.yty = 0.0
+        self.ysum = 0.0
+        self.n = 0
+        self.shift: Any = None
+
+    def _column_index(self, key: Tuple[Any, ...]) -> int:
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            self.keys.append(key)
+            return len(self.keys) - 1
+
+    def update(self, chunk) -> None:
+        """Fold one DataFrame chunk into the sufficient statistics."""
+        for col in [self.dep] + self.terms:
+            if col not in chunk.columns:
+                raise ValueError(f"Column '{col}' not found")
+        if not self.categorical:
+            self.categorical = {t: is_categorical(chunk[t]) for t in self.terms}
+        y = pd.to_numeric(chunk[self.dep], errors="coerce").to_numpy(dtype=float)
+        complete = ~np.isnan(y)
+        values = {}
+        for term in self.terms:
+            if self.categorical[term]:
+                series = chunk[term]
+                complete &= ~series.isna().to_numpy()
+            else:
+                series = pd.to_numeric(chunk[term], errors="coerce").to_numpy(dtype=float)
+                complete &= ~np.isnan(series)
+            values[term] = series
+        rows = int(complete.sum())
+        if rows == 0:
+            return
+
+        # Register every column this chunk needs before sizing the block.
+        parts = []
+        for term in self.terms:
+            if self.categorical[term]:
+                codes, uniques = pd.factorize(values[term][complete])
+                seen = self.levels.setdefault(term, [])
+                for level in uniques:
+                    if level not in seen:
+                        seen.append(level)
+                idx = np.array([self._column_index((term, level)) for level in uniques], dtype=int)
+                parts.append((idx[codes], None))
+            else:
+                parts.append((self._column_index((term,)), values[term][complete]))
+        p = len(self.keys)
+        X = np.zeros((rows, p))
+        X[:, 0] = 1.0
+        for col, vals in parts:
+            if vals is None:
+                X[np.arange(rows), col] = 1.0
+            else:
+                X[:, col] = vals
+
+        y = y[complete]
+        if self.shift is None:
+            # centring y on its first-chunk mean keeps y'y from swamping the SSR
+            self.shift = float(y.mean())
+        y = y - self.shift
+        if self.xtx is None:
+            self.xtx = np.zeros((p, p))
+            self.xty = np.zeros(p)
+        elif self.xtx.shape[0] < p:
+            grown = np.zeros((p, p))
+            old = self.xtx.shape[0]
+            grown[:old, :old] = self.xtx
+            self.xtx = grown
+            self.xty = np.concatenate([self.xty, np.zeros(p - old)])
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.ysum += float(y.sum())
+        self.n += rows
+
+    def result(self) -> OLSResult:
+        """Solve the accumulated normal equations."""
+        if self.n == 0:
+            raise ValueError("No complete observations for regression")
+        cat_terms = [t for t in self.terms if self.categorical[t]]
+        num_terms = [t for t in self.terms if not self.categorical[t]]
+        order = [0]
+        names = ["Intercept"]
+        for term in cat_terms:
+            levels = sorted(self.levels.get(term, []))
+            for level in levels[1:]:
+                order.append(self.keys.index((term, level)))
+                names.append(f"{term}[T.{level}]")
+        for term in num_terms:
+            order.append(self.keys.index((term,)))
+            names.append(term)
+        xtx = self.xtx[np.ix_(order, order)]
+        xty = self.xty[order]
+        params, inv, rank = solve_normal_equations(xtx, xty)
+        ssr = max(self.yty - 2 * params @ xty + params @ xtx @ params, 0.0)
+        centered_tss = self.yty - self.ysum**2 / self.n
+        params = params.copy()
+        params[0] += self.shift
+        return OLSResult(self.dep, names, params, inv, ssr, centered_tss, self.n, rank)
+
+
+def fit_chunks(dep: str, terms: Sequence[str], chunks) -> OLSResult:
+    """Fit OLS over an iterable of DataFrame chunks in constant memory."""
+    acc = GramAccumulator(dep, terms)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.result()
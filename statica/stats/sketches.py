@@ -0,0 +1,265 @@
+"""
+Mergeable sketches for approximate summaries.
+
+`describe data approx` summarises every column in one pass over the data,
+one chunk at a time, in memory independent of the number of rows:
+
+- count, mean, std, min and max come from `Moments` (exact);
+- quartiles come from a `KLL` sketch (Karnin, Lang and Liberty, 2016). The
+  rank error is about 1.7 / k (under 1% with the default k = 256). While
+  nothing has been compacted (up to k values), the quantiles are exact;
+- top value and frequency of text columns come from `HeavyHitters`
+  (Misra-Gries). Counts are lower bounds that are off by at most
+  n / (capacity + 1). While no value has been evicted they are exact, and
+  so is the number of distinct values.
+
+A column holding numbers in some chunks and text in others (a CSV column
+with text further down) is summarised both ways: the numbers by moments and
+quartiles, the text by heavy hitters, and it is reported as mixed.
+
+Compaction in `KLL` picks its offsets from a generator with a fixed seed,
+so the same data in the same chunks always gives the same quantiles.
+
+All three merge, so partial summaries of chunks (or of files read in
+parallel) combine into the summary of the whole dataset.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from statica.core.lazy import lazy_import
+from .moments import Moments
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DEFAULT_K = 256
+DEFAULT_CAPACITY = 64
+DEFAULT_SEED = 0
+QUARTILES = (0.25, 0.5, 0.75)
+
+
+class KLL:
+    """KLL quantile sketch over floats.
+
+    Level h holds values that each stand for 2**h inputs. When a level
+    grows past its capacity it is sorted and every other value (starting at
+    a random offset, from a generator seeded with `seed`) moves up one level. Capacities shrink by 2/3 per level
+    below the top one, which bounds the sketch to about 3k values.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = DEFAULT_SEED) -> None:
+        self.k = k
+        self.n = 0
+        self.levels: List[Any] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    @property
+    def exact(self) -> bool:
+        """Whether no value has been compacted away yet."""
+        return len(self.levels) == 1
+
+    def update(self, values) -> "KLL":
+        """Add values (NaN is ignored)."""
+        x = np.asarray(values, dtype=float)
+        x = x[~np.isnan(x)]
+        if x.size:
+            self.n += x.size
+            self.levels[0] = np.concatenate([self.levels[0], x])
+            self._compress()
+        return self
+
+    def merge(self, other: "KLL") -> "KLL":
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, buf in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], buf])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            buf = self.levels[h]
+            if len(buf) > self._capacity(h):
+                grew = h + 1 == len(self.levels)
+                if grew:
+                    self.levels.append(np.empty(0))
+                buf = np.sort(buf)
+                # an odd value out stays at this level
+                keep, buf = (buf[:1], buf[1:]) if len(buf) % 2 else (buf[:0], buf)
+                offset = int(self._rng.integers(2))
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], buf[offset::2]])
+                # a new top level shrinks every capacity below it
+                h = 0 if grew else h + 1
+            else:
+                h += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Estimated quantiles (exact, linearly interpolated, while `exact`)."""
+        if self.n == 0:
+            return [math.nan for _ in qs]
+        if self.exact:
+            return [float(v) for v in np.quantile(self.levels[0], qs)]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(buf), 2.0 ** h) for h, buf in enumerate(self.levels)])
+        order = np.argsort(values)
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        return [float(v) for v in values[np.minimum(idx, len(values) - 1)]]
+
+
+class HeavyHitters:
+    """Misra-Gries frequent-items summary with at most `capacity` counters."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.n = 0
+        # upper bound on how far any count is below the true one
+        self.error = 0
+
+    @property
+    def exact(self) -> bool:
+        """Whether every count is exact (no value was ever evicted)."""
+        return self.error == 0
+
+    def update(self, values) -> "HeavyHitters":
+        """Add a chunk of values (missing values are ignored)."""
+        return self.add_counts(pd.Series(values).value_counts(dropna=True, sort=False))
+
+    def add_counts(self, counts) -> "HeavyHitters":
+        """Add a chunk given as a value -> count Series (``value_counts``)."""
+        return self._add(counts.index, counts.to_numpy(), int(counts.sum()))
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """Fold another summary into this one."""
+        self.error += other.error
+        return self._add(list(other.counts), list(other.counts.values()), other.n)
+
+    def _add(self, keys, counts, n: int) -> "HeavyHitters":
+        self.n += n
+        for key, c in zip(keys, counts):
+            if c:
+                self.counts[key] = self.counts.get(key, 0) + int(c)
+        if len(self.counts) > self.capacity:
+            # subtract the (capacity + 1)-th largest count from every counter
+            cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {k: c - cut for k, c in self.counts.items() if c > cut}
+            self.error += cut
+        return self
+
+    def top(self, k: int = 1) -> List[Tuple[Any, int]]:
+        """The `k` most frequent values with their (lower-bound) counts."""
+        return sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+
+class ColumnSketch:
+    """One-pass summary of one column: moments and quartiles of its numbers,
+    heavy hitters of its text."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.has_numbers = False
+        self.has_text = False
+        self.moments = Moments()
+        self.kll = KLL()
+        self.hitters = HeavyHitters()
+
+    @property
+    def numeric(self) -> Optional[bool]:
+        """True for numbers only, False once text was seen, None before any value."""
+        if self.has_text:
+            return False
+        return True if self.has_numbers else None
+
+    @property
+    def mixed(self) -> bool:
+        """Whether some chunks held numbers and others text."""
+        return self.has_numbers and self.has_text
+
+    def update(self, series) -> None:
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if numeric:
+            values = series.to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            present = len(values)
+        else:
+            # counting the values also counts the missing ones out, in one pass over the strings
+            counts = series.value_counts(dropna=True, sort=False)
+            present = int(counts.sum())
+        self.count += present
+        if not present:
+            # an all-missing chunk says nothing about the column's kind
+            return
+        if numeric:
+            self.has_numbers = True
+            self.moments.merge(Moments.from_values(values))
+            self.kll.update(values)
+        else:
+            self.has_text = True
+            self.hitters.add_counts(counts)
+
+    def row(self, name: Any) -> Dict[str, Any]:
+        # a mixed column gets both summaries, each over its own values
+        row: Dict[str, Any] = {"index": name, "count": self.count}
+        if self.has_numbers:
+            m = self.moments
+            q1, q2, q3 = self.kll.quantiles(QUARTILES)
+            row.update({"mean": m.mean if m.n else None, "std": m.std, "min": m.min if m.n else None,
+                        "25%": q1, "50%": q2, "75%": q3, "max": m.max if m.n else None})
+        if self.has_text:
+            top = self.hitters.top(1)
+            # the distinct numbers are not known, so neither is `unique` of a mixed column
+            exact = self.hitters.exact and not self.has_numbers
+            row.update({"unique": len(self.hitters.counts) if exact else None,
+                        "top": top[0][0] if top else None, "freq": top[0][1] if top else None})
+        return row
+
+
+def approx_describe(chunks: Iterable[Any], columns: Optional[List[Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Summarise a dataset given as DataFrame chunks, in one pass.
+
+    Args:
+        chunks: DataFrames with the same columns (e.g. ``ChunkedDataset.chunks()``).
+        columns: Column order of the result (defaults to the first chunk's).
+
+    Returns:
+        (table, accuracy): a DataFrame laid out like
+        ``df.describe(include='all').T.reset_index()``, and a dict with
+        ``exact_quartiles`` (no sketch had to compact), ``freq_error``
+        (the most a reported `freq` can be below the true count) and
+        ``mixed`` (columns holding both numbers and text).
+    """
+    sketches: Dict[Any, ColumnSketch] = {}
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        for col in columns:
+            sketches.setdefault(col, ColumnSketch()).update(chunk[col])
+    columns = columns or []
+    rows = [sketches.get(col, ColumnSketch()).row(col) for col in columns]
+    order = ["index", "count"]
+    if any(s.has_text for s in sketches.values()):
+        order += ["unique", "top", "freq"]
+    if any(s.has_numbers for s in sketches.values()):
+        order += ["mean", "std", "min", "25%", "50%", "75%", "max"]
+    accuracy = {
+        "exact_quartiles": all(s.kll.exact for s in sketches.values()),
+        "freq_error": max([s.hitters.error for s in sketches.values()] or [0]),
+        "mixed": [col for col in columns if col in sketches and sketches[col].mixed],
+    }
+    return pd.DataFrame(rows, columns=order), accuracy
+
+
+def frame_chunks(df, rows: int) -> Iterable[Any]:
+    """Slices of an in-memory DataFrame, `rows` at a time."""
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
@@ -0,0 +1,202 @@
+"""
+t-tests computed from sufficient statistics.
+
+The functions take `Moments` instead of raw samples and return the same
+result dicts the runtime stores and `nlg.generate_conclusion` reads.
+"""
+
+import math
+from typing import Any, List, Sequence, Tuple
+
+from statica.core.lazy import lazy_import
+from .moments import Moments
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+
+COMPARE_MODES = ("pairwise", "vs-rest")
+
+
+def _t_statistic(diff: float, se: float) -> float:
+    # as scipy: a nonzero difference with no spread is infinitely significant
+    if se > 0:
+        return diff / se
+    return math.copysign(math.inf, diff) if diff != 0 else math.nan
+
+
+def one_sample(m: Moments, mu: float) -> dict:
+    """One-sample t-test of the mean against `mu`."""
+    n = m.n
+    if n < 2:
+        raise ValueError("Not enough observations for t-test")
+    sd = m.std
+    se = sd / math.sqrt(n)
+    dfv = n - 1
+    diff = m.mean - mu
+    t = _t_statistic(diff, se)
+    p = float(2 * stats.t.sf(abs(t), dfv)) if not math.isnan(t) else math.nan
+    tcrit = stats.t.ppf(1 - 0.025, dfv)
+    ci_low, ci_high = diff - tcrit * se, diff + tcrit * se
+    d = diff / sd if sd and sd > 0 else math.nan
+    return {"kind": "one-sample",
+            "mean": float(m.mean),
+            "sd": float(sd),
+            "n": n,
+            "t": float(t),
+            "p": p,
+            "mu": float(mu),
+            "diff": float(diff),
+            "ci": (ci_low, ci_high),
+            "d": float(d)}
+
+
+def welch(m1: Moments, m2: Moments, group_names: Tuple[str, str]) -> dict:
+    """Two-sample Welch t-test of the difference in means."""
+    n1, n2 = m1.n, m2.n
+    if n1 < 2 or n2 < 2:
+        raise ValueError("Not enough observations in each group for t-test")
+    sd1, sd2 = m1.std, m2.std
+    v1, v2 = sd1**2 / n1, sd2**2 / n2
+    se = (v1 + v2) ** 0.5
+    num = (v1 + v2) ** 2
+    den = ((sd1**4)/(n1**2*(n1-1))) + ((sd2**4)/(n2**2*(n2-1)))
+    dfw = num/den if den != 0 else n1+n2-2
+    diff = m1.mean - m2.mean
+    t = _t_statistic(diff, se)
+    p = float(2 * stats.t.sf(abs(t), dfw)) if not math.isnan(t) else math.nan
+    tcrit = stats.t.ppf(1-0.025, dfw)
+    ci_low, ci_high = diff - tcrit*se, diff + tcrit*se
+    pooled_var = (((n1-1)*sd1**2)+((n2-1)*sd2**2))/(n1+n2-2)
+    pooled_sd = pooled_var**0.5 if pooled_var > 0 else math.nan
+    cohens_d = diff/pooled_sd if pooled_sd and pooled_sd > 0 else math.nan
+    return {"kind": "two-sample", "group_names": (str(group_names[0]), str(group_names[1])),
+            "mean1": float(m1.mean), "mean2": float(m2.mean),
+            "sd1": float(sd1), "sd2": float(sd2),
+            "n1": n1, "n2": n2,
+            "t": float(t), "p": p,
+            "diff": float(diff), "ci": (ci_low, ci_high), "d": float(cohens_d)}
+
+
+def holm(p) -> Any:
+    """Holm step-down adjustment of an array of p-values."""
+    p = np.asarray(p, dtype=float)
+    m = p.size
+    if m == 0:
+        return p
+    order = np.argsort(p)
+    adjusted = np.maximum.accumulate((m - np.arange(m)) * p[order])
+    out = np.empty(m)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def _welch_arrays(n1, mean1, var1, n2, mean2, var2):
+    """Vectorized Welch t-tests between matching entries of the arrays."""
+    v1, v2 = var1 / n1, var2 / n2
+    se = np.sqrt(v1 + v2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff = mean1 - mean2
+        t = diff / se
+        den = v1**2 / (n1 - 1) + v2**2 / (n2 - 1)
+        dfw = np.where(den != 0, (v1 + v2) ** 2 / den, n1 + n2 - 2)
+        p = 2 * stats.t.sf(np.abs(t), dfw)
+        tcrit = stats.t.ppf(1 - 0.025, dfw)
+        pooled_var = ((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2)
+        d = np.where(pooled_var > 0, diff / np.sqrt(pooled_var), np.nan)
+    return diff, t, dfw, p, diff - tcrit * se, diff + tcrit * se, d
+
+
+def multi_group(labels: Sequence[Any], moments: List[Moments], mode: str = "pairwise",
+                column: str = "", by: str = "") -> dict:
+    """Welch t-tests between many groups from their moments.
+
+    All statistics are computed as NumPy arrays over the comparisons, not in
+    a Python loop, so hundreds of groups stay cheap.
+
+    Args:
+        labels: Group labels, aligned with `moments`.
+        moments: Moments of the tested column in each group.
+        mode: "pairwise" (every pair of groups) or "vs-rest" (each group
+            against the rows of all other groups pooled, including groups
+            skipped for having fewer than 2 observations).
+        column: Name of the tested column (for reporting).
+        by: Name of the grouping column (for reporting).
+
+    Returns:
+        A result dict of kind "multi-group" whose "table" is a DataFrame with
+        one row per comparison, including Holm-adjusted p-values.
+    """
+    if mode not in COMPARE_MODES:
+        raise ValueError(f"Unknown comparison mode '{mode}'")
+    kept = [(str(label), m) for label, m in zip(labels, moments) if m.n >= 2]
+    skipped = len(labels) - len(kept)
+    if len(kept) < 2:
+        raise ValueError("ttest by: need at least 2 groups with 2 or more observations")
+    names = np.array([label for label, _ in kept], dtype=object)
+    n = np.array([m.n for _, m in kept], dtype=float)
+    mean = np.array([m.mean for _, m in kept])
+    m2 = np.array([m.m2 for _, m in kept])
+    var = m2 / (n - 1)
+
+    if mode == "pairwise":
+        i, j = np.triu_indices(len(kept), 1)
+        names2 = names[j]
+        n2, mean2, var2 = n[j], mean[j], var[j]
+    else:
+        i = np.arange(len(kept))
+        # "rest" pools every other row, including those of groups too small to test
+        every = [m for m in moments if m.n > 0]
+        all_n = np.array([m.n for m in every], dtype=float)
+        all_mean = np.array([m.mean for m in every])
+        total_n = all_n.sum()
+        total_mean = (all_n * all_mean).sum() / total_n
+        total_m2 = sum(m.m2 for m in every) + (all_n * (all_mean - total_mean) ** 2).sum()
+        n2 = total_n - n
+        mean2 = (total_n * total_mean - n * mean) / n2
+        # remove each group's share from the pooled M2 (reverse of Moments.merge)
+        m2_rest = total_m2 - m2 - (mean - mean2) ** 2 * n * n2 / total_n
+        var2 = np.maximum(m2_rest, 0.0) / (n2 - 1)
+        names2 = np.full(len(kept), "rest", dtype=object)
+
+    diff, t, dfw, p, ci_low, ci_high, d = _welch_arrays(n[i], mean[i], var[i], n2, mean2, var2)
+    table = pd.DataFrame({
+        "group1": names[i], "group2": names2,
+        "n1": n[i].astype(int), "n2": n2.astype(int),
+        "mean1": mean[i], "mean2": mean2, "diff": diff,
+        "t": t, "df": dfw, "p": p, "p_holm": holm(p),
+        "ci_low": ci_low, "ci_high": ci_high, "d": d,
+    })
+    return {"kind": "multi-group", "mode": mode, "column": column, "by": by,
+            "n_groups": len(kept), "skipped_groups": skipped, "table": table}
+
+
+def one_sample_batch(columns: Sequence[Any], n, mean, m2, mu: float) -> dict:
+    """One-sample t-tests of many columns against the same `mu`.
+
+    Takes the per-column (n, mean, m2) arrays of `moments.column_moments` and
+    computes every statistic as one array operation across the columns.
+
+    Returns:
+        A result dict of kind "batch-one-sample" whose "table" is a DataFrame
+        with one row per column, including Holm-adjusted p-values.
+    """
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sd = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+        se = sd / np.sqrt(n)
+        dfv = n - 1
+        diff = mean - mu
+        t = diff / se
+        p = np.where(n > 1, 2 * stats.t.sf(np.abs(t), np.maximum(dfv, 1)), np.nan)
+        tcrit = np.where(n > 1, stats.t.ppf(1 - 0.025, np.maximum(dfv, 1)), np.nan)
+        d = np.where(sd > 0, diff / sd, np.nan)
+    p_holm = np.full(p.shape, np.nan)
+    tested = ~np.isnan(p)
+    p_holm[tested] = holm(p[tested])
+    table = pd.DataFrame({
+        "column": [str(c) for c in columns], "n": n.astype(int),
+        "mean": mean, "sd": sd, "t": t, "df": dfv, "p": p, "p_holm": p_holm,
+        "diff": diff, "ci_low": diff - tcrit * se, "ci_high": diff + tcrit * se, "d": d,
+    })
+    return {"kind": "batch-one-sample", "mu": float(mu), "n_columns": len(table), "table": table}
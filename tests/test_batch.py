@@ -0,0 +1,59 @@
+"""statica batch: scripts on a pool of worker processes."""
+
+import pytest
+
+from statica import batch
+from statica.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def no_caches(monkeypatch):
+    # copied into the workers by run_batch
+    monkeypatch.setattr(settings, "result_cache", "off")
+    monkeypatch.setattr(settings, "dataset_cache", "off")
+    monkeypatch.setattr(settings, "program_cache", "off")
+
+
+def write_scripts(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("x,g\n1,a\n2,a\n3,b\n5,b\n")
+    scripts = {
+        "good.sta": f'd = load "{data}" with header\nt = test ttest mean of d.x against 1\nconclude t\n',
+        "broken.sta": "d = load with header\n",
+        "second.sta": f'd = load "{data}" with header\ndescribe d\n',
+    }
+    for name, text in scripts.items():
+        (tmp_path / name).write_text(text)
+    return [str(tmp_path / name) for name in scripts]
+
+
+def test_results_come_back_in_script_order(tmp_path):
+    paths = write_scripts(tmp_path)
+    seen = []
+    results = batch.run_batch(paths, workers=2, on_result=seen.append)
+    assert [r.path for r in results] == paths == [r.path for r in seen]
+    assert [r.ok for r in results] == [True, False, True]
+    assert "Conclusion" in results[0].output
+    # a failing script is reported without stopping the ones after it
+    assert results[1].error.startswith("UnexpectedToken")
+    assert "Traceback" in results[1].output
+    assert "| x " in results[2].output
+
+
+def test_summary_lists_failures_and_totals():
+    results = [batch.ScriptResult("a.sta", True, 0.5, ""),
+               batch.ScriptResult("longer/b.sta", False, 0.25, "", "ValueError: bad")]
+    lines = batch.format_summary(results).splitlines()
+    assert lines[0].split() == ["script", "status", "seconds"]
+    assert lines[1].split() == ["a.sta", "ok", "0.50"]
+    assert lines[2].split() == ["longer/b.sta", "error", "0.25"]
+    assert lines[3].strip() == "ValueError: bad"
+    assert lines[-1] == "2 script(s), 1 ok, 1 failed, 0.75s of script time"
+
+
+def test_collect_scripts_expands_directories_and_drops_duplicates(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("b.sta", "a.sta", "sub/c.sta", "notes.txt"):
+        (tmp_path / name).write_text("")
+    found = batch.collect_scripts([str(tmp_path / "b.sta"), str(tmp_path)])
+    assert found == [str(tmp_path / name) for name in ("b.sta", "a.sta", "sub/c.sta")]
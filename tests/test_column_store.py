@@ -0,0 +1,51 @@
+"""Column stores: writing, reading back and plotting slice by slice."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from statica import parser
+from statica.runtime import Runtime
+from statica.services.file_handler import ColumnStore, write_column_store
+
+
+def run(script, capsys):
+    rt = Runtime(jobs=1, lazy=False, projection=False)
+    rt.execute(parser.parse_program(script))
+    capsys.readouterr()
+    return rt
+
+
+def test_nullable_numbers_are_stored_as_floats(tmp_path, capsys):
+    path = str(tmp_path / "s.stcol")
+    write_column_store(pd.DataFrame({
+        "i": pd.array([1, None, 3, 4], dtype="Int64"),
+        "f": pd.array([1.5, 2.5, None, 1.0], dtype="Float64"),
+        "g": ["a", "b", "a", "b"],
+    }), path)
+    store = ColumnStore(path, chunksize=2)
+    assert store.numeric_columns() == ["i", "f"]
+    assert store.categories("i") is None
+    rt = run(f'd = load "{path}"\nt = test ttest mean of d.i against 0\n', capsys)
+    assert rt.env["t"]["n"] == 3
+    assert rt.env["t"]["mean"] == pytest.approx(8 / 3)
+
+
+def test_replacing_a_store_keeps_no_leftovers(tmp_path):
+    path = tmp_path / "s.stcol"
+    write_column_store(pd.DataFrame({"x": [1.0, 2.0]}), str(path))
+    write_column_store(pd.DataFrame({"x": [3.0, 4.0, 5.0]}), str(path))
+    assert len(ColumnStore(str(path))) == 3
+    assert [p.name for p in tmp_path.iterdir()] == ["s.stcol"]
+
+
+def test_histogram_of_a_store_is_binned_per_slice(tmp_path, capsys):
+    values = np.random.default_rng(0).normal(size=1000)
+    path = str(tmp_path / "s.stcol")
+    write_column_store(pd.DataFrame({"x": values}), path)
+    rt = run(f'd = load "{path}"\n', capsys)
+    rt.env["d"].chunksize = 64
+    job = rt._plot_job({"cmd": "plot", "x": ["d", "x"], "kind": "histogram", "bins": 15})
+    counts, edges = np.histogram(values, bins=15)
+    assert np.array_equal(job["counts"], counts)
+    assert np.allclose(job["edges"], edges)
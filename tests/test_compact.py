@@ -0,0 +1,25 @@
+"""Compact column types."""
+
+import pandas as pd
+
+from statica.services.compact import category_levels, compact_frame
+from statica.services.file_handler import ColumnStore, write_column_store
+
+
+def test_values_survive_compaction():
+    df = pd.DataFrame({"i": [1, 2, 300] * 4, "f": [0.5, 1.25, 2.0] * 4, "g": ["b", "a", "b"] * 4})
+    out = compact_frame(df)
+    assert out["i"].dtype == "int16"
+    assert out["f"].dtype == "float32"
+    assert list(out["g"].cat.categories) == ["a", "b"]
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+
+
+def test_mixed_type_labels_keep_first_appearance_order(tmp_path):
+    df = pd.DataFrame({"g": pd.Series([1, "a", 1, "a", 2, 1], dtype=object)})
+    assert category_levels(df["g"]) == [1, "a", 2]
+    out = compact_frame(df)
+    assert out["g"].tolist() == df["g"].tolist()
+    write_column_store(df, str(tmp_path / "s.stcol"))
+    store = ColumnStore(str(tmp_path / "s.stcol"))
+    assert next(store.chunks())["g"].tolist() == df["g"].tolist()
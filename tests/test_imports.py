@@ -0,0 +1,38 @@
+"""
+Startup must not import the scientific stack.
+
+Each check runs in a fresh interpreter, since the test session itself may
+already have imported pandas and friends.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("pandas", "scipy", "matplotlib", "statsmodels")
+
+
+def imported_after(code):
+    """Top-level packages of `HEAVY` in sys.modules after running `code`."""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True,
+                          text=True, check=True)
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["statica", "statica.cli", "statica.runtime", "statica.core"])
+def test_import_is_light(module):
+    assert imported_after(f"import {module}") == []
+
+
+def test_parsing_a_script_is_light():
+    code = ("from statica import parser\n"
+            "parser.parse_program('data = load \"x.csv\" with header\\n"
+            "t = test ttest mean of data.y by g vs rest\\n')")
+    assert imported_after(code) == []
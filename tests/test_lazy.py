@@ -0,0 +1,69 @@
+"""Lazy mode: deferred loads, tests and models."""
+
+import pytest
+
+import statica.runtime
+from statica.core.config import settings
+from statica.parsing.program_cache import compile_program
+from statica.runtime import Runtime
+
+SCRIPT = """\
+a = load "a.csv" with header
+b = load "b.csv" with header
+t = test ttest mean of a.x by g
+u = test ttest mean of a.x against 1
+describe a
+conclude u
+conclude t
+"""
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "result_cache", "off")
+    monkeypatch.setattr(settings, "dataset_cache", "off")
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.csv").write_text("x,g\n1,a\n2,a\n3,b\n5,b\n")
+    monkeypatch.chdir(tmp_path)
+    loads = []
+    load_dataset = statica.runtime.load_dataset
+
+    def counting_load(path, **kwargs):
+        loads.append(path)
+        return load_dataset(path, **kwargs)
+
+    monkeypatch.setattr(statica.runtime, "load_dataset", counting_load)
+    return loads
+
+
+def run(script, lazy, capsys):
+    rt = Runtime(lazy=lazy)
+    rt.execute(compile_program(script))
+    return rt, capsys.readouterr().out
+
+
+def test_each_deferred_statement_runs_once(data, capsys):
+    rt, _ = run(SCRIPT, True, capsys)
+    # a is read by two tests and describe, but loaded once
+    assert data == ["a.csv"]
+    assert rt.env["t"].forced and rt.env["u"].forced
+
+
+def test_unused_statements_are_skipped(data, capsys):
+    script = SCRIPT + 'c = load "missing.csv" with header\n'
+    rt, out = run(script, True, capsys)
+    assert [cmd["name"] for cmd in rt.skipped] == ["b", "c"]
+    assert "b.csv" not in data
+    # a skipped statement is never run, so its error is not reported either
+    assert "Error" not in out
+
+
+def test_output_keeps_script_order(data, capsys):
+    _, eager = run(SCRIPT, False, capsys)
+    _, lazy = run(SCRIPT, True, capsys)
+    # only the messages of deferred statements move: they print when forced
+    def results(out):
+        return [line for line in out.splitlines() if not line.startswith(("[Loaded", "[Assigned"))]
+
+    assert results(lazy) == results(eager)
+    assert lazy.index("[Assigned t-test result to 'u']") < lazy.index("[Assigned t-test result to 't']")
@@ -0,0 +1,52 @@
+"""Loading a dataset split across files matched by a glob pattern."""
+
+import pandas as pd
+import pytest
+
+from statica.core.config import settings
+from statica.services.loaders import expand_pattern, load_dataset
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(settings, "dataset_cache", "off")
+    monkeypatch.setattr(settings, "load_workers", 4)
+
+
+def write(path, frame):
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_parts_are_concatenated_in_file_name_order(tmp_path):
+    # written out of order; the later parts list their columns in another order
+    for day in (3, 1, 2):
+        frame = pd.DataFrame({"day": [day, day], "x": [10.0 * day, 10.0 * day + 1]})
+        write(tmp_path / f"2026-01-0{day}.csv", frame if day == 1 else frame[["x", "day"]])
+    df = load_dataset(str(tmp_path / "2026-*.csv"), header=0)
+    assert list(df.columns) == ["day", "x"]
+    assert df["day"].tolist() == [1, 1, 2, 2, 3, 3]
+    assert df["x"].tolist() == [10.0, 11.0, 20.0, 21.0, 30.0, 31.0]
+    assert df.index.tolist() == list(range(6))
+
+
+def test_parts_with_other_columns_are_rejected(tmp_path):
+    write(tmp_path / "a.csv", pd.DataFrame({"x": [1], "y": [2]}))
+    write(tmp_path / "b.csv", pd.DataFrame({"x": [1], "z": [2]}))
+    with pytest.raises(ValueError, match="b.csv"):
+        load_dataset(str(tmp_path / "*.csv"), header=0)
+
+
+def test_parts_with_other_kinds_of_values_are_rejected(tmp_path):
+    write(tmp_path / "a.csv", pd.DataFrame({"x": [1.5]}))
+    write(tmp_path / "b.csv", pd.DataFrame({"x": ["high"]}))
+    with pytest.raises(ValueError, match="column 'x' is text in '.*b.csv'"):
+        load_dataset(str(tmp_path / "*.csv"), header=0)
+
+
+def test_pattern_matching_nothing_is_an_error(tmp_path):
+    (tmp_path / "sub.csv").mkdir()
+    with pytest.raises(FileNotFoundError, match="no files match"):
+        expand_pattern(str(tmp_path / "*.csv"))
+    with pytest.raises(FileNotFoundError):
+        load_dataset(str(tmp_path / "*.csv"), header=0)
@@ -0,0 +1,50 @@
+"""OLS engine against statsmodels."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from statica.services.streaming import ChunkedDataset
+from statica.stats import ols
+
+
+@pytest.mark.parametrize("spread", [1.0, 1e-4, 1e-7])
+def test_matches_statsmodels_on_ill_conditioned_designs(spread):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=2_000)
+    X = np.column_stack([np.ones_like(x), x, x + spread * rng.normal(size=x.size)])
+    y = 1.0 + 2.0 * x + rng.normal(size=x.size)
+    fit = ols.fit("y", y, X, ["Intercept", "a", "b"])
+    ref = sm.OLS(y, X).fit()
+    assert np.allclose(fit.params.to_numpy(), ref.params, rtol=1e-6, atol=1e-6)
+    assert np.allclose(fit.bse.to_numpy(), ref.bse, rtol=1e-5)
+
+
+def test_rank_deficient_design_uses_the_pseudo_inverse():
+    x = np.arange(10.0)
+    X = np.column_stack([np.ones_like(x), x, 2 * x])
+    fit = ols.fit("y", 3 * x + 1, X, ["Intercept", "a", "b"])
+    assert fit.df_model == 1
+    assert np.allclose(X @ fit.params.to_numpy(), 3 * x + 1)
+
+
+def test_chunked_fit_matches_the_in_memory_fit(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 1_000
+    df = pd.DataFrame({"x": rng.normal(size=n), "g": rng.choice(["a", "b", "c"], size=n)})
+    df["y"] = 1.0 + 2.0 * df["x"] + (df["g"] == "b") + rng.normal(size=n)
+    df.loc[::37, "x"] = np.nan
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    terms = ["x", "g"]
+    y, X, names = ols.DesignCache().design(pd.read_csv(path), "y", terms)
+    full = ols.fit("y", y, X, names)
+    ds = ChunkedDataset(str(path), header=0, chunksize=128)
+    chunked = ols.fit_chunks("y", terms, ds.chunks(["y", *terms]))
+    assert list(chunked.params.index) == list(full.params.index)
+    assert chunked.nobs == full.nobs
+    assert np.allclose(chunked.params.to_numpy(), full.params.to_numpy())
+    assert np.allclose(chunked.bse.to_numpy(), full.bse.to_numpy())
+    assert np.isclose(chunked.rsquared, full.rsquared)
@@ -0,0 +1,38 @@
+"""Parsing scripts with both parsers."""
+
+import pytest
+from lark.exceptions import LarkError
+
+from statica import parser as legacy
+from statica.parsing.parser import Parser
+
+
+def statements(result):
+    return [stmt.children[0] if hasattr(stmt, "children") else stmt for stmt in result]
+
+
+def parse_both(text):
+    return statements(legacy.parse_program(text))[0], statements(Parser().parse(text))[0]
+
+
+@pytest.mark.parametrize("options", [
+    "with header streaming compact",
+    "streaming with header compact",
+    "compact streaming with header",
+])
+def test_load_options_in_any_order(options):
+    for cmd in parse_both(f'd = load "x.csv" {options}\n'):
+        load = cmd["expr"]
+        assert (load["header"], load["streaming"], load["compact"]) == (True, True, True)
+
+
+def test_load_options_default_off():
+    for cmd in parse_both('d = load "x.csv"\n'):
+        assert not any(cmd["expr"][k] for k in ("header", "streaming", "compact"))
+
+
+def test_repeated_load_option_is_an_error():
+    with pytest.raises(LarkError, match="given more than once"):
+        legacy.parse_program('d = load "x.csv" streaming with header streaming\n')
+    with pytest.raises(LarkError, match="given more than once"):
+        Parser().parse('d = load "x.csv" with header with header\n')
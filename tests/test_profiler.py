@@ -0,0 +1,23 @@
+"""Statement profiler."""
+
+import sys
+
+from statica.core.profiler import Profiler
+from statica.runtime import Runtime
+
+
+def test_preload_records_one_import_row_per_new_module(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    with Profiler(memory=False) as prof:
+        prof.preload(["colorsys", "json"])
+    assert [(r.label, r.kind) for r in prof.records] == [("import colorsys", "import")]
+
+
+def test_modules_follow_the_statements_of_the_script():
+    cmds = [{"cmd": "assign", "name": "d", "expr": {"cmd": "load", "path": "x.csv"}},
+            {"cmd": "assign", "name": "m", "expr": {"cmd": "regress", "dataset": "d"}},
+            {"cmd": "conclude", "name": "m", "alpha": 0.05}]
+    modules = Runtime()._modules(cmds)
+    assert modules[:2] == ["numpy", "pandas"]
+    assert "scipy.linalg" in modules and modules[-1] == "statsmodels.api"
+    assert "matplotlib.figure" not in Runtime()._modules(cmds[:1])
@@ -0,0 +1,32 @@
+"""Compiled program cache."""
+
+from statica.parsing import program_cache
+
+SCRIPT = 'data = load "x.csv" with header\nt = test ttest mean of data.y by g vs rest\n'
+
+
+def test_cached_program_is_reused_and_invalidated(tmp_path, monkeypatch):
+    monkeypatch.setenv("STATICA_CACHE_DIR", str(tmp_path / "user-cache"))
+    script = tmp_path / "s.sta"
+    script.write_text(SCRIPT)
+    first = program_cache.load_program(str(script))
+    entry = tmp_path / program_cache.CACHE_DIR / ("s.sta" + program_cache.SUFFIX)
+    assert entry.exists()
+    assert program_cache.load_program(str(script)) == first == program_cache.compile_program(SCRIPT)
+    # only the directory actually written to is created
+    assert not (tmp_path / "user-cache" / "programs").exists()
+
+    script.write_text(SCRIPT.replace("vs rest", "pairwise"))
+    assert program_cache.load_program(str(script))[1]["expr"]["compare"] == "pairwise"
+
+
+def test_digest_covers_the_lowering_code(monkeypatch):
+    before = program_cache.program_digest(SCRIPT)
+    real = program_cache.Path.read_bytes
+
+    def read_bytes(path):
+        data = real(path)
+        return data + b"# changed" if path.name == "program_cache.py" else data
+
+    monkeypatch.setattr(program_cache.Path, "read_bytes", read_bytes)
+    assert program_cache.program_digest(SCRIPT) != before
@@ -0,0 +1,77 @@
+"""Column projection pushdown."""
+
+from statica.core import projection
+from statica.parsing.program_cache import compile_program
+
+
+def columns(script):
+    """The ``columns`` recorded on each load of `script`, in order."""
+    out = []
+    for cmd in projection.push_down(compile_program(script)):
+        if cmd["cmd"] == "load":
+            out.append(cmd.get("columns"))
+        elif cmd["cmd"] == "assign" and isinstance(cmd["expr"], dict) and cmd["expr"].get("cmd") == "load":
+            out.append(cmd["expr"].get("columns"))
+    return out
+
+
+def test_loads_read_the_columns_their_statements_use():
+    script = """\
+a = load "a.csv" with header
+b = load "b.csv" with header
+t = test ttest mean of a.score by grp
+m = regress y ~ x1 + x2 on b
+plot b.x1 vs b.y scatter
+"""
+    assert columns(script) == [["grp", "score"], ["x1", "x2", "y"]]
+
+
+def test_uses_through_an_alias_count_for_the_load():
+    script = """\
+a = load "a.csv" with header
+c = a
+t = test ttest mean of c.score against 0
+"""
+    assert columns(script) == [["score"]]
+
+
+def test_uses_after_rebinding_do_not_count():
+    script = """\
+a = load "a.csv" with header
+t = test ttest mean of a.score against 0
+a = load "b.csv" with header
+u = test ttest mean of a.age against 0
+"""
+    assert columns(script) == [["score"], ["age"]]
+
+
+def test_describe_and_unknown_statements_keep_every_column():
+    described = """\
+a = load "a.csv" with header
+describe a
+t = test ttest mean of a.score against 0
+"""
+    assert columns(described) == [None]
+    cmds = compile_program('a = load "a.csv" with header\n')
+    cmds.append({"cmd": "unknown"})
+    assert projection.push_down(cmds)[0]["expr"].get("columns") is None
+
+
+def test_unread_and_streaming_loads_are_left_alone():
+    script = """\
+a = load "a.csv" with header
+b = load "b.csv" with header streaming
+t = test ttest mean of b.score against 0
+"""
+    assert columns(script) == [None, None]
+
+
+def test_select_keeps_file_order_and_expands_patterns():
+    header = ["id", "score", "q1", "q2", "grp"]
+    assert projection.select(header, ["grp", "q*"]) == ["q1", "q2", "grp"]
+
+
+def test_select_returns_none_to_read_the_file_whole():
+    header = ["id", "score"]
+    assert projection.select(header, ["score", "id"]) is None
+    assert projection.select(header, ["missing"]) is None
@@ -0,0 +1,52 @@
+"""Result cache keys, storage and eviction."""
+
+import os
+import threading
+
+import pandas as pd
+
+from statica.services import result_cache
+from statica.services.fingerprint import fingerprint
+from statica.services.result_cache import ResultCache
+
+TTEST = {"cmd": "ttest", "target": {"column": "x"}, "by": None, "against": 0.0, "compare": None}
+
+
+def test_key_follows_data_command_and_code(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    df = pd.DataFrame({"x": [1.0, 2.0, 3.0]})
+    key = cache.key(fingerprint(df), TTEST)
+    assert cache.key(fingerprint(df.copy()), dict(reversed(list(TTEST.items())))) == key
+    assert cache.key(fingerprint(pd.DataFrame({"x": [1.0, 2.0, 4.0]})), TTEST) != key
+    assert cache.key(fingerprint(df), dict(TTEST, against=1.0)) != key
+    # a new Statica version or a changed kernel invalidates every entry
+    monkeypatch.setattr(result_cache, "code_version", lambda: "0.0.0:changed")
+    assert cache.key(fingerprint(df), TTEST) != key
+
+
+def test_put_and_get(tmp_path):
+    cache = ResultCache(tmp_path)
+    assert cache.get("ab" * 32) == (False, None)
+    cache.put("ab" * 32, {"t": 1.5})
+    assert cache.get("ab" * 32) == (True, {"t": 1.5})
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_failed_put_leaves_no_temporary_file(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("cd" * 32, threading.Lock())  # not picklable
+    assert cache.get("cd" * 32) == (False, None)
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file() and p.name != ".lock"] == []
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10**9)
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, b"x" * 1000)
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    # a hit refreshes the entry
+    assert cache.get(keys[0])[0]
+    cache.max_bytes = 3500
+    cache.evict()
+    assert [cache.get(k)[0] for k in keys] == [True, False, True, True]
@@ -0,0 +1,85 @@
+"""Dependency planning and parallel execution of statements."""
+
+import threading
+import time
+
+import pytest
+
+from statica.core import scheduler
+from statica.core.config import settings
+
+
+def load(name):
+    return {"cmd": "assign", "name": name, "expr": {"cmd": "load", "file": f"{name}.csv"}}
+
+
+def ttest(name, dataset):
+    return {"cmd": "assign", "name": name,
+            "expr": {"cmd": "ttest", "target": {"dataset": dataset, "column": "x"}}}
+
+
+def deps(cmds):
+    return [sorted(node.deps) for node in scheduler.plan(cmds)]
+
+
+def test_plan_links_reads_and_writes():
+    cmds = [load("a"), load("b"), ttest("t", "a"), ttest("u", "b"),
+            {"cmd": "conclude", "name": "t"}, load("a")]
+    # read-after-write: t on a, u on b, conclude on t;
+    # write-after-read and write-after-write: reloading a waits for its readers
+    assert deps(cmds) == [[], [], [0], [1], [2], [0, 2]]
+
+
+def test_plan_orders_plots_and_barriers():
+    plots = [{"cmd": "plot", "x": ["a", "x"], "kind": "box", "output": f"{i}.png"} for i in range(2)]
+    cmds = [load("a"), *plots, {"cmd": "ask_table", "key": "k"}, load("b")]
+    assert deps(cmds) == [[], [0], [0, 1], [0, 1, 2], [3]]
+
+
+def test_interactive_plots_are_barriers(monkeypatch):
+    monkeypatch.setattr(settings, "plot_dir", None)
+    shown = {"cmd": "plot", "x": ["a", "x"], "kind": "box", "output": None}
+    assert scheduler.accesses(shown)[2] is True
+    assert scheduler.accesses(dict(shown, output="x.png"))[2] is False
+    monkeypatch.setattr(settings, "plot_dir", "plots")
+    assert scheduler.accesses(shown)[2] is False
+
+
+def test_run_prints_in_script_order(capsys):
+    def dispatch(cmd):
+        # later statements finish first
+        time.sleep(0.01 * (3 - int(cmd["name"][1:])))
+        print(cmd["name"])
+
+    scheduler.run([load(f"d{i}") for i in range(4)], dispatch, jobs=4)
+    assert capsys.readouterr().out.split() == ["d0", "d1", "d2", "d3"]
+
+
+def test_run_reraises_the_first_error(capsys):
+    ran = []
+
+    def dispatch(cmd):
+        ran.append(cmd["name"])
+        print(cmd["name"])
+        if cmd["name"] == "t":
+            raise ValueError("bad test")
+
+    cmds = [load("a"), ttest("t", "a"), ttest("u", "t"), load("b")]
+    with pytest.raises(ValueError, match="bad test"):
+        scheduler.run(cmds, dispatch, jobs=2)
+    # u depends on the failed t and never starts; everything before t is printed
+    assert "u" not in ran
+    assert capsys.readouterr().out.split()[:2] == ["a", "t"]
+
+
+def test_barriers_run_on_the_calling_thread(monkeypatch):
+    monkeypatch.setattr(settings, "plot_dir", None)
+    threads = {}
+
+    def dispatch(cmd):
+        threads[cmd.get("name", cmd["cmd"])] = threading.current_thread()
+
+    cmds = [load("a"), {"cmd": "plot", "x": ["a", "x"], "kind": "box", "output": None}, load("b")]
+    scheduler.run(cmds, dispatch, jobs=2)
+    assert threads["plot"] is threading.current_thread()
+    assert threads["a"] is not threading.current_thread()
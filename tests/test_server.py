@@ -0,0 +1,65 @@
+"""statica serve: Unix socket handling and the session cap."""
+
+import socket
+
+import pytest
+
+from statica import server
+
+
+def test_refuses_to_replace_a_regular_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        server.make_server(server.StaticaService(), socket_path=str(path))
+    assert path.read_text() == "keep me"
+
+
+def test_replaces_a_stale_socket(tmp_path):
+    path = str(tmp_path / "statica.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    srv = server.make_server(server.StaticaService(), socket_path=path)
+    srv.server_close()
+
+
+def test_session_cap_evicts_idle_sessions():
+    service = server.StaticaService(max_sessions=2)
+    busy = service.new_session()
+    idle = service.new_session()
+    busy.lock.acquire()
+    try:
+        fresh = service.new_session()
+        assert service.session(idle.id, create=False) is None
+        assert service.session(busy.id, create=False) is busy
+        fresh.lock.acquire()
+        with pytest.raises(server.SessionLimitError):
+            service.new_session()
+    finally:
+        busy.lock.release()
+
+
+def test_running_session_is_not_evicted():
+    service = server.StaticaService(max_sessions=1)
+    # a request that has looked its session up but not yet taken its lock
+    pinned = service.session("a", pin=True)
+    try:
+        with pytest.raises(server.SessionLimitError):
+            service.new_session()
+        assert service.session("a", create=False) is pinned
+    finally:
+        service.unpin(pinned)
+    service.new_session()
+    assert service.session("a", create=False) is None
+
+
+def test_ask_table_is_rejected(monkeypatch):
+    def no_input(*args):
+        raise AssertionError("the server must not read from the terminal")
+
+    monkeypatch.setattr("builtins.input", no_input)
+    response = server.StaticaService().run('x = load "missing.csv"\nask_table "t"\n')
+    assert response["ok"] is False
+    assert "ask_table" in response["error"]
+    assert response["results"] == {}
@@ -0,0 +1,26 @@
+"""describe ... approx sketches."""
+
+import numpy as np
+import pandas as pd
+
+from statica.stats.sketches import approx_describe, frame_chunks
+
+
+def test_approx_quartiles_are_reproducible():
+    df = pd.DataFrame({"x": np.random.default_rng(0).normal(size=50_000)})
+    first, accuracy = approx_describe(frame_chunks(df, 4_000), ["x"])
+    second, _ = approx_describe(frame_chunks(df, 4_000), ["x"])
+    assert not accuracy["exact_quartiles"]
+    pd.testing.assert_frame_equal(first, second)
+    q = df["x"].quantile([0.25, 0.5, 0.75]).to_numpy()
+    assert np.allclose(first[["25%", "50%", "75%"]].to_numpy()[0], q, atol=0.05)
+
+
+def test_mixed_column_keeps_numbers_and_text():
+    chunks = [pd.DataFrame({"m": [1.0, 2.0, 3.0]}), pd.DataFrame({"m": ["a", "b", "a"]})]
+    table, accuracy = approx_describe(chunks)
+    row = table.iloc[0]
+    assert accuracy["mixed"] == ["m"]
+    assert row["count"] == 6
+    assert row["mean"] == 2.0 and row["max"] == 3.0
+    assert row["top"] == "a" and row["freq"] == 2
@@ -0,0 +1,37 @@
+"""Streaming datasets: column selection, describe and degenerate tests."""
+
+import math
+
+import pandas as pd
+
+from statica.runtime import Runtime
+from statica.services.streaming import ChunkedDataset
+from statica.stats.moments import Moments
+from statica.stats.ttest import one_sample, welch
+
+
+def write_parts(tmp_path):
+    for i in range(3):
+        pd.DataFrame({"x": [1.0 + i, 2.0, 3.0], "n": [i, i + 1, i + 2],
+                      "g": ["a", "b", "a"]}).to_csv(tmp_path / f"part{i}.csv", index=False)
+    return str(tmp_path / "part*.csv")
+
+
+def test_wildcards_skip_text_columns(tmp_path):
+    ds = ChunkedDataset(write_parts(tmp_path), chunksize=2)
+    assert ds.numeric_columns() == ["x", "n"]
+    assert Runtime(jobs=1)._select_columns(ds, ["*"]) == ["x", "n"]
+
+
+def test_describe_leaves_out_text_columns(tmp_path):
+    table = ChunkedDataset(write_parts(tmp_path), chunksize=2).describe()
+    assert list(table["index"]) == ["x", "n"]
+    assert table["mean"].notna().all()
+
+
+def test_zero_spread_gives_infinite_t():
+    # as scipy.stats: a nonzero difference with no spread is infinitely significant
+    constant = Moments.from_values([2.0, 2.0, 2.0])
+    assert one_sample(constant, 1.0)["t"] == math.inf
+    assert math.isnan(one_sample(constant, 2.0)["t"])
+    assert welch(Moments.from_values([1.0, 1.0]), constant, ("a", "b"))["t"] == -math.inf
@@ -0,0 +1,33 @@
+"""t-test kernels against scipy."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from statica.stats.moments import Moments
+from statica.stats.ttest import multi_group
+
+
+def test_vs_rest_pools_every_other_row():
+    rng = np.random.default_rng(1)
+    # singleton groups are not tested, but their rows belong to every "rest"
+    groups = {f"g{i}": rng.normal(i % 3, 1.0, 1 if i >= 5 else 4) for i in range(40)}
+    result = multi_group(list(groups), [Moments.from_values(v) for v in groups.values()], "vs-rest")
+    table = result["table"]
+    assert result["skipped_groups"] == 35
+    for row in table.itertuples():
+        rest = np.concatenate([v for k, v in groups.items() if k != row.group1])
+        ref = stats.ttest_ind(groups[row.group1], rest, equal_var=False)
+        assert row.n2 == len(rest)
+        assert row.t == pytest.approx(ref.statistic)
+        assert row.p == pytest.approx(ref.pvalue)
+
+
+def test_pairwise_matches_scipy():
+    rng = np.random.default_rng(2)
+    groups = {name: rng.normal(mu, 1.0, 30) for name, mu in (("a", 0.0), ("b", 0.5), ("c", 1.0))}
+    table = multi_group(list(groups), [Moments.from_values(v) for v in groups.values()])["table"]
+    for row in table.itertuples():
+        ref = stats.ttest_ind(groups[row.group1], groups[row.group2], equal_var=False)
+        assert row.t == pytest.approx(ref.statistic)
+